@@ -0,0 +1,403 @@
+"""
+DINE24 Restaurant Management System - Analytics Materializations
+Dashboard aggregates maintained on every write and time-series rollups for charts
+"""
+
+import heapq
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from reservation_store import ReservationColumns
+
+
+class AnalyticsStore:
+    """Running counters, histograms and top-k lists for the admin dashboard
+
+    The store is built once per process from a full scan (rebuild), which
+    copies the scanned fields of the reservations into a transient
+    ReservationColumns, aggregates it with numpy and keeps the newest
+    recent_k documents, and is then updated by the write paths: reservation
+    created or cancelled, menu item added. snapshot() only reads these
+    values. Every resync_interval seconds the next read rebuilds from
+    scratch, so changes made by other workers are picked up; verify()
+    compares the live values against a fresh recomputation.
+    """
+
+    SCAN_FIELDS = ('num_people', 'arrival_date', 'arrival_time', 'table_number', 'status', 'total_amount', 'created_at')
+
+    def __init__(self, load_reservations, load_menu_items, table_count, slot_count,
+                 top_k=5, recent_k=5, resync_interval=300):
+        self.load_reservations = load_reservations
+        self.load_menu_items = load_menu_items
+        self.table_count = table_count
+        self.slot_count = slot_count
+        self.top_k = top_k
+        self.recent_k = recent_k
+        self.resync_interval = resync_interval
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._clear()
+
+    def _clear(self):
+        self.total_reservations = 0
+        self.status_counts = Counter()
+        self.total_covers = 0
+        self.total_revenue = 0.0
+        self.paid_reservations = 0
+        self.peak_hours = Counter()
+        self.bookings_by_date = Counter()
+        self.total_menu_items = 0
+        self.rating_sum = 0.0
+        self.top_items = {}
+        self.recent = deque(maxlen=self.recent_k)
+
+    # Loading
+    def rebuild(self):
+        """Recompute every materialization from a full scan of the collections"""
+        with self._lock:
+            self._clear()
+            newest = []
+            reservations = self._keep_newest(self.load_reservations(), newest)
+            self._add_columns(ReservationColumns.from_documents(reservations, self.SCAN_FIELDS))
+            # Oldest first, so appendleft leaves the newest at the front as _add_reservation does
+            for _, _, reservation in sorted(newest):
+                self.recent.appendleft(dict(reservation))
+            for item in self.load_menu_items():
+                self._add_menu_item(item)
+            self._loaded_at = time.monotonic()
+
+    def _keep_newest(self, reservations, newest):
+        """Pass reservations through, keeping the recent_k latest by created_at in the heap newest"""
+        for position, reservation in enumerate(reservations):
+            if self.recent_k:
+                # Later documents win ties, as in a stable sort
+                entry = (reservation.get('created_at') or datetime.min, position, reservation)
+                if len(newest) < self.recent_k:
+                    heapq.heappush(newest, entry)
+                elif entry[:2] > newest[0][:2]:
+                    heapq.heapreplace(newest, entry)
+            yield reservation
+
+    def _ensure_loaded(self):
+        if self._loaded_at is None or (self.resync_interval
+                                       and time.monotonic() - self._loaded_at > self.resync_interval):
+            self.rebuild()
+
+    # Reservation materializations
+    def _active(self, reservation):
+        return reservation.get('status') != 'cancelled'
+
+    def _apply_active(self, reservation, sign):
+        amount = float(reservation.get('total_amount') or 0)
+        self.total_covers += sign * int(reservation.get('num_people') or 0)
+        self.total_revenue += sign * amount
+        if amount > 0:
+            self.paid_reservations += sign
+        self.peak_hours[reservation.get('arrival_time')] += sign
+        if reservation.get('table_number'):
+            self.bookings_by_date[reservation.get('arrival_date')] += sign
+            if self.bookings_by_date[reservation.get('arrival_date')] <= 0:
+                del self.bookings_by_date[reservation.get('arrival_date')]
+        if self.peak_hours[reservation.get('arrival_time')] <= 0:
+            del self.peak_hours[reservation.get('arrival_time')]
+
+    def _add_reservation(self, reservation):
+        self.total_reservations += 1
+        self.status_counts[reservation.get('status')] += 1
+        if self._active(reservation):
+            self._apply_active(reservation, 1)
+        self.recent.appendleft(dict(reservation))
+
+    def _add_columns(self, columns):
+        """Vectorized _add_reservation over everything but the recent list"""
+        active = columns.mask('status', lambda status: status != 'cancelled')
+        amounts = columns.numpy('total_amount')[active]
+        self.total_reservations += len(columns)
+        self.status_counts.update(columns.counts('status'))
+        self.total_covers += int(columns.numpy('num_people')[active].sum())
+        self.total_revenue += float(amounts.sum())
+        self.paid_reservations += int((amounts > 0).sum())
+        self.peak_hours.update(columns.counts('arrival_time', active))
+        self.bookings_by_date.update(columns.counts('arrival_date', active & columns.mask('table_number', bool)))
+
+    def record_reservation(self, reservation):
+        with self._lock:
+            if self._loaded_at is not None:
+                self._add_reservation(reservation)
+
+    def record_cancellation(self, reservation):
+        """Move a reservation (as it was before cancelling) to the cancelled status"""
+        with self._lock:
+            if self._loaded_at is None or not self._active(reservation):
+                return
+            self.status_counts[reservation.get('status')] -= 1
+            if self.status_counts[reservation.get('status')] <= 0:
+                del self.status_counts[reservation.get('status')]
+            self.status_counts['cancelled'] += 1
+            self._apply_active(reservation, -1)
+            for recent in self.recent:
+                if recent.get('_id') == reservation.get('_id'):
+                    recent['status'] = 'cancelled'
+
+    # Menu materializations
+    def _offer_top(self, item):
+        """Bounded top-k by orders_placed; counts only grow, so the minimum is the only entry to evict"""
+        key = str(item.get('_id'))
+        if key in self.top_items or len(self.top_items) < self.top_k:
+            self.top_items[key] = dict(item)
+            return
+        weakest = min(self.top_items, key=lambda k: self.top_items[k].get('orders_placed') or 0)
+        if (item.get('orders_placed') or 0) > (self.top_items[weakest].get('orders_placed') or 0):
+            del self.top_items[weakest]
+            self.top_items[key] = dict(item)
+
+    def _add_menu_item(self, item):
+        self.total_menu_items += 1
+        self.rating_sum += float(item.get('rating') or 0)
+        self._offer_top(item)
+
+    def record_menu_item(self, item):
+        with self._lock:
+            if self._loaded_at is not None:
+                self._add_menu_item(item)
+
+    # Reads
+    def snapshot(self):
+        """Precomputed dashboard values; O(1) apart from copying the small lists"""
+        with self._lock:
+            self._ensure_loaded()
+            booked_days = len(self.bookings_by_date)
+            capacity = self.table_count * self.slot_count * booked_days
+            popular = sorted(self.top_items.values(), key=lambda item: -(item.get('orders_placed') or 0))
+            return {
+                'total_reservations': self.total_reservations,
+                'status_counts': dict(self.status_counts),
+                'total_covers': self.total_covers,
+                'total_revenue': round(self.total_revenue, 2),
+                'average_order_value': round(self.total_revenue / self.paid_reservations, 2) if self.paid_reservations else 0,
+                'peak_hours': dict(sorted(self.peak_hours.items(), key=lambda entry: str(entry[0]))),
+                'table_utilization': round(sum(self.bookings_by_date.values()) / capacity * 100, 1) if capacity else 0.0,
+                'total_menu_items': self.total_menu_items,
+                'customer_satisfaction': round(self.rating_sum / self.total_menu_items, 2) if self.total_menu_items else 0,
+                'recent_reservations': [dict(doc) for doc in self.recent],
+                'popular_items': [dict(item) for item in popular]
+            }
+
+    def verify(self):
+        """Compare the live materializations with a full recomputation; returns the mismatches"""
+        fresh = AnalyticsStore(self.load_reservations, self.load_menu_items, self.table_count,
+                               self.slot_count, self.top_k, self.recent_k, resync_interval=0)
+        fresh.rebuild()
+        live, expected = self.snapshot(), fresh.snapshot()
+        mismatches = {}
+        for key, value in expected.items():
+            if key == 'recent_reservations':
+                actual = [doc.get('_id') for doc in live[key]]
+                value = [doc.get('_id') for doc in value]
+            elif key == 'popular_items':
+                # Items tied on orders_placed may legitimately differ
+                actual = [item.get('orders_placed') for item in live[key]]
+                value = [item.get('orders_placed') for item in value]
+            else:
+                actual = live[key]
+            if actual != value:
+                mismatches[key] = {'live': actual, 'expected': value}
+        return mismatches
+
+
+class AnalyticsRollups:
+    """Per-day and per-hour reservation rollups for dashboard charts
+
+    Rollups are stored in the analytics_rollups collection under
+    '<granularity>:<bucket>' ids (day:2026-10-20, hour:2026-10-20T19). Writing
+    a reservation marks its arrival day dirty with a marker document, visible
+    to every worker; the next range query recomputes just the dirty days with
+    pandas group-bys over a columnar extract of their reservations. The first
+    query backfills the whole retention window; later ones extend it as days
+    pass and delete rollups that have aged out of it.
+    """
+
+    COLLECTION = 'analytics_rollups'
+    FIELDS = ('arrival_date', 'arrival_time', 'num_people', 'total_amount', 'status', 'table_number')
+
+    def __init__(self, db_manager, tables, time_slots, slot_span=1, retention_days=365, days_ahead=30):
+        self.db_manager = db_manager
+        self.table_sections = {table['table_number']: table['section'] for table in tables}
+        self.sections = sorted(set(self.table_sections.values()))
+        self.section_tables = np.array([list(self.table_sections.values()).count(section)
+                                        for section in self.sections])
+        self.time_slots = list(time_slots)
+        self.slots_per_hour = Counter(slot[:2] for slot in time_slots)
+        self.slot_span = slot_span
+        self.retention_days = retention_days
+        self.days_ahead = days_ahead
+        self._lock = threading.Lock()
+
+    def mark_dirty(self, date):
+        """Flag a day whose reservations changed so its rollups are recomputed"""
+        if date:
+            self.db_manager.replace_one(self.COLLECTION, {'_id': f"dirty:{date}"},
+                                        {'granularity': 'dirty', 'bucket': date}, upsert=True)
+
+    # Computation
+    def _extract(self, query):
+        """Columnar extract of the reservation fields the rollups need"""
+        columns = ReservationColumns.from_documents(self.db_manager.find('reservations', query), self.FIELDS,
+                                                    self.time_slots)
+        frame = pd.DataFrame({field: columns.decoded(field) for field in self.FIELDS})
+        frame['hour'] = columns.decoded('arrival_time', lambda time: str(time)[:2])
+        frame['section'] = frame['table_number'].map(self.table_sections)
+        return frame
+
+    def _compute(self, frame, days):
+        """Rollup documents for every day in days (and each of its hours), zeros included"""
+        cancelled = frame['status'] == 'cancelled'
+        active = frame[~cancelled]
+        hours = sorted(set(self.slots_per_hour) | set(active['hour']))
+        documents = []
+        for granularity, keys, buckets in (
+            ('day', ['arrival_date'], pd.Index(days, name='arrival_date')),
+            ('hour', ['arrival_date', 'hour'], pd.MultiIndex.from_product([days, hours], names=['arrival_date', 'hour']))
+        ):
+            totals = active.groupby(keys).agg(
+                reservations=('num_people', 'size'),
+                covers=('num_people', 'sum'),
+                revenue=('total_amount', 'sum')
+            ).reindex(buckets, fill_value=0)
+            totals['cancelled'] = frame[cancelled].groupby(keys).size().reindex(buckets, fill_value=0)
+
+            # Booked table-slots over available table-slots, per section
+            booked = (active.dropna(subset=['section']).groupby(keys + ['section']).size()
+                      .unstack(fill_value=0).reindex(index=buckets, columns=self.sections, fill_value=0))
+            if granularity == 'day':
+                slots = np.full(len(buckets), sum(self.slots_per_hour.values()))
+            else:
+                slots = np.array([self.slots_per_hour.get(hour, 0) for hour in buckets.get_level_values('hour')])
+            capacity = np.outer(slots, self.section_tables)
+            utilization = np.divide(booked.to_numpy() * self.slot_span * 100.0, capacity,
+                                    out=np.zeros(capacity.shape), where=capacity > 0)
+            utilization = np.minimum(utilization, 100.0).round(1)
+
+            labels = buckets if granularity == 'day' else [f"{day}T{hour}" for day, hour in buckets]
+            for label, row, sections in zip(labels, totals.itertuples(index=False), utilization):
+                documents.append({
+                    '_id': f"{granularity}:{label}",
+                    'granularity': granularity,
+                    'bucket': label,
+                    'reservations': int(row.reservations),
+                    'covers': int(row.covers),
+                    'revenue': round(float(row.revenue), 2),
+                    'cancelled': int(row.cancelled),
+                    'section_utilization': dict(zip(self.sections, sections.tolist()))
+                })
+        return documents
+
+    def _store(self, documents):
+        for document in documents:
+            self.db_manager.replace_one(self.COLLECTION, {'_id': document['_id']}, document, upsert=True)
+
+    # Maintenance
+    def _window(self):
+        """(start, end) ISO dates of the retention window as of today"""
+        today = datetime.utcnow().date()
+        return ((today - timedelta(days=self.retention_days)).isoformat(),
+                (today + timedelta(days=self.days_ahead)).isoformat())
+
+    def _build(self, start, end):
+        """Recompute and store every rollup between start and end; caller holds the lock"""
+        days = [day.strftime('%Y-%m-%d') for day in pd.date_range(start, end)]
+        for marker in list(self.db_manager.find(self.COLLECTION, {'granularity': 'dirty',
+                                                                 'bucket': {'$gte': start, '$lte': end}})):
+            self.db_manager.delete_one(self.COLLECTION, {'_id': marker['_id']})
+        documents = self._compute(self._extract({'arrival_date': {'$gte': start, '$lte': end}}), days)
+        self._store(documents)
+        return len(documents)
+
+    def _write_meta(self, start, end):
+        self.db_manager.replace_one(self.COLLECTION, {'_id': 'meta'}, {
+            'granularity': 'meta', 'bucket': None, 'start': start, 'end': end,
+            'built_at': datetime.utcnow()
+        }, upsert=True)
+
+    def rebuild(self, start=None, end=None):
+        """Recompute every rollup between start and end (default: the retention window)"""
+        window_start, window_end = self._window()
+        start = start or window_start
+        end = end or window_end
+        with self._lock:
+            count = self._build(start, end)
+            self._write_meta(start, end)
+        return count
+
+    def _advance(self, meta):
+        """Move the stored window forward to today's: backfill new days, prune expired ones"""
+        start, end = self._window()
+        if meta['start'] >= start and meta['end'] >= end:
+            return
+        with self._lock:
+            meta = self.db_manager.find_one(self.COLLECTION, {'_id': 'meta'})
+            if meta['end'] < end:
+                following = (datetime.strptime(meta['end'], '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+                self._build(max(following, start), end)
+            self.db_manager.delete_many(self.COLLECTION, {
+                'granularity': {'$in': ['day', 'hour', 'dirty']},
+                'bucket': {'$lt': start}
+            })
+            self._write_meta(max(meta['start'], start), max(meta['end'], end))
+
+    def refresh(self):
+        """Backfill on first use, keep up with the window, then recompute only the days marked dirty"""
+        meta = self.db_manager.find_one(self.COLLECTION, {'_id': 'meta'})
+        if meta is None:
+            self.rebuild()
+        else:
+            self._advance(meta)
+        with self._lock:
+            days = sorted(doc['bucket'] for doc in self.db_manager.find(self.COLLECTION, {'granularity': 'dirty'}))
+            if not days:
+                return 0
+            # Clear the markers first so a write landing mid-recompute marks the day again
+            for day in days:
+                self.db_manager.delete_one(self.COLLECTION, {'_id': f"dirty:{day}"})
+            documents = self._compute(self._extract({'arrival_date': {'$in': days}}), days)
+            self._store(documents)
+        return len(days)
+
+    # Reads
+    def _empty_row(self, bucket):
+        return {
+            'bucket': bucket,
+            'reservations': 0,
+            'covers': 0,
+            'revenue': 0.0,
+            'cancelled': 0,
+            'section_utilization': {section: 0.0 for section in self.sections}
+        }
+
+    def query(self, start, end, granularity='day'):
+        """Rollup rows for start..end (inclusive ISO dates), ordered by bucket
+
+        Buckets with no stored rollup (outside the retention window) are
+        returned as zeros, so every day, and every service hour, has a row.
+        """
+        self.refresh()
+        rows = self.db_manager.find(self.COLLECTION, {
+            'granularity': granularity,
+            'bucket': {'$gte': start, '$lte': end + '~'}
+        }, sort=[('bucket', 1)])
+        found = {row['bucket']: {key: value for key, value in row.items() if key not in ('_id', 'granularity')}
+                 for row in rows}
+        days = [day.strftime('%Y-%m-%d') for day in pd.date_range(start, end)]
+        if granularity == 'day':
+            buckets = days
+        else:
+            buckets = [f"{day}T{hour}" for day in days for hour in sorted(self.slots_per_hour)]
+        for bucket in buckets:
+            if bucket not in found:
+                found[bucket] = self._empty_row(bucket)
+        return [found[bucket] for bucket in sorted(found)]
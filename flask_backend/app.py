@@ -4,15 +4,31 @@ DINE24 Restaurant Management System - Backend API
 Developer: MAMIDALA BHAVYA REDDY
 """
 
-from flask import Flask, request, jsonify, session
+from flask import Flask, Response, g, request, jsonify, session, stream_with_context
 from flask_cors import CORS
-from flask_mail import Mail, Message
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_mail import Mail
 from datetime import datetime, timedelta
 import os
+import json
+import base64
+import time
+import codecs
 import logging
-from config import Config
-from database import DatabaseManager
+import click
+from config import Config, CHATBOT_INTENTS, RESTAURANT_TABLES
+from database import database as db_manager
+from availability import SlotUnavailable
+from menu_cache import MenuCache
+from mail_outbox import EmailOutbox
+from chatbot import IntentClassifier, MenuRetriever, format_menu_context
+from menu_search import MenuSearchIndex
+from json_provider import MongoJSONProvider
+from auth import RevocationList, TokenVerifier
+from passwords import HasherBusy, PasswordHasher
+from metrics import metrics, process_memory
+from compression import ResponseCompressor
+from coalescing import RequestCoalescer
+from bulk_io import FORMATS, ReservationImporter, export_records, read_records, reservation_document, validate_reservation
 import openai
 from bson import ObjectId
 import jwt
@@ -20,11 +36,116 @@ import jwt
 # Initialize Flask app
 app = Flask(__name__)
 app.config.from_object(Config)
+app.json = MongoJSONProvider(app)
+
+# Request latency per route (registered first so it runs after the other after_request hooks)
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe('http_request_duration_seconds', time.perf_counter() - started,
+                        route=route, method=request.method)
+        metrics.inc('http_requests_total', route=route, method=request.method, status=response.status_code)
+    return response
 
 # Initialize extensions
 CORS(app, origins=["http://localhost:5173", "https://your-frontend-domain.com"])
 mail = Mail(app)
-db_manager = DatabaseManager()
+ResponseCompressor(
+    app,
+    min_size=app.config['COMPRESS_MIN_SIZE'],
+    gzip_level=app.config['COMPRESS_GZIP_LEVEL'],
+    brotli_quality=app.config['COMPRESS_BROTLI_QUALITY']
+)
+menu_cache = MenuCache(
+    app.json.dumps_bytes,
+    lambda: db_manager.find('menu_items', {}),
+    RESTAURANT_TABLES,
+    app.config['MENU_SNAPSHOT_DIR'],
+    check_interval=app.config['MENU_SNAPSHOT_CHECK_INTERVAL']
+)
+cache = db_manager.cache
+coalescer = RequestCoalescer(enabled=app.config['COALESCE_REQUESTS'])
+email_outbox = EmailOutbox(
+    app, mail, app.config['MAIL_OUTBOX_DIR'],
+    maxsize=app.config['MAIL_OUTBOX_MAXSIZE'],
+    workers=app.config['MAIL_OUTBOX_WORKERS'],
+    batch_size=app.config['MAIL_OUTBOX_BATCH_SIZE'],
+    max_retries=app.config['MAIL_OUTBOX_MAX_RETRIES'],
+    retry_delay=app.config['MAIL_OUTBOX_RETRY_DELAY']
+)
+intent_classifier = IntentClassifier(
+    CHATBOT_INTENTS,
+    threshold=app.config['CHATBOT_INTENT_THRESHOLD'],
+    fast_path_intents=app.config['CHATBOT_FAST_PATH_INTENTS']
+)
+menu_retriever = MenuRetriever(
+    lambda: db_manager.find('menu_items', {}),
+    refresh_interval=app.config['CHATBOT_MENU_REFRESH']
+)
+menu_search = MenuSearchIndex(
+    lambda: db_manager.find('menu_items', {}),
+    refresh_interval=app.config['MENU_SEARCH_REFRESH']
+)
+password_hasher = PasswordHasher(
+    app.config['PASSWORD_HASH_METHOD'],
+    workers=app.config['PASSWORD_HASH_WORKERS'],
+    max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+    queue_timeout=app.config['PASSWORD_HASH_QUEUE_TIMEOUT']
+)
+token_verifier = TokenVerifier(
+    app.config['SECRET_KEY'],
+    RevocationList(db_manager, refresh_interval=app.config['AUTH_REVOCATION_REFRESH']),
+    cache_size=app.config['AUTH_TOKEN_CACHE_SIZE']
+)
+
+# Cache and background worker gauges, evaluated when /api/metrics is scraped
+def cache_lookups():
+    verifier = token_verifier.stats()
+    chat = intent_classifier.stats()
+    shared = cache.stats()
+    return {
+        (('cache', 'menu'), ('result', 'hit')): menu_cache.hits,
+        (('cache', 'menu'), ('result', 'miss')): menu_cache.misses,
+        (('cache', 'token'), ('result', 'hit')): verifier['hits'],
+        (('cache', 'token'), ('result', 'miss')): verifier['misses'],
+        (('cache', 'chat_intent'), ('result', 'hit')): chat['fast_path_hits'],
+        (('cache', 'chat_intent'), ('result', 'miss')): chat['messages'] - chat['fast_path_hits'],
+        (('cache', 'data'), ('result', 'l1_hit')): shared['l1_hits'],
+        (('cache', 'data'), ('result', 'l2_hit')): shared['l2_hits'],
+        (('cache', 'data'), ('result', 'miss')): shared['misses']
+    }
+
+def cache_hit_ratio():
+    lookups = cache_lookups()
+    ratios = {}
+    for name in ('menu', 'token', 'chat_intent', 'data'):
+        hits = sum(count for ((_, cache_name), (_, result)), count in lookups.items()
+                   if cache_name == name and result != 'miss')
+        total = hits + lookups[(('cache', name), ('result', 'miss'))]
+        ratios[(('cache', name),)] = hits / total if total else 0.0
+    return ratios
+
+metrics.register_gauge('cache_lookups', 'Cache lookups by cache and result', cache_lookups)
+metrics.register_gauge('cache_hit_ratio', 'Share of cache lookups served from cache', cache_hit_ratio)
+metrics.register_gauge('requests_coalescing', 'Distinct requests currently being computed for coalesced waiters',
+                       coalescer.flight.in_flight)
+metrics.register_gauge('write_buffer_pending', 'Documents waiting for a bulk insert',
+                       lambda: db_manager.write_buffer.stats()['pending'])
+metrics.register_gauge('email_outbox_pending', 'Emails queued or waiting for a retry', email_outbox.pending)
+metrics.register_gauge('menu_snapshot_version', 'Menu snapshot version mapped by this worker',
+                       lambda: menu_cache.stats()['version'])
+metrics.register_gauge('menu_snapshot_bytes', 'Size of the mapped menu snapshot file',
+                       lambda: menu_cache.stats()['bytes'])
+metrics.register_gauge('process_memory_bytes', 'Memory of this worker by kind (Linux)',
+                       lambda: {(('kind', kind),): value for kind, value in process_memory().items()})
+metrics.register_gauge('password_hash_rejected', 'Logins rejected because the hashing pool was full',
+                       lambda: password_hasher.rejected)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -32,30 +153,49 @@ logger = logging.getLogger(__name__)
 
 # Initialize OpenAI for AI chatbot
 openai.api_key = os.getenv('OPENAI_API_KEY')
+if app.config['OPENAI_API_BASE']:
+    openai.api_base = app.config['OPENAI_API_BASE']
 
-# Utility function to convert ObjectId to string
-def serialize_doc(doc):
-    if doc and '_id' in doc:
-        doc['_id'] = str(doc['_id'])
-    return doc
+# Opaque pagination cursors wrapping the (created_at, _id) keyset position
+def encode_cursor(position):
+    if position is None:
+        return None
+    created_at, doc_id = position
+    raw = f"{created_at.isoformat()}|{doc_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
 
-def serialize_docs(docs):
-    return [serialize_doc(doc) for doc in docs]
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for a malformed cursor"""
+    if not cursor:
+        return None
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    created_at, doc_id = raw.split('|')
+    if not ObjectId.is_valid(doc_id):
+        raise ValueError('Invalid cursor id')
+    return datetime.fromisoformat(created_at), ObjectId(doc_id)
 
 # Authentication decorator
+def bearer_token():
+    token = request.headers.get('Authorization')
+    if token and token.startswith('Bearer '):
+        token = token[7:]
+    return token
+
 def token_required(f):
     def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
+        token = bearer_token()
         if not token:
             return jsonify({'error': 'Token is missing'}), 401
         try:
-            if token.startswith('Bearer '):
-                token = token[7:]
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
-            current_user = data['user_id']
-        except:
+            claims = token_verifier.verify(token)
+        except jwt.ExpiredSignatureError:
+            return jsonify({'error': 'Token has expired'}), 401
+        except jwt.InvalidTokenError:
             return jsonify({'error': 'Token is invalid'}), 401
-        return f(current_user, *args, **kwargs)
+        # Decoded claims (user_id, username, role) for the rest of the request
+        g.claims = claims
+        g.token = token
+        return f(claims['user_id'], *args, **kwargs)
     decorated.__name__ = f.__name__
     return decorated
 
@@ -67,10 +207,29 @@ def admin_login():
         username = data.get('username')
         password = data.get('password')
         
+        if not username or not password:
+            return jsonify({'error': 'Username and password are required'}), 400
+        
         # Find admin user
         admin = db_manager.find_one('users', {'username': username, 'role': 'admin'})
         
-        if admin and check_password_hash(admin['password'], password):
+        # Verify in the hashing pool; shed load with 429 when it is saturated
+        try:
+            valid = password_hasher.verify(admin['password'] if admin else None, password)
+        except HasherBusy:
+            response = jsonify({'error': 'Too many login attempts, please retry'})
+            response.headers['Retry-After'] = '1'
+            return response, 429
+        
+        if valid:
+            # Bring older hashes up to the configured method and cost
+            if password_hasher.needs_rehash(admin['password']):
+                try:
+                    db_manager.update_one('users', {'_id': admin['_id']},
+                                          {'$set': {'password': password_hasher.hash(password)}})
+                except HasherBusy:
+                    pass
+            
             # Generate JWT token
             token = jwt.encode({
                 'user_id': str(admin['_id']),
@@ -95,48 +254,71 @@ def admin_login():
         logger.error(f"Login error: {str(e)}")
         return jsonify({'error': 'Login failed'}), 500
 
+@app.route('/api/auth/logout', methods=['POST'])
+@token_required
+def admin_logout(current_user):
+    try:
+        token_verifier.revoke(g.token)
+        return jsonify({'success': True, 'message': 'Logged out'})
+        
+    except Exception as e:
+        logger.error(f"Logout error: {str(e)}")
+        return jsonify({'error': 'Logout failed'}), 500
+
+@app.route('/api/auth/verify', methods=['GET'])
+@token_required
+def verify_token(current_user):
+    return jsonify({
+        'success': True,
+        'user': {
+            'id': g.claims['user_id'],
+            'username': g.claims.get('username'),
+            'role': g.claims.get('role')
+        },
+        'expires_at': g.claims['exp']
+    })
+
 # Reservation Routes
 @app.route('/api/reservations', methods=['POST'])
 def create_reservation():
     try:
         data = request.get_json()
         
-        # Validate required fields
-        required_fields = ['full_name', 'email', 'phone', 'num_people', 'arrival_date', 'arrival_time']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing field: {field}'}), 400
-        
-        # Create reservation document
-        reservation = {
-            'full_name': data['full_name'],
-            'email': data['email'],
-            'phone': data['phone'],
-            'num_people': int(data['num_people']),
-            'arrival_date': data['arrival_date'],
-            'arrival_time': data['arrival_time'],
-            'table_number': data.get('table_number'),
-            'purpose': data.get('purpose', ''),
-            'status': 'confirmed',
-            'total_amount': data.get('total_amount', 0),
-            'created_at': datetime.utcnow(),
-            'updated_at': datetime.utcnow()
-        }
-        
-        # Insert reservation
-        result = db_manager.insert_one('reservations', reservation)
-        reservation['_id'] = str(result.inserted_id)
+        # Validate against the booking rules (shared with the bulk importer)
+        error = validate_reservation(data)
+        if error:
+            return jsonify({'error': error}), 400
+        num_people = int(data['num_people'])
         
-        # Send confirmation email
+        # Claim a table atomically (requested table, or best fit for the party)
+        reservation_id = ObjectId()
+        try:
+            table = db_manager.availability.book(
+                data['arrival_date'], data['arrival_time'], num_people, reservation_id,
+                table_number=data.get('table_number'), section=data.get('section')
+            )
+        except SlotUnavailable as e:
+            return jsonify({'error': str(e)}), 409
+        
+        # Create and insert the reservation; the claim is released unless it landed
+        try:
+            reservation = reservation_document(data, reservation_id, table)
+            db_manager.insert_one('reservations', reservation)
+        except Exception:
+            if not db_manager.find_one('reservations', {'_id': reservation_id}):
+                db_manager.availability.release(data['arrival_date'], data['arrival_time'], table['table_number'])
+            raise
+        
+        # Queue confirmation email (delivered by the outbox workers)
         try:
             send_confirmation_email(reservation)
         except Exception as email_error:
-            logger.warning(f"Email sending failed: {str(email_error)}")
+            logger.warning(f"Email queueing failed: {str(email_error)}")
         
         return jsonify({
             'success': True,
             'message': 'Reservation created successfully',
-            'reservation': serialize_doc(reservation)
+            'reservation': reservation
         })
         
     except Exception as e:
@@ -158,36 +340,255 @@ def get_reservations(current_user):
         if date:
             query['arrival_date'] = date
         
-        # Fetch reservations
-        reservations = list(db_manager.find('reservations', query))
+        try:
+            limit = int(request.args.get('limit', app.config['RESERVATIONS_PAGE_SIZE']))
+            cursor = decode_cursor(request.args.get('cursor'))
+        except (ValueError, UnicodeDecodeError):
+            return jsonify({'error': 'Invalid limit or cursor'}), 400
+        if limit < 1:
+            return jsonify({'error': 'limit must be positive'}), 400
+        
+        # NDJSON mode streams every match page by page with constant memory
+        wants_ndjson = (request.args.get('format') == 'ndjson' or
+                        request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson')
+        if wants_ndjson:
+            def generate():
+                for reservation in db_manager.iter_reservations(query, cursor, app.config['RESERVATIONS_STREAM_BATCH']):
+                    yield app.json.dumps_bytes(reservation) + b'\n'
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+        # Fetch one keyset page
+        reservations, next_position = db_manager.page_reservations(
+            query, min(limit, app.config['RESERVATIONS_MAX_PAGE_SIZE']), cursor
+        )
         return jsonify({
             'success': True,
-            'reservations': serialize_docs(reservations)
+            'reservations': reservations,
+            'next_cursor': encode_cursor(next_position),
+            'has_more': next_position is not None
         })
         
     except Exception as e:
         logger.error(f"Get reservations error: {str(e)}")
         return jsonify({'error': 'Failed to fetch reservations'}), 500
 
-# Menu Management Routes
-@app.route('/api/menu', methods=['GET'])
-def get_menu():
+def queue_imported_confirmation(reservation):
+    """Queue the confirmation email for a bulk-imported reservation, ignoring a full outbox"""
     try:
-        category = request.args.get('category')
+        send_confirmation_email(reservation)
+    except Exception as email_error:
+        logger.warning(f"Email queueing failed: {str(email_error)}")
+
+def bulk_format(default='ndjson'):
+    fmt = request.args.get('format')
+    if not fmt:
+        fmt = 'csv' if request.mimetype == 'text/csv' else default
+    return fmt if fmt in FORMATS else None
+
+@app.route('/api/reservations/import', methods=['POST'])
+@token_required
+def import_reservations(current_user):
+    try:
+        fmt = bulk_format()
+        if fmt is None:
+            return jsonify({'error': 'format must be ndjson or csv'}), 400
+        emails = request.args.get('emails', 'skip')
+        if emails not in ('skip', 'queue'):
+            return jsonify({'error': 'emails must be skip or queue'}), 400
+        try:
+            batch_size = int(request.args.get('batch_size', app.config['BULK_IMPORT_BATCH_SIZE']))
+        except ValueError:
+            return jsonify({'error': 'Invalid batch_size'}), 400
+        if not 1 <= batch_size <= app.config['BULK_IMPORT_MAX_BATCH_SIZE']:
+            return jsonify({'error': f"batch_size must be between 1 and {app.config['BULK_IMPORT_MAX_BATCH_SIZE']}"}), 400
+        
+        # Read the body line by line instead of buffering the whole upload
+        importer = ReservationImporter(
+            db_manager, batch_size,
+            on_created=queue_imported_confirmation if emails == 'queue' else None
+        )
+        report = importer.run(read_records(codecs.iterdecode(request.stream, 'utf-8'), fmt))
+        
+        return jsonify(dict(report, success=True))
+        
+    except Exception as e:
+        logger.error(f"Reservation import error: {str(e)}")
+        return jsonify({'error': 'Failed to import reservations'}), 500
+
+@app.route('/api/reservations/export', methods=['GET'])
+@token_required
+def export_reservations(current_user):
+    try:
+        fmt = bulk_format()
+        if fmt is None:
+            return jsonify({'error': 'format must be ndjson or csv'}), 400
+        
         query = {}
-        if category:
-            query['category'] = category
-            
-        menu_items = list(db_manager.find('menu_items', query))
+        if request.args.get('status'):
+            query['status'] = request.args['status']
+        if request.args.get('date'):
+            query['arrival_date'] = request.args['date']
+        
+        reservations = db_manager.iter_reservations(query, batch_size=app.config['RESERVATIONS_STREAM_BATCH'])
+        response = Response(stream_with_context(export_records(reservations, fmt)),
+                            mimetype='text/csv' if fmt == 'csv' else 'application/x-ndjson')
+        response.headers['Content-Disposition'] = f'attachment; filename=reservations.{fmt}'
+        return response
+        
+    except Exception as e:
+        logger.error(f"Reservation export error: {str(e)}")
+        return jsonify({'error': 'Failed to export reservations'}), 500
+
+@app.route('/api/reservations/<reservation_id>', methods=['DELETE'])
+@token_required
+def cancel_reservation(current_user, reservation_id):
+    try:
+        if not ObjectId.is_valid(reservation_id):
+            return jsonify({'error': 'Invalid reservation id'}), 400
+        
+        reservation = db_manager.cancel_reservation(reservation_id)
+        if not reservation:
+            return jsonify({'error': 'Reservation not found'}), 404
+        
+        return jsonify({
+            'success': True,
+            'message': 'Reservation cancelled',
+            'reservation': reservation
+        })
+        
+    except Exception as e:
+        logger.error(f"Cancel reservation error: {str(e)}")
+        return jsonify({'error': 'Failed to cancel reservation'}), 500
+
+# Table Availability Routes
+@app.route('/api/tables', methods=['GET'])
+def get_tables():
+    try:
+        return jsonify({
+            'success': True,
+            'tables': menu_cache.tables()
+        })
+        
+    except Exception as e:
+        logger.error(f"Get tables error: {str(e)}")
+        return jsonify({'error': 'Failed to fetch tables'}), 500
+
+@app.route('/api/tables/available', methods=['GET'])
+@coalescer.coalesce()
+def get_available_tables():
+    try:
+        date = request.args.get('date')
+        time = request.args.get('time')
+        party_size = request.args.get('party_size', type=int)
+        if not date or not time or not party_size:
+            return jsonify({'error': 'date, time and party_size are required'}), 400
+        if time not in Config.RESERVATION_TIME_SLOTS:
+            return jsonify({'error': 'Invalid time slot'}), 400
+        try:
+            day = datetime.strptime(date, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'date must be YYYY-MM-DD'}), 400
+        # Every date checked loads an occupancy grid, so only bookable dates get that far
+        today = datetime.utcnow().date()
+        if not today <= day <= today + timedelta(days=Config.MAX_RESERVATION_DAYS_ADVANCE):
+            return jsonify({'error': f'date must be within the next {Config.MAX_RESERVATION_DAYS_ADVANCE} days'}), 400
+        
+        tables = db_manager.get_available_tables(day.isoformat(), time, party_size)
+        return jsonify({
+            'success': True,
+            'tables': tables
+        })
+        
+    except Exception as e:
+        logger.error(f"Table availability error: {str(e)}")
+        return jsonify({'error': 'Failed to check table availability'}), 500
+
+@app.route('/api/availability/calendar', methods=['GET'])
+@coalescer.coalesce()
+def get_availability_calendar():
+    try:
+        start = request.args.get('start')
+        days = request.args.get('days', type=int)
+        try:
+            start = datetime.strptime(start, '%Y-%m-%d').date() if start else None
+        except ValueError:
+            return jsonify({'error': 'start must be YYYY-MM-DD'}), 400
+        today = datetime.utcnow().date()
+        if start and not today <= start <= today + timedelta(days=Config.MAX_RESERVATION_DAYS_ADVANCE):
+            return jsonify({'error': f'start must be within the next {Config.MAX_RESERVATION_DAYS_ADVANCE} days'}), 400
+        if days is not None and days < 1:
+            return jsonify({'error': 'days must be at least 1'}), 400
+        
+        calendar = db_manager.calendar
         return jsonify({
             'success': True,
-            'menu_items': serialize_docs(menu_items)
+            'time_slots': Config.RESERVATION_TIME_SLOTS,
+            'party_size_buckets': calendar.buckets,
+            'availability': calendar.get(start, days)
         })
         
+    except Exception as e:
+        logger.error(f"Availability calendar error: {str(e)}")
+        return jsonify({'error': 'Failed to build availability calendar'}), 500
+
+# Menu Management Routes
+@app.route('/api/menu', methods=['GET'])
+@coalescer.coalesce(vary=('If-None-Match',))
+def get_menu():
+    try:
+        # Serve the pre-serialized body from the shared snapshot; clients revalidate with If-None-Match
+        snapshot = menu_cache.get(request.args.get('category'))
+        if request.if_none_match.contains_weak(snapshot.etag):
+            response = app.response_class(status=304)
+        else:
+            response = app.response_class(snapshot.body, mimetype='application/json')
+        response.set_etag(snapshot.etag)
+        response.cache_control.no_cache = True
+        return response
+        
     except Exception as e:
         logger.error(f"Get menu error: {str(e)}")
         return jsonify({'error': 'Failed to fetch menu'}), 500
 
+@app.route('/api/menu/search', methods=['GET'])
+@coalescer.coalesce()
+def search_menu():
+    try:
+        is_veg = request.args.get('is_veg')
+        if is_veg not in (None, 'true', 'false'):
+            return jsonify({'error': 'is_veg must be true or false'}), 400
+        try:
+            filters = {
+                key: float(request.args[key]) if key in request.args else None
+                for key in ('min_price', 'max_price', 'min_rating')
+            }
+            limit = int(request.args.get('limit', app.config['MENU_SEARCH_PAGE_SIZE']))
+            offset = int(request.args.get('offset', 0))
+        except ValueError:
+            return jsonify({'error': 'Invalid number in min_price, max_price, min_rating, limit or offset'}), 400
+        if limit < 1 or offset < 0:
+            return jsonify({'error': 'limit must be positive and offset not negative'}), 400
+        limit = min(limit, app.config['MENU_SEARCH_MAX_PAGE_SIZE'])
+        
+        results, total = menu_search.search(
+            request.args.get('q', ''),
+            is_veg=None if is_veg is None else is_veg == 'true',
+            category=request.args.get('category'),
+            limit=limit, offset=offset, **filters
+        )
+        return jsonify({
+            'success': True,
+            'results': results,
+            'total': total,
+            'offset': offset,
+            'limit': limit,
+            'has_more': offset + len(results) < total
+        })
+        
+    except Exception as e:
+        logger.error(f"Menu search error: {str(e)}")
+        return jsonify({'error': 'Failed to search menu'}), 500
+
 @app.route('/api/menu', methods=['POST'])
 @token_required
 def add_menu_item(current_user):
@@ -213,13 +614,15 @@ def add_menu_item(current_user):
             'created_at': datetime.utcnow()
         }
         
-        result = db_manager.insert_one('menu_items', menu_item)
-        menu_item['_id'] = str(result.inserted_id)
+        db_manager.insert_one('menu_items', menu_item)
+        menu_cache.bump()
+        menu_retriever.add(menu_item)
+        menu_search.add(menu_item)
         
         return jsonify({
             'success': True,
             'message': 'Menu item added successfully',
-            'menu_item': serialize_doc(menu_item)
+            'menu_item': menu_item
         })
         
     except Exception as e:
@@ -227,21 +630,13 @@ def add_menu_item(current_user):
         return jsonify({'error': 'Failed to add menu item'}), 500
 
 # AI Chatbot Routes
-@app.route('/api/ai-chat', methods=['POST'])
-def ai_chat():
-    try:
-        data = request.get_json()
-        user_message = data.get('message', '')
-        
-        if not user_message:
-            return jsonify({'error': 'Message is required'}), 400
-        
-        # Get restaurant context
-        menu_items = list(db_manager.find('menu_items', {}))
-        menu_context = ", ".join([item['name'] for item in menu_items[:10]])
-        
-        # Create AI prompt
-        system_prompt = f"""You are DINE24's AI assistant, a helpful restaurant chatbot. 
+def build_chat_messages(user_message):
+    # Get restaurant context: only the menu items relevant to this message
+    relevant_items = menu_retriever.search(user_message, k=app.config['CHATBOT_CONTEXT_ITEMS'])
+    menu_context = format_menu_context(relevant_items)
+    
+    # Create AI prompt
+    system_prompt = f"""You are DINE24's AI assistant, a helpful restaurant chatbot. 
         Our menu includes: {menu_context}
         
         Help customers with:
@@ -251,17 +646,109 @@ def ai_chat():
         - General dining queries
         
         Be friendly, professional, and focus on food and dining topics."""
-        
-        # Call OpenAI API
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
+    
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_message}
+    ]
+
+def sse_event(data, event=None):
+    payload = f"data: {json.dumps(data)}\n\n"
+    return f"event: {event}\n{payload}" if event else payload
+
+def stream_chat(user_message, match):
+    """Relay completion tokens as Server-Sent Events, logging the chat once finished"""
+    if match:
+        yield sse_event({'token': match.response})
+        yield sse_event({'response': match.response, 'source': 'intent', 'intent': match.intent}, event='done')
+        return
+    
+    chunks = []
+    started = time.perf_counter()
+    try:
+        completion = openai.ChatCompletion.create(
+            model=app.config['CHATBOT_MODEL'],
+            messages=build_chat_messages(user_message),
             max_tokens=200,
-            temperature=0.7
+            temperature=0.7,
+            stream=True
         )
+        for chunk in completion:
+            token = chunk.choices[0].delta.get('content')
+            if token:
+                if not chunks:
+                    metrics.observe('upstream_request_duration_seconds', time.perf_counter() - started,
+                                    service='openai', operation='chat_stream_first_token')
+                chunks.append(token)
+                yield sse_event({'token': token})
+        metrics.observe('upstream_request_duration_seconds', time.perf_counter() - started,
+                        service='openai', operation='chat_stream')
+    except Exception as e:
+        metrics.inc('upstream_errors_total', service='openai', operation='chat_stream')
+        logger.error(f"AI chat stream error: {str(e)}")
+        yield sse_event({'error': 'AI service temporarily unavailable'}, event='error')
+        return
+    
+    ai_response = ''.join(chunks)
+    db_manager.buffered_insert('chat_logs', {
+        'user_message': user_message,
+        'ai_response': ai_response,
+        'source': 'llm',
+        'streamed': True,
+        'timestamp': datetime.utcnow()
+    })
+    yield sse_event({'response': ai_response, 'source': 'llm'}, event='done')
+
+@app.route('/api/ai-chat', methods=['POST'])
+def ai_chat():
+    try:
+        data = request.get_json()
+        user_message = data.get('message', '')
+        
+        if not user_message:
+            return jsonify({'error': 'Message is required'}), 400
+        
+        streaming = data.get('stream') or request.accept_mimetypes.best == 'text/event-stream'
+        
+        # Answer confident greeting/hours/reservation intents locally
+        match = intent_classifier.classify(user_message)
+        if match:
+            db_manager.buffered_insert('chat_logs', {
+                'user_message': user_message,
+                'ai_response': match.response,
+                'source': 'intent',
+                'intent': match.intent,
+                'timestamp': datetime.utcnow()
+            })
+            if not streaming:
+                return jsonify({
+                    'success': True,
+                    'response': match.response,
+                    'source': 'intent',
+                    'intent': match.intent,
+                    'confidence': round(match.confidence, 3)
+                })
+        
+        # Streaming mode: relay tokens to the client as they arrive
+        if streaming:
+            response = Response(stream_with_context(stream_chat(user_message, match)),
+                                mimetype='text/event-stream')
+            response.headers['Cache-Control'] = 'no-cache'
+            response.headers['X-Accel-Buffering'] = 'no'
+            return response
+        
+        # Call OpenAI API
+        try:
+            with metrics.timer('upstream_request_duration_seconds', service='openai', operation='chat'):
+                response = openai.ChatCompletion.create(
+                    model=app.config['CHATBOT_MODEL'],
+                    messages=build_chat_messages(user_message),
+                    max_tokens=200,
+                    temperature=0.7
+                )
+        except Exception:
+            metrics.inc('upstream_errors_total', service='openai', operation='chat')
+            raise
         
         ai_response = response.choices[0].message.content
         
@@ -269,13 +756,15 @@ def ai_chat():
         chat_log = {
             'user_message': user_message,
             'ai_response': ai_response,
+            'source': 'llm',
             'timestamp': datetime.utcnow()
         }
-        db_manager.insert_one('chat_logs', chat_log)
+        db_manager.buffered_insert('chat_logs', chat_log)
         
         return jsonify({
             'success': True,
-            'response': ai_response
+            'response': ai_response,
+            'source': 'llm'
         })
         
     except Exception as e:
@@ -285,52 +774,110 @@ def ai_chat():
 # Analytics Routes
 @app.route('/api/analytics', methods=['GET'])
 @token_required
+@coalescer.coalesce()
+@cache.cached_response(tags=('reservations', 'menu_items'))
 def get_analytics(current_user):
     try:
-        # Get basic analytics
-        total_reservations = db_manager.count('reservations')
-        total_menu_items = db_manager.count('menu_items')
-        
-        # Recent reservations
-        recent_reservations = list(db_manager.find(
-            'reservations', 
-            {}, 
-            sort=[('created_at', -1)], 
-            limit=5
-        ))
-        
-        # Popular menu items
-        popular_items = list(db_manager.find(
-            'menu_items', 
-            {}, 
-            sort=[('orders_placed', -1)], 
-            limit=5
-        ))
+        # Served from the incrementally maintained materializations
+        analytics = db_manager.analytics.snapshot()
         
         return jsonify({
             'success': True,
-            'analytics': {
-                'total_reservations': total_reservations,
-                'total_menu_items': total_menu_items,
-                'recent_reservations': serialize_docs(recent_reservations),
-                'popular_items': serialize_docs(popular_items)
-            }
+            'analytics': analytics
         })
         
     except Exception as e:
         logger.error(f"Analytics error: {str(e)}")
         return jsonify({'error': 'Failed to fetch analytics'}), 500
 
-# Email utility function
-def send_confirmation_email(reservation):
+@app.route('/api/analytics/timeseries', methods=['GET'])
+@token_required
+@coalescer.coalesce()
+@cache.cached_response(tags=('reservations',))
+def get_analytics_timeseries(current_user):
     try:
-        msg = Message(
-            subject=f"Reservation Confirmed - DINE24 Restaurant",
-            sender=app.config['MAIL_USERNAME'],
-            recipients=[reservation['email']]
-        )
+        granularity = request.args.get('granularity', 'day')
+        if granularity not in ('day', 'hour'):
+            return jsonify({'error': 'granularity must be day or hour'}), 400
+        
+        try:
+            end = datetime.strptime(request.args.get('end', datetime.utcnow().strftime('%Y-%m-%d')), '%Y-%m-%d')
+            start = datetime.strptime(request.args.get('start', (end - timedelta(days=29)).strftime('%Y-%m-%d')), '%Y-%m-%d')
+        except ValueError:
+            return jsonify({'error': 'start and end must be YYYY-MM-DD dates'}), 400
+        
+        if start > end:
+            return jsonify({'error': 'start must not be after end'}), 400
+        if granularity == 'hour' and (end - start).days >= app.config['ANALYTICS_HOURLY_MAX_DAYS']:
+            return jsonify({'error': f"Hourly ranges are limited to {app.config['ANALYTICS_HOURLY_MAX_DAYS']} days"}), 400
+        if (end - start).days >= app.config['ANALYTICS_DAILY_MAX_DAYS']:
+            return jsonify({'error': f"Ranges are limited to {app.config['ANALYTICS_DAILY_MAX_DAYS']} days"}), 400
+        
+        rows = db_manager.rollups.query(start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'), granularity)
+        return jsonify({
+            'success': True,
+            'granularity': granularity,
+            'start': start.strftime('%Y-%m-%d'),
+            'end': end.strftime('%Y-%m-%d'),
+            'series': rows
+        })
         
-        msg.html = f"""
+    except Exception as e:
+        logger.error(f"Analytics timeseries error: {str(e)}")
+        return jsonify({'error': 'Failed to fetch analytics timeseries'}), 500
+
+@app.cli.command('reservations-import')
+@click.argument('path', type=click.File('r', encoding='utf-8'))
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), default=None, help='Defaults to the file extension')
+@click.option('--batch-size', default=Config.BULK_IMPORT_BATCH_SIZE, show_default=True)
+@click.option('--emails', type=click.Choice(['skip', 'queue']), default='skip', show_default=True)
+def reservations_import(path, fmt, batch_size, emails):
+    """Import reservations from an NDJSON or CSV file ('-' for stdin)"""
+    fmt = fmt or ('csv' if path.name.endswith('.csv') else 'ndjson')
+    importer = ReservationImporter(
+        db_manager, batch_size,
+        on_created=queue_imported_confirmation if emails == 'queue' else None
+    )
+    report = importer.run(read_records(path, fmt))
+    for error in report['errors']:
+        print(f"line {error['line']}: {error['error']}")
+    print(f"Imported {report['imported']} reservations, {report['failed']} failed")
+    db_manager.write_buffer.flush()
+    if emails == 'queue':
+        email_outbox.stop()
+    if report['failed']:
+        raise SystemExit(1)
+
+@app.cli.command('reservations-export')
+@click.argument('path', type=click.File('w', encoding='utf-8'))
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), default=None, help='Defaults to the file extension')
+@click.option('--status', default=None)
+def reservations_export(path, fmt, status):
+    """Export reservations, newest first, to an NDJSON or CSV file ('-' for stdout)"""
+    fmt = fmt or ('csv' if path.name.endswith('.csv') else 'ndjson')
+    query = {'status': status} if status else {}
+    for chunk in export_records(db_manager.iter_reservations(query, batch_size=Config.RESERVATIONS_STREAM_BATCH), fmt):
+        path.write(chunk)
+
+@app.cli.command('analytics-rollup')
+def analytics_rollup():
+    """Recompute the per-day and per-hour rollups for the whole retention window"""
+    print(f"Wrote {db_manager.rollups.rebuild()} rollup documents")
+
+@app.cli.command('analytics-verify')
+def analytics_verify():
+    """Compare the live analytics materializations with a full recomputation"""
+    mismatches = db_manager.analytics.verify()
+    if not mismatches:
+        print("Analytics materializations match a full recomputation")
+        return
+    for key, values in mismatches.items():
+        print(f"{key}: live={values['live']} expected={values['expected']}")
+    raise SystemExit(1)
+
+# Email utility function
+def send_confirmation_email(reservation):
+    html = f"""
         <h2>Reservation Confirmed!</h2>
         <p>Dear {reservation['full_name']},</p>
         <p>Your table reservation has been confirmed.</p>
@@ -346,13 +893,16 @@ def send_confirmation_email(reservation):
         <p>Thank you for choosing DINE24!</p>
         <p>Contact: +91 98765 43210</p>
         """
-        
-        mail.send(msg)
-        logger.info(f"Confirmation email sent to {reservation['email']}")
-        
-    except Exception as e:
-        logger.error(f"Email sending error: {str(e)}")
-        raise
+    
+    queued = email_outbox.enqueue(
+        subject="Reservation Confirmed - DINE24 Restaurant",
+        sender=app.config['MAIL_USERNAME'],
+        recipients=[reservation['email']],
+        html=html
+    )
+    if not queued:
+        raise RuntimeError("Email outbox is full")
+    logger.info(f"Confirmation email queued for {reservation['email']}")
 
 # Error handlers
 @app.errorhandler(404)
@@ -363,6 +913,15 @@ def not_found(error):
 def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
+# Metrics (Prometheus text format; ?format=json for percentile summaries)
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    if app.config['METRICS_TOKEN'] and bearer_token() != app.config['METRICS_TOKEN']:
+        return jsonify({'error': 'Token is invalid'}), 401
+    if request.args.get('format') == 'json':
+        return jsonify(metrics.snapshot())
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
 # Health check
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -380,7 +939,7 @@ if __name__ == '__main__':
         if not admin_exists:
             admin_user = {
                 'username': 'admin',
-                'password': generate_password_hash('admin123'),
+                'password': password_hasher.hash('admin123'),
                 'role': 'admin',
                 'email': 'admin@dine24.com',
                 'created_at': datetime.utcnow()
@@ -0,0 +1,142 @@
+"""
+DINE24 Restaurant Management System - Token Verification
+Cached JWT verification with a revocation list shared through the database
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import jwt
+from pymongo.errors import DuplicateKeyError
+
+
+def token_digest(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class RevocationList:
+    """Digests of revoked tokens, mirrored from the revoked_tokens collection
+
+    revoke() adds to the local set immediately and records the digest in the
+    database. Other workers pick it up on their next refresh, at most
+    refresh_interval seconds later, by reading the rows revoked since skew
+    before the newest one they saw; the overlap catches inserts that commit
+    after a later one was read, and rows seen twice collapse on the digest.
+    Entries are dropped once the token would have expired anyway, locally on
+    refresh and from the collection on every revoke().
+    """
+
+    def __init__(self, db_manager, refresh_interval=5.0, skew=timedelta(seconds=60)):
+        self.db_manager = db_manager
+        self.refresh_interval = refresh_interval
+        self.skew = skew
+        self._revoked = {}
+        self._last_seen = datetime.min
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._refreshed_at is not None and now - self._refreshed_at < self.refresh_interval:
+            return
+        with self._lock:
+            if self._refreshed_at is not None and now - self._refreshed_at < self.refresh_interval:
+                return
+            since = max(self._last_seen, datetime.min + self.skew) - self.skew
+            cutoff = datetime.utcnow()
+            for doc in self.db_manager.find('revoked_tokens', {'revoked_at': {'$gte': since}}):
+                if doc['expires_at'] >= cutoff:
+                    self._revoked[doc['_id']] = doc['expires_at']
+                self._last_seen = max(self._last_seen, doc['revoked_at'])
+            for digest in [digest for digest, expires_at in self._revoked.items() if expires_at < cutoff]:
+                del self._revoked[digest]
+            self._refreshed_at = now
+
+    def revoke(self, digest, expires_at):
+        """Revoke a token (by digest) until its expiry timestamp"""
+        expires_at = datetime.utcfromtimestamp(expires_at)
+        with self._lock:
+            self._revoked[digest] = expires_at
+        try:
+            self.db_manager.insert_one('revoked_tokens', {
+                '_id': digest,
+                'expires_at': expires_at,
+                'revoked_at': datetime.utcnow()
+            })
+        except DuplicateKeyError:
+            pass
+        self.db_manager.delete_many('revoked_tokens', {'expires_at': {'$lt': datetime.utcnow()}})
+
+    def is_revoked(self, digest):
+        self._refresh()
+        return digest in self._revoked
+
+    def __len__(self):
+        return len(self._revoked)
+
+
+class TokenVerifier:
+    """JWT verification with a bounded LRU of already-verified tokens
+
+    The cache is keyed by the token's SHA-256 digest and holds the decoded
+    claims until the token's exp, so repeated requests with the same token
+    skip the HMAC check and claim parsing. Revocation is checked on every
+    call, cached or not.
+    """
+
+    def __init__(self, secret, revocations, algorithms=('HS256',), cache_size=1024):
+        self.secret = secret
+        self.revocations = revocations
+        self.algorithms = list(algorithms)
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, digest):
+        with self._lock:
+            entry = self._cache.get(digest)
+            if entry is None:
+                return None
+            if entry['exp'] <= time.time():
+                del self._cache[digest]
+                return None
+            self._cache.move_to_end(digest)
+            return entry
+
+    def verify(self, token):
+        """Return the token's claims; raises jwt.InvalidTokenError if invalid, expired or revoked"""
+        digest = token_digest(token)
+        claims = self._cached(digest)
+        if claims is None:
+            self.misses += 1
+            claims = jwt.decode(token, self.secret, algorithms=self.algorithms, options={'require': ['exp']})
+            with self._lock:
+                self._cache[digest] = claims
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        else:
+            self.hits += 1
+        if self.revocations.is_revoked(digest):
+            raise jwt.InvalidTokenError('Token has been revoked')
+        return claims
+
+    def revoke(self, token):
+        """Revoke a valid token for the rest of its lifetime"""
+        claims = self.verify(token)
+        digest = token_digest(token)
+        self.revocations.revoke(digest, claims['exp'])
+        with self._lock:
+            self._cache.pop(digest, None)
+
+    def stats(self):
+        return {
+            'cached': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'revoked': len(self.revocations)
+        }
@@ -0,0 +1,256 @@
+"""
+DINE24 Restaurant Management System - Table Availability Engine
+Per-day occupancy bitmaps over restaurant tables x reservation time slots
+"""
+
+import threading
+import time as clock
+from datetime import datetime, timedelta
+
+import numpy as np
+from pymongo.errors import DuplicateKeyError
+
+
+class SlotUnavailable(Exception):
+    """Raised when no table can be booked for the requested slot"""
+
+
+class TableAvailability:
+    """Occupancy grid with O(1) conflict checks and best-fit table assignment
+
+    Tables are numbered by ascending seating capacity, so bit i of a slot mask
+    is the i-th smallest table and the lowest free bit among the tables that
+    fit a party is the best fit. Each day holds one integer mask per slot.
+    Bookings are claimed in the table_slots collection under a deterministic
+    _id, so two workers racing for the same table get a duplicate key error
+    instead of a double booking. Grids are reloaded after grid_ttl seconds to
+    pick up claims made and released by other workers.
+    """
+
+    def __init__(self, db_manager, tables, time_slots, slot_span=1, grid_ttl=5):
+        self.db_manager = db_manager
+        self.time_slots = list(time_slots)
+        self.slot_span = max(1, slot_span)
+        self.grid_ttl = grid_ttl
+        self.tables = sorted(tables, key=lambda table: table['seating_capacity'])
+        self._table_bits = {table['table_number']: 1 << i for i, table in enumerate(self.tables)}
+        self._slot_index = {slot: i for i, slot in enumerate(self.time_slots)}
+        self._section_masks = {}
+        for table in self.tables:
+            self._section_masks.setdefault(table['section'], 0)
+            self._section_masks[table['section']] |= self._table_bits[table['table_number']]
+        largest = self.tables[-1]['seating_capacity'] if self.tables else 0
+        self._fit_masks = [
+            sum(bit for number, bit in self._table_bits.items()
+                if self.table(number)['seating_capacity'] >= party_size)
+            for party_size in range(largest + 1)
+        ]
+        self._days = {}
+        self._lock = threading.Lock()
+        self.listeners = []
+
+    def table(self, table_number):
+        for table in self.tables:
+            if table['table_number'] == table_number:
+                return table
+        return None
+
+    # Grid Maintenance
+    def _day(self, date):
+        """Return the slot masks for a date, reloading claims once they are grid_ttl old
+
+        Other workers book and release through table_slots without touching
+        this worker's grids, so a grid is only trusted for grid_ttl seconds.
+        """
+        now = clock.monotonic()
+        entry = self._days.get(date)
+        if entry is None or now - entry[0] >= self.grid_ttl:
+            grid = [0] * len(self.time_slots)
+            for claim in self.db_manager.find('table_slots', {'date': date}):
+                slot = self._slot_index.get(claim['time'])
+                if slot is not None and claim['table_number'] in self._table_bits:
+                    grid[slot] |= self._table_bits[claim['table_number']]
+            today = datetime.utcnow().date().isoformat()
+            for stale in [day for day, (loaded_at, _) in self._days.items()
+                          if day < today or now - loaded_at >= self.grid_ttl]:
+                del self._days[stale]
+            entry = self._days[date] = (now, grid)
+        return entry[1]
+
+    def _span(self, time):
+        start = self._slot_index.get(time)
+        if start is None:
+            raise SlotUnavailable(f"{time} is not a reservation time slot")
+        return range(start, min(start + self.slot_span, len(self.time_slots)))
+
+    def _mark(self, grid, time, table_number, occupied):
+        bit = self._table_bits.get(table_number)
+        if bit is None or time not in self._slot_index:
+            return
+        for slot in self._span(time):
+            grid[slot] = grid[slot] | bit if occupied else grid[slot] & ~bit
+
+    def _occupied(self, grid, time):
+        mask = 0
+        for slot in self._span(time):
+            mask |= grid[slot]
+        return mask
+
+    def _free_mask(self, grid, time, party_size):
+        if party_size >= len(self._fit_masks):
+            return 0
+        return self._fit_masks[max(party_size, 0)] & ~self._occupied(grid, time)
+
+    def forget(self, date):
+        """Drop the cached grid for a date so it is reloaded from the claims"""
+        with self._lock:
+            self._days.pop(date, None)
+        self._notify(date)
+
+    def _notify(self, date):
+        for listener in self.listeners:
+            listener(date)
+
+    # Queries
+    def is_free(self, date, time, table_number):
+        with self._lock:
+            bit = self._table_bits.get(table_number)
+            return bit is not None and not self._occupied(self._day(date), time) & bit
+
+    def available_tables(self, date, time, party_size):
+        """Tables that fit the party and are free for the slot, smallest first"""
+        with self._lock:
+            free = self._free_mask(self._day(date), time, party_size)
+        return [dict(table, is_available=True) for i, table in enumerate(self.tables) if free >> i & 1]
+
+    # Booking
+    def book(self, date, time, party_size, reservation_id, table_number=None, section=None):
+        """Atomically claim a table for the slot and return it
+
+        A requested table_number is booked only if it is free and large enough;
+        otherwise the smallest free table that fits is chosen, preferring the
+        requested section.
+        """
+        with self._lock:
+            grid = self._day(date)
+            while True:
+                free = self._free_mask(grid, time, party_size)
+                if table_number is not None:
+                    candidates = free & self._table_bits.get(table_number, 0)
+                    if not candidates:
+                        raise SlotUnavailable(f"Table {table_number} is not available at {date} {time}")
+                else:
+                    candidates = free & self._section_masks.get(section, 0) or free
+                    if not candidates:
+                        raise SlotUnavailable(f"No table for {party_size} available at {date} {time}")
+                chosen = self.tables[(candidates & -candidates).bit_length() - 1]
+                try:
+                    self._claim(date, time, chosen['table_number'], reservation_id)
+                except DuplicateKeyError:
+                    # Another worker claimed it first; record that and try the next table
+                    self._mark(grid, time, chosen['table_number'], True)
+                    continue
+                self._mark(grid, time, chosen['table_number'], True)
+                break
+        self._notify(date)
+        return dict(chosen)
+
+    def _claim(self, date, time, table_number, reservation_id):
+        claimed = []
+        try:
+            for slot in self._span(time):
+                claim_time = self.time_slots[slot]
+                self.db_manager.insert_one('table_slots', {
+                    '_id': f"{date}|{claim_time}|{table_number}",
+                    'date': date,
+                    'time': claim_time,
+                    'table_number': table_number,
+                    'reservation_id': reservation_id
+                })
+                claimed.append(claim_time)
+        except DuplicateKeyError:
+            for claim_time in claimed:
+                self.db_manager.delete_one('table_slots', {'_id': f"{date}|{claim_time}|{table_number}"})
+            raise
+
+    def release(self, date, time, table_number):
+        """Free a previously booked table for the slot"""
+        with self._lock:
+            for slot in self._span(time):
+                self.db_manager.delete_one('table_slots', {'_id': f"{date}|{self.time_slots[slot]}|{table_number}"})
+            if date in self._days:
+                self._mark(self._days[date][1], time, table_number, False)
+        self._notify(date)
+
+
+class AvailabilityCalendar:
+    """Free-table counts for every day x time slot x party-size bucket
+
+    Claims for the requested window are turned into a boolean occupancy tensor
+    (day, slot, table) with one fancy-indexed assignment, and free counts per
+    bucket come from a single matrix product with the table-fits-bucket matrix.
+    Results are cached per day and dropped whenever a booking or cancellation
+    for that day goes through the TableAvailability engine.
+    """
+
+    def __init__(self, availability, max_days_ahead, ttl=60):
+        self.availability = availability
+        self.max_days_ahead = max_days_ahead
+        self.ttl = ttl
+        tables = availability.tables
+        self.buckets = sorted({table['seating_capacity'] for table in tables})
+        capacities = np.array([table['seating_capacity'] for table in tables], dtype=np.int16)
+        self._fits = (capacities[:, None] >= np.array(self.buckets, dtype=np.int16)[None, :]).astype(np.int16)
+        self._table_index = {table['table_number']: i for i, table in enumerate(tables)}
+        self._days = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        availability.listeners.append(self.invalidate)
+
+    def invalidate(self, date):
+        with self._lock:
+            self._generation += 1
+            self._days.pop(date, None)
+
+    def _compute(self, dates):
+        """Vectorized free counts for a list of ISO dates, shape (days, slots, buckets)"""
+        engine = self.availability
+        day_index = {day: i for i, day in enumerate(dates)}
+        claims = list(engine.db_manager.find('table_slots', {'date': {'$gte': dates[0], '$lte': dates[-1]}}))
+        days = np.fromiter((day_index.get(claim['date'], -1) for claim in claims), dtype=np.int32, count=len(claims))
+        slots = np.fromiter((engine._slot_index.get(claim['time'], -1) for claim in claims), dtype=np.int32, count=len(claims))
+        tables = np.fromiter((self._table_index.get(claim['table_number'], -1) for claim in claims), dtype=np.int32, count=len(claims))
+        valid = (days >= 0) & (slots >= 0) & (tables >= 0)
+
+        occupied = np.zeros((len(dates), len(engine.time_slots), len(engine.tables)), dtype=bool)
+        occupied[days[valid], slots[valid], tables[valid]] = True
+        return (~occupied).astype(np.int16) @ self._fits
+
+    def get(self, start=None, days=None):
+        """Return {date: [[free tables per bucket] per slot]} for the window"""
+        today = datetime.utcnow().date()
+        start = start or today
+        first, last = today.isoformat(), (today + timedelta(days=self.max_days_ahead)).isoformat()
+        # The window never runs past the booking horizon
+        days = max(1, min(days or self.max_days_ahead + 1, (today - start).days + self.max_days_ahead + 1))
+        dates = [(start + timedelta(days=offset)).isoformat() for offset in range(days)]
+        now = clock.monotonic()
+
+        with self._lock:
+            # Evict expired entries and days that left the booking window
+            for stale in [day for day, entry in self._days.items()
+                          if now - entry[0] >= self.ttl or not first <= day <= last]:
+                del self._days[stale]
+            cached = {day: entry[1] for day, entry in self._days.items()}
+            generation = self._generation
+        missing = [day for day in dates if day not in cached]
+        if missing:
+            counts = self._compute(missing)
+            with self._lock:
+                # Skip caching if a booking landed while the window was computed
+                keep = generation == self._generation
+                for i, day in enumerate(missing):
+                    cached[day] = counts[i].tolist()
+                    if keep:
+                        self._days[day] = (now, cached[day])
+        return {day: cached[day] for day in dates}
@@ -0,0 +1,29 @@
+"""
+DINE24 Restaurant Management System - Benchmark WSGI Entry Point
+The app with synthetic data seeded at import, for gunicorn runs started by benchmarks/run.py
+
+With preload_app the master seeds the database once before forking. The
+in-memory backend runs a single worker (gunicorn.conf.py refuses more);
+export DATABASE_BACKEND=mongodb to benchmark several. Volumes come from BENCH_RESERVATIONS,
+BENCH_MENU_ITEMS and BENCH_CHAT_LOGS.
+
+Usage: gunicorn -c gunicorn.conf.py --pythonpath benchmarks bench_app:app
+"""
+
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db_manager
+from seed import seed, warm_up
+
+seed(
+    db_manager,
+    reservations=int(os.environ.get('BENCH_RESERVATIONS', 0)),
+    menu_items=int(os.environ.get('BENCH_MENU_ITEMS', 0)),
+    chat_logs=int(os.environ.get('BENCH_CHAT_LOGS', 0))
+)
+warm_up(db_manager)
+logging.getLogger().setLevel(logging.WARNING)
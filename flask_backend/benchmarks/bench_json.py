@@ -0,0 +1,112 @@
+"""
+DINE24 Restaurant Management System - JSON Serialization Benchmark
+Legacy serialize_docs + jsonify versus MongoJSONProvider on reservation payloads
+
+Usage: python benchmarks/bench_json.py [--docs 10000] [--repeat 20]
+"""
+
+import argparse
+import gzip
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from flask import Flask, jsonify
+
+import json_provider
+from json_provider import MongoJSONProvider
+
+
+def make_reservations(count):
+    base = datetime(2026, 1, 1, 12, 0)
+    return [{
+        '_id': ObjectId(),
+        'full_name': f'Guest {i}',
+        'email': f'guest{i}@example.com',
+        'phone': f'+91 98765 {i:05d}',
+        'num_people': 1 + i % 8,
+        'arrival_date': (base + timedelta(days=i % 60)).strftime('%Y-%m-%d'),
+        'arrival_time': '19:30',
+        'table_number': f'A{1 + i % 5}',
+        'table_capacity': 4,
+        'section': 'Main Dining',
+        'purpose': 'dining',
+        'status': 'confirmed',
+        'total_amount': Decimal('1250.50'),
+        'created_at': base + timedelta(minutes=i),
+        'updated_at': base + timedelta(minutes=i)
+    } for i in range(count)]
+
+
+def legacy_serialize_docs(docs):
+    """The pre-provider path: stringify _id in place before jsonify"""
+    for doc in docs:
+        if doc and '_id' in doc:
+            doc['_id'] = str(doc['_id'])
+    return docs
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def run(docs_count, repeat):
+    docs = make_reservations(docs_count)
+    results = {}
+
+    legacy_app = Flask('legacy')
+    with legacy_app.app_context():
+        # Documents must be copied each run because the legacy path mutates them
+        def legacy():
+            payload = legacy_serialize_docs([dict(doc) for doc in docs])
+            return jsonify({'success': True, 'reservations': payload}).get_data()
+        results['legacy_serialize_docs_jsonify'] = timed(legacy, repeat)
+
+    provider_app = Flask('provider')
+    provider_app.json = MongoJSONProvider(provider_app)
+    with provider_app.app_context():
+        def provider():
+            return jsonify({'success': True, 'reservations': docs}).get_data()
+        if json_provider.orjson is not None:
+            results['provider_orjson'] = timed(provider, repeat)
+        fast, json_provider.orjson = json_provider.orjson, None
+        try:
+            results['provider_stdlib'] = timed(provider, repeat)
+        finally:
+            json_provider.orjson = fast
+
+    body = results['provider_stdlib'][1]
+    for level in (1, 6):
+        results[f'gzip_level_{level}'] = timed(lambda: gzip.compress(body, compresslevel=level), repeat)
+    try:
+        import brotli
+        results['brotli_quality_5'] = timed(lambda: brotli.compress(body, quality=5), repeat)
+    except ImportError:
+        pass
+
+    baseline = results['legacy_serialize_docs_jsonify'][0]
+    print(f"{docs_count} documents, median of {repeat} runs")
+    print(f"{'path':32} {'ms':>9} {'bytes':>10} {'vs legacy':>10}")
+    for name, (seconds, output) in results.items():
+        ratio = f"{baseline / seconds:.1f}x" if not name.startswith(('gzip', 'brotli')) else ''
+        print(f"{name:32} {seconds * 1000:9.2f} {len(output):10d} {ratio:>10}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--docs', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    run(args.docs, args.repeat)
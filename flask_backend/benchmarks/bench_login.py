@@ -0,0 +1,117 @@
+"""
+DINE24 Restaurant Management System - Login Storm Benchmark
+Login throughput and /api/health latency while many logins run concurrently
+
+Runs the app in-process (memory backend) with its test client: login threads
+hammer /api/auth/login while a probe thread times /api/health. Modes:
+inline hashes on the request threads (the previous behaviour), pool uses the
+bounded process pool.
+
+Usage: python benchmarks/bench_login.py [--threads 16] [--duration 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_BACKEND', 'memory')
+
+import app as app_module
+from passwords import PasswordHasher
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_mode(name, hasher, threads, duration):
+    app_module.password_hasher = hasher
+    app = app_module.app
+    stop = threading.Event()
+    counts = {'ok': 0, 'busy': 0, 'other': 0}
+    login_latencies = []
+    probe_latencies = []
+    lock = threading.Lock()
+
+    def login_loop():
+        client = app.test_client()
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = client.post('/api/auth/login', json={'username': 'bench', 'password': 'bench-password'})
+            elapsed = time.perf_counter() - start
+            if stop.is_set():
+                break  # finished after the measurement window
+            key = 'ok' if response.status_code == 200 else 'busy' if response.status_code == 429 else 'other'
+            with lock:
+                counts[key] += 1
+                if key == 'ok':
+                    login_latencies.append(elapsed)
+
+    def probe_loop():
+        client = app.test_client()
+        while not stop.is_set():
+            start = time.perf_counter()
+            client.get('/api/health')
+            probe_latencies.append(time.perf_counter() - start)
+            time.sleep(0.01)
+
+    workers = [threading.Thread(target=login_loop) for _ in range(threads)]
+    workers.append(threading.Thread(target=probe_loop))
+    for worker in workers:
+        worker.start()
+    time.sleep(duration)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    hasher.shutdown()
+
+    return {
+        'mode': name,
+        'logins_per_second': counts['ok'] / duration,
+        'rejected_429': counts['busy'],
+        'errors': counts['other'],
+        'login_p50_ms': percentile(login_latencies, 0.5) * 1000,
+        'health_p50_ms': statistics.median(probe_latencies) * 1000 if probe_latencies else 0.0,
+        'health_p99_ms': percentile(probe_latencies, 0.99) * 1000,
+        'health_samples': len(probe_latencies)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--workers', type=int, default=app_module.Config.PASSWORD_HASH_WORKERS)
+    args = parser.parse_args()
+
+    config = app_module.Config
+    method = config.PASSWORD_HASH_METHOD
+    app_module.db_manager.insert_one('users', {
+        'username': 'bench',
+        'password': PasswordHasher(method, workers=0).hash('bench-password'),
+        'role': 'admin'
+    })
+
+    # Only request threads can saturate the inline mode, so it gets no cap
+    modes = [
+        ('inline', PasswordHasher(method, workers=0, max_pending=args.threads, queue_timeout=None)),
+        ('pool', PasswordHasher(method, workers=args.workers, max_pending=config.PASSWORD_HASH_MAX_PENDING,
+                                queue_timeout=config.PASSWORD_HASH_QUEUE_TIMEOUT))
+    ]
+    print(f"{args.threads} login threads, {args.duration:g}s per mode, method {method}")
+    print(f"{'mode':8} {'logins/s':>9} {'429s':>6} {'login p50':>10} {'health p50':>11} {'health p99':>11}")
+    for name, hasher in modes:
+        result = run_mode(name, hasher, args.threads, args.duration)
+        print(f"{result['mode']:8} {result['logins_per_second']:9.1f} {result['rejected_429']:6d} "
+              f"{result['login_p50_ms']:8.1f}ms {result['health_p50_ms']:9.2f}ms {result['health_p99_ms']:9.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
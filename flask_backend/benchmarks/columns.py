@@ -0,0 +1,131 @@
+"""
+DINE24 Restaurant Management System - Reservation Representation Benchmark
+Memory and scan time of reservation dicts versus ReservationColumns
+
+Generates the same synthetic reservations as the endpoint benchmark and
+compares, for each representation: resident size (tracemalloc), the
+AnalyticsStore aggregation and the AnalyticsRollups extract. Times are the
+best of --repeat runs.
+
+Usage: python benchmarks/columns.py [--reservations 100000] [--repeat 5] [--output results.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from analytics import AnalyticsRollups, AnalyticsStore
+from config import Config, RESTAURANT_TABLES
+from reservation_store import ReservationColumns
+from seed import generate_reservations
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def traced_size(build):
+    """Bytes still allocated once build() returns, while its result is alive"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+class ListCollection:
+    """Just enough of DatabaseManager for AnalyticsRollups._extract"""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, collection, query=None):
+        return iter(self.documents)
+
+
+def dict_aggregate(store, documents):
+    # AnalyticsStore.rebuild before ReservationColumns: one _add_reservation per document in created_at order
+    store._clear()
+    for document in sorted(documents, key=lambda doc: doc.get('created_at') or datetime.min):
+        store._add_reservation(document)
+
+
+def dict_extract(rollups, documents):
+    # AnalyticsRollups._extract before ReservationColumns: one list per field, then pandas coercion
+    columns = {field: [] for field in rollups.FIELDS}
+    for document in documents:
+        for field, values in columns.items():
+            values.append(document.get(field))
+    frame = pd.DataFrame(columns)
+    frame['num_people'] = pd.to_numeric(frame['num_people'], errors='coerce').fillna(0).astype(int)
+    frame['total_amount'] = pd.to_numeric(frame['total_amount'], errors='coerce').fillna(0.0)
+    frame['hour'] = frame['arrival_time'].astype(str).str[:2]
+    frame['section'] = frame['table_number'].map(rollups.table_sections)
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--reservations', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='also write the results as JSON')
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+
+    def generate():
+        return generate_reservations(args.reservations, random.Random(24), now)
+
+    results = {'reservations': args.reservations, 'memory_bytes': {}, 'seconds': {}}
+    results['memory_bytes']['dicts'] = traced_size(lambda: list(generate()))
+    results['memory_bytes']['columns'] = traced_size(lambda: ReservationColumns.from_documents(generate()))
+
+    documents = list(generate())
+    store = AnalyticsStore(lambda: documents, lambda: [], len(RESTAURANT_TABLES), len(Config.RESERVATION_TIME_SLOTS))
+    scan_columns = ReservationColumns.from_documents(documents, AnalyticsStore.SCAN_FIELDS)
+    rollups = AnalyticsRollups(ListCollection(documents), RESTAURANT_TABLES, Config.RESERVATION_TIME_SLOTS)
+
+    def columns_aggregate():
+        store._clear()
+        store._add_columns(scan_columns)
+
+    timings = results['seconds']
+    timings['build_columns'] = best_of(args.repeat, lambda: ReservationColumns.from_documents(documents))
+    timings['analytics_dicts'] = best_of(args.repeat, lambda: dict_aggregate(store, documents))
+    timings['analytics_columns_scan'] = best_of(args.repeat, columns_aggregate)
+    timings['analytics_columns_rebuild'] = best_of(args.repeat, store.rebuild)
+    timings['rollup_extract_dicts'] = best_of(args.repeat, lambda: dict_extract(rollups, documents))
+    timings['rollup_extract_columns'] = best_of(args.repeat, lambda: rollups._extract({}))
+
+    memory = results['memory_bytes']
+    print(f"{args.reservations} reservations")
+    print(f"memory   dicts {memory['dicts'] / 2 ** 20:8.1f} MiB   columns {memory['columns'] / 2 ** 20:8.1f} MiB"
+          f"   ({memory['dicts'] / max(memory['columns'], 1):.1f}x smaller)")
+    for name, seconds in timings.items():
+        print(f"{name:28s} {seconds * 1000:9.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(dict(results, started_at=now.isoformat() + 'Z'), f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
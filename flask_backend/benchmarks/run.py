@@ -0,0 +1,543 @@
+"""
+DINE24 Restaurant Management System - Endpoint Benchmark Suite
+Seeds synthetic volumes and drives every API endpoint through the Flask test client and a local gunicorn
+
+Runs offline: OpenAI and SMTP are served by the local fakes (fake_openai.py,
+fake_smtp.py) and the database is the in-memory backend. Each scenario runs
+for --duration seconds (or until its request cap) with --concurrency client
+threads and reports throughput, status codes and latency percentiles. The
+results are saved as JSON so two runs can be diffed with --compare.
+
+Usage: python benchmarks/run.py [--mode both] [--reservations 100000] [--menu-items 500] [--chat-logs 1000000]
+       python benchmarks/run.py --compare results/before.json results/after.json
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import logging
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+import jwt
+
+import fake_openai
+import fake_smtp
+
+RESULTS_VERSION = 1
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Scenario:
+    """One endpoint call pattern; path and body may be callables of the request number"""
+
+    def __init__(self, name, method, path, body=None, auth=False, limit=None, content_type='application/json'):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.auth = auth
+        self.limit = limit
+        self.content_type = content_type
+
+    def build(self, n, tokens):
+        path = self.path(n) if callable(self.path) else self.path
+        body = self.body(n) if callable(self.body) else self.body
+        headers = {'Accept-Encoding': 'gzip'}
+        if body is not None:
+            if not isinstance(body, (bytes, str)):
+                body = json.dumps(body)
+            headers['Content-Type'] = self.content_type
+        if self.auth:
+            headers['Authorization'] = f'Bearer {tokens.fresh(n) if self.auth == "fresh" else tokens.shared}'
+        return self.method, path, headers, body
+
+
+class Tokens:
+    """Admin JWTs signed like /api/auth/login does, so scenarios skip the password check"""
+
+    def __init__(self, secret, username):
+        self.secret = secret
+        self.username = username
+        self.shared = self.fresh(-1)
+
+    def fresh(self, n):
+        # A distinct token per request, for scenarios that revoke the token they use
+        return jwt.encode({
+            'user_id': 'benchmark',
+            'username': self.username,
+            'role': 'admin',
+            'bench_request': n,
+            'exp': datetime.utcnow() + timedelta(hours=2)
+        }, self.secret, algorithm='HS256')
+
+
+def build_scenarios(config, reservations):
+    """Every route, in an order where writes do not disturb the reads measured before them"""
+    from seed import ADMIN_PASSWORD, ADMIN_USERNAME, reservation_id
+    today = datetime.utcnow().date()
+    slots = config.RESERVATION_TIME_SLOTS
+    tables_per_slot = 12
+
+    def day(offset):
+        return (today + timedelta(days=offset)).strftime('%Y-%m-%d')
+
+    def booking(n, first_day):
+        # Fills every table of a (date, slot) before moving on, so no request gets a 409
+        return {
+            'full_name': f'Bench Guest {n}',
+            'email': f'bench{n}@example.com',
+            'phone': '+91 9876543210',
+            'num_people': 2,
+            'arrival_date': day(first_day + n // (len(slots) * tables_per_slot)),
+            'arrival_time': slots[n % len(slots)],
+            'purpose': 'dining'
+        }
+
+    def import_body(n):
+        return ''.join(json.dumps(booking(n * 20 + k, 400)) + '\n' for k in range(20))
+
+    scenarios = [
+        Scenario('health', 'GET', '/api/health'),
+        Scenario('menu', 'GET', '/api/menu'),
+        Scenario('menu_category', 'GET', '/api/menu?category=Main%20Course'),
+        Scenario('menu_search', 'GET', '/api/menu/search?q=panee%20tika&is_veg=true&limit=20'),
+        Scenario('tables_available', 'GET',
+                 lambda n: f'/api/tables/available?date={day(1 + n % 30)}&time={slots[n % len(slots)]}&party_size=4'),
+        Scenario('availability_calendar', 'GET', '/api/availability/calendar?days=30'),
+        Scenario('auth_verify', 'GET', '/api/auth/verify', auth=True),
+        Scenario('auth_login', 'POST', '/api/auth/login',
+                 body={'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD}, limit=20),
+        Scenario('reservations_page', 'GET', '/api/reservations?limit=50', auth=True),
+        Scenario('reservations_page_status', 'GET', '/api/reservations?status=cancelled&limit=50', auth=True),
+        Scenario('reservations_ndjson', 'GET', '/api/reservations?status=completed&format=ndjson', auth=True, limit=20),
+        Scenario('reservations_export_csv', 'GET', '/api/reservations/export?status=cancelled&format=csv',
+                 auth=True, limit=20),
+        Scenario('analytics', 'GET', '/api/analytics', auth=True),
+        Scenario('analytics_timeseries_day', 'GET', f'/api/analytics/timeseries?start={day(-364)}&end={day(0)}',
+                 auth=True),
+        Scenario('analytics_timeseries_hour', 'GET',
+                 f'/api/analytics/timeseries?granularity=hour&start={day(-6)}&end={day(0)}', auth=True),
+        Scenario('chat_intent', 'POST', '/api/ai-chat', body={'message': 'Hello!'}),
+        Scenario('chat_llm', 'POST', '/api/ai-chat', body={'message': 'Suggest a spicy vegetarian dish'}, limit=200),
+        Scenario('chat_stream', 'POST', '/api/ai-chat',
+                 body={'message': 'Suggest a spicy vegetarian dish', 'stream': True}, limit=200),
+        Scenario('reservation_create', 'POST', '/api/reservations', body=lambda n: booking(n, 1), limit=5000),
+        Scenario('reservations_import', 'POST', '/api/reservations/import?format=ndjson', body=import_body,
+                 auth=True, limit=200, content_type='application/x-ndjson'),
+        Scenario('menu_create', 'POST', '/api/menu', auth=True, limit=500, body=lambda n: {
+            'name': f'Bench Special {n}', 'category': 'Main Course', 'price': 349, 'is_veg': n % 2 == 0
+        }),
+        Scenario('metrics', 'GET', '/api/metrics'),
+        Scenario('auth_logout', 'POST', '/api/auth/logout', auth='fresh', limit=2000)
+    ]
+    if reservations:
+        scenarios.append(Scenario('reservation_cancel', 'DELETE',
+                                  lambda n: f'/api/reservations/{reservation_id(n % reservations)}',
+                                  auth=True, limit=reservations))
+    return scenarios
+
+
+# Targets
+class ClientTarget:
+    """In-process requests through the Flask test client (one client per thread)"""
+    name = 'client'
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def send(self, method, path, headers, body):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(path, method=method, headers=headers, data=body)
+        size = len(response.get_data())  # drains streamed responses
+        response.close()
+        return response.status_code, size
+
+
+class HTTPTarget:
+    """Requests over keep-alive HTTP connections (one per thread)
+
+    A connection idle for longer than idle_timeout is replaced rather than
+    reused, since gunicorn drops keep-alive connections after its keepalive
+    setting (2 seconds by default).
+    """
+    name = 'gunicorn'
+
+    def __init__(self, host, port, idle_timeout=1.0, timeout=60):
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def send(self, method, path, headers, body):
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None and time.monotonic() - self.local.used_at > self.idle_timeout:
+            connection.close()
+            connection = None
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            size = len(response.read())
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self.local.connection = None
+            raise
+        self.local.used_at = time.monotonic()
+        return response.status, size
+
+
+# Measurement
+def percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted sample"""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(latencies, statuses, errors, elapsed, size):
+    ordered = sorted(latencies)
+    completed = len(ordered)
+    summary = {
+        'requests': completed,
+        'errors': errors + sum(count for status, count in statuses.items() if int(status) >= 500),
+        'status': dict(sorted(statuses.items())),
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(completed / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(sum(ordered) / completed * 1000, 3) if completed else 0.0,
+        'max_ms': round(ordered[-1] * 1000, 3) if completed else 0.0,
+        'bytes_per_request': size // completed if completed else 0
+    }
+    for q in PERCENTILES:
+        summary[f'p{q}_ms'] = round(percentile(ordered, q) * 1000, 3)
+    return summary
+
+
+def run_scenario(target, scenario, tokens, concurrency, duration, max_requests, warmup):
+    """Time one scenario; warm-up requests use up request numbers but are not recorded"""
+    numbers = itertools.count()
+    cap = min(filter(None, (scenario.limit, max_requests)), default=None)
+    for _ in range(min(warmup, cap or warmup)):
+        try:
+            target.send(*scenario.build(next(numbers), tokens))
+        except Exception:
+            pass
+    if cap is not None:
+        cap += min(warmup, cap)
+
+    latencies = []
+    statuses = Counter()
+    totals = {'errors': 0, 'bytes': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        local_latencies = []
+        local_statuses = Counter()
+        local_errors = local_bytes = 0
+        while time.perf_counter() < deadline:
+            n = next(numbers)
+            if cap is not None and n >= cap:
+                break
+            request = scenario.build(n, tokens)
+            start = time.perf_counter()
+            try:
+                status, size = target.send(*request)
+            except Exception:
+                local_errors += 1
+                continue
+            local_latencies.append(time.perf_counter() - start)
+            local_statuses[str(status)] += 1
+            local_bytes += size
+        with lock:
+            latencies.extend(local_latencies)
+            statuses.update(local_statuses)
+            totals['errors'] += local_errors
+            totals['bytes'] += local_bytes
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, statuses, totals['errors'], time.perf_counter() - started, totals['bytes'])
+
+
+def run_target(target, scenarios, tokens, args):
+    results = {}
+    print(f"\n[{target.name}] {args.concurrency} threads, {args.duration:g}s per scenario")
+    print(f"{'scenario':28} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'requests':>9} {'non-2xx':>8}")
+    for scenario in scenarios:
+        result = run_scenario(target, scenario, tokens, args.concurrency, args.duration, args.requests, args.warmup)
+        results[scenario.name] = result
+        failed = sum(count for status, count in result['status'].items() if not status.startswith(('2', '3')))
+        print(f"{scenario.name:28} {result['throughput_rps']:9.1f} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} "
+              f"{result['p99_ms']:9.2f} {result['requests']:9d} {failed + result['errors']:8d}")
+    return results
+
+
+# Servers
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(args, log):
+    port = free_port()
+    env = dict(
+        os.environ,
+        GUNICORN_BIND=f'127.0.0.1:{port}',
+        GUNICORN_WORKERS=str(args.workers),
+        GUNICORN_THREADS=str(args.threads),
+        BENCH_RESERVATIONS=str(args.reservations),
+        BENCH_MENU_ITEMS=str(args.menu_items),
+        BENCH_CHAT_LOGS=str(args.chat_logs)
+    )
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--pythonpath', BENCH_DIR, 'bench_app:app'],
+        cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    deadline = time.monotonic() + args.startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/api/health')
+            if connection.getresponse().status == 200:
+                return process, port
+        except OSError:
+            time.sleep(0.5)
+    process.kill()
+    log.seek(0)
+    raise RuntimeError('gunicorn did not become ready:\n' + log.read().decode('utf-8', 'replace')[-4000:])
+
+
+def stop_gunicorn(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def worker_memory(process):
+    """process_memory() of each gunicorn worker, keyed by pid (Linux)"""
+    from metrics import process_memory
+    try:
+        with open(f'/proc/{process.pid}/task/{process.pid}/children') as f:
+            pids = f.read().split()
+    except OSError:
+        return {}
+    return {pid: process_memory(pid) for pid in pids}
+
+
+def menu_refresh_latency(port, tokens, workers, timeout=10.0):
+    """Seconds from a menu write until every worker serves the new menu
+
+    Polls GET /api/menu over new connections, which land on arbitrary
+    workers, until 20 x workers responses in a row carry a new ETag, and
+    reports when the old one was last seen. None if that takes over timeout.
+    """
+    def send(method, path, headers=None, body=None):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        try:
+            connection.request(method, path, body=body, headers=headers or {})
+            response = connection.getresponse()
+            response.read()
+            return response
+        finally:
+            connection.close()
+
+    old_etag = send('GET', '/api/menu').getheader('ETag')
+    response = send('POST', '/api/menu', {'Content-Type': 'application/json', 'Authorization': f'Bearer {tokens.shared}'},
+                    json.dumps({'name': 'Bench Refresh Probe', 'category': 'Main Course', 'price': 99}))
+    if response.status != 200:
+        return None
+    written = last_old = time.perf_counter()
+    streak = 0
+    while streak < 20 * workers:
+        if time.perf_counter() - written > timeout:
+            return None
+        if send('GET', '/api/menu').getheader('ETag') == old_etag:
+            last_old, streak = time.perf_counter(), 0
+        else:
+            streak += 1
+    return round(last_old - written, 4)
+
+
+# Results
+def git_revision():
+    def git(*command):
+        return subprocess.run(['git', *command], cwd=BACKEND_DIR, capture_output=True, text=True).stdout.strip()
+    try:
+        return {'commit': git('rev-parse', 'HEAD'), 'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+    except OSError:
+        return {'commit': None, 'dirty': None}
+
+
+def environment():
+    try:
+        import orjson
+        orjson_version = orjson.__version__
+    except ImportError:
+        orjson_version = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'orjson': orjson_version
+    }
+
+
+def compare(old_path, new_path, threshold):
+    """Print per-scenario deltas between two result files; returns the number of regressions"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"old: {old['git']['commit'][:12] if old['git']['commit'] else '?'} {old['started_at']}")
+    print(f"new: {new['git']['commit'][:12] if new['git']['commit'] else '?'} {new['started_at']}")
+    regressions = 0
+    for mode in new['modes']:
+        if mode not in old['modes']:
+            continue
+        print(f"\n[{mode}]")
+        print(f"{'scenario':28} {'req/s old':>10} {'new':>10} {'delta':>8} {'p99 old':>9} {'new':>9} {'delta':>8}")
+        for name, after in new['modes'][mode].items():
+            before = old['modes'][mode].get(name)
+            if before is None:
+                continue
+            rps = (after['throughput_rps'] - before['throughput_rps']) / before['throughput_rps'] if before['throughput_rps'] else 0.0
+            p99 = (after['p99_ms'] - before['p99_ms']) / before['p99_ms'] if before['p99_ms'] else 0.0
+            regressed = rps < -threshold or p99 > threshold
+            regressions += regressed
+            print(f"{name:28} {before['throughput_rps']:10.1f} {after['throughput_rps']:10.1f} {rps:+8.1%} "
+                  f"{before['p99_ms']:9.2f} {after['p99_ms']:9.2f} {p99:+8.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--mode', choices=['client', 'gunicorn', 'both'], default='both')
+    parser.add_argument('--reservations', type=int, default=100000)
+    parser.add_argument('--menu-items', type=int, default=500)
+    parser.add_argument('--chat-logs', type=int, default=1000000)
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per scenario')
+    parser.add_argument('--requests', type=int, default=None, help='cap on requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=4, help='client threads')
+    parser.add_argument('--warmup', type=int, default=3, help='untimed requests before each scenario')
+    parser.add_argument('--only', default=None, help='comma-separated scenario names')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='gunicorn workers (more than one needs DATABASE_BACKEND=mongodb)')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+    parser.add_argument('--openai-latency', type=float, default=0.05, help='fake OpenAI time to first token')
+    parser.add_argument('--startup-timeout', type=float, default=600.0)
+    parser.add_argument('--output', default=None, help='defaults to benchmarks/results/<time>-<commit>.json')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='diff two result files and exit')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative change flagged by --compare')
+    args = parser.parse_args()
+
+    if args.compare:
+        raise SystemExit(1 if compare(*args.compare, args.threshold) else 0)
+
+    # Local fakes; configured through the environment before the app reads its config
+    openai_server = fake_openai.serve(0, chunks=20, delay=0.002, first_token_delay=args.openai_latency,
+                                      background=True)
+    smtp_server = fake_smtp.serve(0, background=True)
+    os.environ.setdefault('DATABASE_BACKEND', 'memory')  # gunicorn refuses --workers > 1 on 'memory'
+    os.environ.update({
+        'OPENAI_API_BASE': f'http://127.0.0.1:{openai_server.server_address[1]}/v1',
+        'OPENAI_API_KEY': 'benchmark',
+        'MAIL_SERVER': '127.0.0.1',
+        'MAIL_PORT': str(smtp_server.server_address[1]),
+        'MAIL_USE_TLS': 'false',
+        'MAIL_OUTBOX_DIR': tempfile.mkdtemp(prefix='dine24-bench-mail-'),
+        'METRICS_TOKEN': ''
+    })
+    os.environ.setdefault('CACHE_TYPE', 'simple')  # export CACHE_TYPE=redis and REDIS_URL to include the L2
+
+    # Imported only now: config reads the environment at import time
+    from config import Config
+    from seed import ADMIN_USERNAME, seed, warm_up
+    tokens = Tokens(Config.SECRET_KEY, ADMIN_USERNAME)
+    scenarios = build_scenarios(Config, args.reservations)
+    if args.only:
+        wanted = set(args.only.split(','))
+        scenarios = [scenario for scenario in scenarios if scenario.name in wanted]
+
+    started_at = datetime.utcnow()
+    git = git_revision()
+    results = {
+        'version': RESULTS_VERSION,
+        'started_at': started_at.isoformat() + 'Z',
+        'git': git,
+        'environment': environment(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('compare', 'output')},
+        'seed': {},
+        'modes': {}
+    }
+
+    if args.mode in ('client', 'both'):
+        import app as app_module
+        seed_started = time.perf_counter()
+        results['seed'] = seed(app_module.db_manager, args.reservations, args.menu_items, args.chat_logs)
+        warm_up(app_module.db_manager)
+        results['seed']['seconds'] = round(time.perf_counter() - seed_started, 2)
+        logging.getLogger().setLevel(logging.WARNING)
+        print(f"Seeded {args.reservations} reservations, {args.menu_items} menu items, "
+              f"{args.chat_logs} chat logs in {results['seed']['seconds']}s")
+        results['modes']['client'] = run_target(ClientTarget(app_module.app), scenarios, tokens, args)
+        app_module.email_outbox.stop()
+
+    if args.mode in ('gunicorn', 'both'):
+        with tempfile.TemporaryFile() as log:
+            server_started = time.perf_counter()
+            process, port = start_gunicorn(args, log)
+            results['gunicorn_startup_seconds'] = round(time.perf_counter() - server_started, 2)
+            print(f"gunicorn ready on port {port} after {results['gunicorn_startup_seconds']}s "
+                  f"({args.workers} workers x {args.threads} threads)")
+            try:
+                results['modes']['gunicorn'] = run_target(HTTPTarget('127.0.0.1', port), scenarios, tokens, args)
+                results['gunicorn_worker_memory'] = worker_memory(process)
+                results['menu_refresh_seconds'] = menu_refresh_latency(port, tokens, args.workers)
+                for pid, memory in results['gunicorn_worker_memory'].items():
+                    print(f"worker {pid}: " + ', '.join(f"{kind} {value / 2 ** 20:.1f} MiB" for kind, value in memory.items()))
+                print(f"Menu write visible on every worker after {results['menu_refresh_seconds']}s")
+            finally:
+                stop_gunicorn(process)
+
+    results['emails_delivered'] = smtp_server.delivered
+    output = args.output or os.path.join(
+        BENCH_DIR, 'results',
+        f"{started_at.strftime('%Y%m%dT%H%M%S')}-{(git['commit'] or 'nogit')[:12]}{'-dirty' if git['dirty'] else ''}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == '__main__':
+    main()
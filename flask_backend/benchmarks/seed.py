@@ -0,0 +1,133 @@
+"""
+DINE24 Restaurant Management System - Benchmark Data Seeding
+Deterministic synthetic reservations, menu items and chat logs inserted in bulk
+
+Reservation _ids are derived from their index (reservation_id(n)), so a load
+generator can address seeded documents without reading them back. Seeded
+reservations carry a table_number but claim no table_slots, so the booking
+grid stays free for the create_reservation scenario.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from werkzeug.security import generate_password_hash
+
+from config import Config, MENU_CATEGORIES, RESTAURANT_TABLES
+
+ADMIN_USERNAME = 'bench-admin'
+ADMIN_PASSWORD = 'bench-password'
+
+DISHES = ['Paneer Tikka', 'Butter Chicken', 'Dal Makhani', 'Veg Biryani', 'Fish Curry', 'Masala Dosa',
+          'Tandoori Prawns', 'Palak Paneer', 'Mutton Rogan Josh', 'Gulab Jamun', 'Mango Lassi', 'Filter Coffee']
+STYLES = ['Classic', 'Spicy', 'Smoked', 'Chef Special', 'Homestyle', 'Royal', 'Street', 'Coastal']
+CHAT_MESSAGES = [
+    ('Hello!', 'greeting'), ('What are your opening hours?', 'hours'), ('Can I book a table for four?', 'reservation'),
+    ('Suggest a spicy vegetarian dish', None), ('Do you have gluten free desserts?', None),
+    ('What goes well with biryani?', None)
+]
+
+
+def reservation_id(n):
+    """_id of the n-th seeded reservation"""
+    return ObjectId(f'{n + 1:024x}')
+
+
+def _batches(documents, batch_size):
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_reservations(count, rng, now):
+    # Arrival dates cover the analytics retention window plus the booking horizon
+    days_back = Config.ANALYTICS_RETENTION_DAYS
+    days_span = days_back + Config.MAX_RESERVATION_DAYS_ADVANCE
+    slots = Config.RESERVATION_TIME_SLOTS
+    for n in range(count):
+        table = RESTAURANT_TABLES[n % len(RESTAURANT_TABLES)]
+        arrival = now.date() + timedelta(days=rng.randrange(days_span) - days_back)
+        created_at = now - timedelta(seconds=(count - n) * 60)
+        roll = rng.random()
+        yield {
+            '_id': reservation_id(n),
+            'full_name': f'Guest {n}',
+            'email': f'guest{n}@example.com',
+            'phone': f'+91 98{n % 100000000:08d}',
+            'num_people': rng.randint(1, table['seating_capacity']),
+            'arrival_date': arrival.strftime('%Y-%m-%d'),
+            'arrival_time': slots[rng.randrange(len(slots))],
+            'table_number': table['table_number'],
+            'table_capacity': table['seating_capacity'],
+            'section': table['section'],
+            'purpose': 'dining',
+            'status': 'cancelled' if roll < 0.1 else 'completed' if roll < 0.15 else 'confirmed',
+            'total_amount': round(rng.uniform(400, 6000), 2),
+            'created_at': created_at,
+            'updated_at': created_at
+        }
+
+
+def generate_menu_items(count, rng, now):
+    for n in range(count):
+        price = rng.randrange(99, 1499)
+        yield {
+            'name': f'{STYLES[n % len(STYLES)]} {DISHES[n % len(DISHES)]} {n}',
+            'category': MENU_CATEGORIES[n % len(MENU_CATEGORIES)],
+            'price': float(price),
+            'offer_price': float(price - 50) if n % 7 == 0 else None,
+            'rating': round(rng.uniform(3.0, 5.0), 1),
+            'is_veg': n % 3 != 0,
+            'quantity': '1 plate',
+            'orders_placed': rng.randrange(2000),
+            'created_at': now
+        }
+
+
+def generate_chat_logs(count, rng, now):
+    for n in range(count):
+        message, intent = CHAT_MESSAGES[n % len(CHAT_MESSAGES)]
+        document = {
+            'user_message': message,
+            'ai_response': 'Thanks for reaching out to DINE24!',
+            'source': 'intent' if intent else 'llm',
+            'timestamp': now - timedelta(seconds=count - n)
+        }
+        if intent:
+            document['intent'] = intent
+        yield document
+
+
+def seed(db_manager, reservations=0, menu_items=0, chat_logs=0, batch_size=5000, random_seed=24):
+    """Insert the requested volumes through db_manager.insert_many; returns the counts inserted"""
+    rng = random.Random(random_seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    if db_manager.find_one('users', {'username': ADMIN_USERNAME}) is None:
+        db_manager.insert_one('users', {
+            'username': ADMIN_USERNAME,
+            'password': generate_password_hash(ADMIN_PASSWORD, method=Config.PASSWORD_HASH_METHOD),
+            'role': 'admin',
+            'created_at': now
+        })
+    volumes = (
+        ('reservations', reservations, generate_reservations),
+        ('menu_items', menu_items, generate_menu_items),
+        ('chat_logs', chat_logs, generate_chat_logs)
+    )
+    for collection, count, generate in volumes:
+        for batch in _batches(generate(count, rng, now), batch_size):
+            db_manager.insert_many(collection, batch)
+    return {collection: count for collection, count, _ in volumes}
+
+
+def warm_up(db_manager):
+    """Build the lazily loaded materializations so the first timed request does not pay for them"""
+    db_manager.analytics.snapshot()
+    db_manager.rollups.refresh()
+    db_manager.calendar.get()
@@ -0,0 +1,238 @@
+"""
+DINE24 Restaurant Management System - Bulk Reservation Import/Export
+Streaming NDJSON/CSV readers and writers with batched validation and inserts
+"""
+
+import csv
+import io
+import json
+import math
+from datetime import datetime
+
+from bson import ObjectId
+from config import Config
+from availability import SlotUnavailable
+
+REQUIRED_FIELDS = ['full_name', 'email', 'phone', 'num_people', 'arrival_date', 'arrival_time']
+
+# Columns written by the export; the importer reads the booking fields, status and created_at and ignores the rest
+EXPORT_FIELDS = [
+    '_id', 'full_name', 'email', 'phone', 'num_people', 'arrival_date', 'arrival_time',
+    'table_number', 'section', 'purpose', 'total_amount', 'status', 'created_at'
+]
+
+FORMATS = ('ndjson', 'csv')
+
+# Imported status -> whether the booking holds its table
+STATUSES = {'confirmed': True, 'cancelled': False}
+
+
+# Validation shared with POST /api/reservations
+def validate_reservation(data, config=Config):
+    """Check a reservation payload against the booking rules; returns an error message or None"""
+    if not isinstance(data, dict):
+        return 'Record must be an object'
+    for field in REQUIRED_FIELDS:
+        if data.get(field) in (None, ''):
+            return f'Missing field: {field}'
+    try:
+        num_people = int(data['num_people'])
+    except (TypeError, ValueError):
+        return 'Invalid party size'
+    if not config.MIN_PARTY_SIZE <= num_people <= config.MAX_PARTY_SIZE:
+        return 'Invalid party size'
+    try:
+        datetime.strptime(str(data['arrival_date']), '%Y-%m-%d')
+    except ValueError:
+        return 'Invalid arrival date'
+    if data['arrival_time'] not in config.RESERVATION_TIME_SLOTS:
+        return 'Invalid arrival time'
+    if data.get('total_amount') not in (None, ''):
+        try:
+            total_amount = float(data['total_amount'])
+        except (TypeError, ValueError):
+            return 'Invalid total amount'
+        if not math.isfinite(total_amount) or total_amount < 0:
+            return 'Invalid total amount'
+    return None
+
+
+def validate_imported(data):
+    """Check the exported-only fields an import may carry; returns an error message or None"""
+    if data.get('status', 'confirmed') not in STATUSES:
+        return f"Invalid status (expected one of {', '.join(STATUSES)})"
+    if data.get('created_at') not in (None, ''):
+        try:
+            datetime.fromisoformat(str(data['created_at']))
+        except ValueError:
+            return 'Invalid created_at'
+    return None
+
+
+def reservation_document(data, reservation_id, table, status='confirmed', created_at=None):
+    """Reservation document for validated data and the table booked for it"""
+    now = datetime.utcnow()
+    return {
+        '_id': reservation_id,
+        'full_name': data['full_name'],
+        'email': data['email'],
+        'phone': data['phone'],
+        'num_people': int(data['num_people']),
+        'arrival_date': data['arrival_date'],
+        'arrival_time': data['arrival_time'],
+        'table_number': table['table_number'],
+        'table_capacity': table['seating_capacity'],
+        'section': table['section'],
+        'purpose': data.get('purpose') or '',
+        'status': status,
+        'total_amount': float(data.get('total_amount') or 0),
+        'created_at': created_at or now,
+        'updated_at': now
+    }
+
+
+# Reading
+def read_records(lines, fmt='ndjson'):
+    """Yield (line_number, record) from NDJSON or CSV text lines
+
+    A line that cannot be parsed yields a ValueError in place of the record,
+    so one bad line is reported without aborting the rest of the stream.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, {field: value for field, value in row.items() if field and value != ''}
+        return
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, ValueError(f'Invalid JSON: {e}')
+
+
+class ReservationImporter:
+    """Validate and insert reservation records in batches
+
+    Each batch is validated with the same rules as the single-booking route and
+    every valid record claims its table through the availability grid. Records
+    keep the status and created_at of an export; cancelled bookings keep their
+    table number without claiming it. The batch is then written with one
+    insert_many. If that write fails, the claims of the documents that did not
+    land are released.
+    on_created is called for each stored confirmed reservation, e.g. to queue
+    its confirmation email.
+    """
+
+    def __init__(self, db_manager, batch_size=500, on_created=None, max_errors=1000):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.on_created = on_created
+        self.max_errors = max_errors
+
+    def run(self, records):
+        """Import (line_number, record) pairs; returns a report with per-line errors"""
+        report = {'imported': 0, 'failed': 0, 'errors': []}
+        batch = []
+        for line_number, record in records:
+            batch.append((line_number, record))
+            if len(batch) >= self.batch_size:
+                self._import_batch(batch, report)
+                batch = []
+        if batch:
+            self._import_batch(batch, report)
+        report['errors_truncated'] = report['failed'] > len(report['errors'])
+        return report
+
+    def _error(self, report, line_number, message):
+        report['failed'] += 1
+        if len(report['errors']) < self.max_errors:
+            report['errors'].append({'line': line_number, 'error': message})
+
+    def _import_batch(self, batch, report):
+        availability = self.db_manager.availability
+        documents = []
+        for line_number, record in batch:
+            if isinstance(record, Exception):
+                self._error(report, line_number, str(record))
+                continue
+            error = validate_reservation(record) or validate_imported(record)
+            if error:
+                self._error(report, line_number, error)
+                continue
+            # Everything that can fail on the record's contents happens before a table is claimed
+            try:
+                status = record.get('status', 'confirmed')
+                created_at = datetime.fromisoformat(str(record['created_at'])) if record.get('created_at') else None
+                requested = availability.table(record.get('table_number')) or {
+                    'table_number': record.get('table_number'), 'seating_capacity': None, 'section': record.get('section')
+                }
+                document = reservation_document(record, ObjectId(), requested, status, created_at)
+            except (TypeError, ValueError) as e:
+                self._error(report, line_number, f'Invalid record: {e}')
+                continue
+            if STATUSES[status]:
+                try:
+                    table = availability.book(
+                        document['arrival_date'], document['arrival_time'], document['num_people'], document['_id'],
+                        table_number=record.get('table_number'), section=record.get('section')
+                    )
+                except SlotUnavailable as e:
+                    self._error(report, line_number, str(e))
+                    continue
+                except Exception as e:
+                    self._error(report, line_number, f'Booking failed: {e}')
+                    continue
+                document.update(table_number=table['table_number'], table_capacity=table['seating_capacity'],
+                                section=table['section'])
+            documents.append((line_number, document))
+        if not documents:
+            return
+
+        try:
+            self.db_manager.insert_many('reservations', [document for _, document in documents])
+            stored = documents
+        except Exception as e:
+            stored = []
+            for line_number, document in documents:
+                if self.db_manager.find_one('reservations', {'_id': document['_id']}):
+                    stored.append((line_number, document))
+                    continue
+                if STATUSES[document['status']]:
+                    availability.release(document['arrival_date'], document['arrival_time'],
+                                         document['table_number'])
+                self._error(report, line_number, f'Insert failed: {e}')
+
+        report['imported'] += len(stored)
+        if self.on_created:
+            for _, document in stored:
+                if STATUSES[document['status']]:
+                    self.on_created(document)
+
+
+# Writing
+def _plain(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def export_records(reservations, fmt='ndjson'):
+    """Yield NDJSON lines or CSV rows (header first) for an iterable of reservations"""
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, EXPORT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for reservation in reservations:
+            writer.writerow({field: _plain(reservation.get(field)) for field in EXPORT_FIELDS})
+            if buffer.tell() >= 8192:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+        return
+    for reservation in reservations:
+        yield json.dumps({field: _plain(reservation.get(field)) for field in EXPORT_FIELDS}) + '\n'
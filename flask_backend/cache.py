@@ -0,0 +1,379 @@
+"""
+DINE24 Restaurant Management System - Two-Tier Cache
+In-process LRU (L1) in front of a shared Redis (L2) with tag invalidation and stampede protection
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import math
+import os
+import pickle
+import random
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # L1 only
+    redis = None
+
+from flask import current_app, request
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Tags named by the decorators at import time; writes to any other collection skip invalidation
+_declared_tags = set()
+
+
+def _declare_tags(tags):
+    if not callable(tags):
+        _declared_tags.update(tags)
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one execution
+
+    The first caller for a key runs fn; callers arriving while it runs wait
+    for it and receive the same result (or exception).
+    """
+
+    class _Call:
+        __slots__ = ('done', 'result', 'error')
+
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self.collapsed = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Return (result, shared); shared is True when another caller computed it"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+            else:
+                self.collapsed += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self):
+        return len(self._calls)
+
+
+class LRUCache:
+    """Size-bounded, thread-safe LRU of cache entries"""
+
+    def __init__(self, maxsize=2048):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CacheEntry:
+    """Cached value with its expiry, the cost of computing it and the tag versions it was built at"""
+    __slots__ = ('value', 'expires_at', 'delta', 'tags')
+
+    def __init__(self, value, expires_at, delta, tags):
+        self.value = value
+        self.expires_at = expires_at
+        self.delta = delta
+        self.tags = tags
+
+
+def make_key(name, args, kwargs):
+    """Stable key for a call: function name plus a digest of its arguments"""
+    raw = json.dumps([args, kwargs], sort_keys=True, default=str)
+    return f"{name}:{hashlib.blake2b(raw.encode('utf-8'), digest_size=12).hexdigest()}"
+
+
+class TwoTierCache:
+    """L1 LRU+TTL per process in front of an optional shared Redis L2
+
+    Entries are tagged with the collections they were read from. A write
+    calls invalidate(tag), which bumps the tag's version locally and with
+    INCR in Redis; entries built at an older version are ignored. Other
+    workers pull tag versions from Redis every tag_sync_interval seconds,
+    so their L1 converges within that interval.
+
+    A miss is computed once per process (SingleFlight). Hits may also be
+    refreshed early with probability rising towards expiry (XFetch, scaled
+    by how long the value took to compute), so hot keys rarely expire under
+    load. When Redis is unreachable the cache runs as L1 only and retries
+    after retry_interval seconds. Cached values are shared: treat them as
+    read-only.
+    """
+
+    def __init__(self, client_factory=None, prefix='dine24:', default_ttl=300, l1_size=2048,
+                 tag_sync_interval=1.0, retry_interval=30.0, beta=1.0):
+        self.client_factory = client_factory
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self.tag_sync_interval = tag_sync_interval
+        self.retry_interval = retry_interval
+        self.beta = beta
+        self.l1 = LRUCache(l1_size)
+        self.flight = SingleFlight()
+        self.stats_counters = {'l1_hits': 0, 'l2_hits': 0, 'misses': 0, 'early_refreshes': 0,
+                               'invalidations': 0, 'l2_errors': 0}
+        self._versions = {}
+        self._synced_at = 0.0
+        self._client = None
+        self._pid = None
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, client_factory=None):
+        if client_factory is None and config.CACHE_TYPE == 'redis' and redis is not None:
+            client_factory = functools.partial(
+                redis.Redis.from_url, config.REDIS_URL,
+                socket_timeout=config.CACHE_REDIS_TIMEOUT, socket_connect_timeout=config.CACHE_REDIS_TIMEOUT
+            )
+        elif config.CACHE_TYPE == 'redis' and client_factory is None:
+            logger.warning("redis package not installed; caching in-process only")
+        return cls(
+            client_factory,
+            prefix=config.CACHE_KEY_PREFIX,
+            default_ttl=config.CACHE_DEFAULT_TIMEOUT,
+            l1_size=config.CACHE_L1_SIZE,
+            tag_sync_interval=config.CACHE_TAG_SYNC_INTERVAL,
+            retry_interval=config.CACHE_L2_RETRY_INTERVAL,
+            beta=config.CACHE_EARLY_REFRESH_BETA
+        )
+
+    # L2 access
+    def _redis(self):
+        """Redis client for this process, or None when there is no L2 or it is marked down"""
+        if self.client_factory is None or time.monotonic() < self._down_until:
+            return None
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._client = self.client_factory()
+                    self._pid = os.getpid()
+        return self._client
+
+    def _l2(self, operation, *args):
+        client = self._redis()
+        if client is None:
+            return None
+        try:
+            return getattr(client, operation)(*args)
+        except Exception as e:
+            self.stats_counters['l2_errors'] += 1
+            metrics.inc('upstream_errors_total', service='redis', operation=operation)
+            self._down_until = time.monotonic() + self.retry_interval
+            logger.warning(f"Cache L2 {operation} failed, using L1 only for {self.retry_interval:g}s: {str(e)}")
+            return None
+
+    # Tag versions
+    def _tag_key(self, tag):
+        return f"{self.prefix}tag:{tag}"
+
+    def _sync_tags(self):
+        now = time.monotonic()
+        if now - self._synced_at < self.tag_sync_interval or not self._versions:
+            return
+        self._synced_at = now
+        tags = list(self._versions)
+        remote = self._l2('mget', [self._tag_key(tag) for tag in tags])
+        if remote:
+            for tag, version in zip(tags, remote):
+                if version is not None and int(version) > self._versions.get(tag, 0):
+                    self._versions[tag] = int(version)
+
+    def _register(self, tags):
+        # A tag seen for the first time starts at its shared version, not at 0
+        unknown = [tag for tag in tags if tag not in self._versions]
+        if unknown:
+            remote = self._l2('mget', [self._tag_key(tag) for tag in unknown]) or [None] * len(unknown)
+            for tag, version in zip(unknown, remote):
+                self._versions.setdefault(tag, int(version or 0))
+
+    def _current(self, tags):
+        return tuple((tag, self._versions.get(tag, 0)) for tag in tags)
+
+    def _fresh(self, entry, now):
+        return entry.expires_at > now and all(self._versions.get(tag, 0) == version for tag, version in entry.tags)
+
+    def _refresh_early(self, entry, now):
+        # XFetch: recompute ahead of expiry with probability growing as it approaches
+        return now - entry.delta * self.beta * math.log(1.0 - random.random()) >= entry.expires_at
+
+    def invalidate(self, *tags):
+        """Make every entry tagged with any of tags stale, in this process and (via Redis) all others"""
+        for tag in tags:
+            if tag not in _declared_tags and tag not in self._versions:
+                continue
+            self.stats_counters['invalidations'] += 1
+            version = self._l2('incr', self._tag_key(tag))
+            self._versions[tag] = max(self._versions.get(tag, 0) + 1, int(version or 0))
+
+    # Reads
+    def get_or_set(self, key, compute, ttl=None, tags=()):
+        """Return the cached value for key, computing and storing it with compute() on a miss"""
+        self._register(tags)
+        self._sync_tags()
+        now = time.time()
+        entry = self.l1.get(key)
+        if entry is not None and self._fresh(entry, now):
+            if not self._refresh_early(entry, now):
+                self.stats_counters['l1_hits'] += 1
+                return entry.value
+            self.stats_counters['early_refreshes'] += 1
+        value, _ = self.flight.do(key, lambda: self._load(key, compute, ttl or self.default_ttl, tuple(tags)))
+        return value
+
+    def _load(self, key, compute, ttl, tags):
+        now = time.time()
+        raw = self._l2('get', self.prefix + key)
+        if raw is not None:
+            try:
+                entry = pickle.loads(raw)
+            except Exception:
+                entry = None
+            if entry is not None and self._fresh(entry, now) and not self._refresh_early(entry, now):
+                self.stats_counters['l2_hits'] += 1
+                self.l1.set(key, entry)
+                return entry.value
+
+        # Tag versions are taken before computing, so a write that lands meanwhile marks the result stale
+        self.stats_counters['misses'] += 1
+        versions = self._current(tags)
+        started = time.perf_counter()
+        value = compute()
+        entry = CacheEntry(value, time.time() + ttl, time.perf_counter() - started, versions)
+        self.l1.set(key, entry)
+        self._l2('set', self.prefix + key, pickle.dumps(entry, pickle.HIGHEST_PROTOCOL), max(1, math.ceil(ttl)))
+        return value
+
+    def delete(self, key):
+        self.l1.delete(key)
+        self._l2('delete', self.prefix + key)
+
+    # Decorators
+    def cached(self, ttl=None, tags=(), key=None):
+        """Cache a function's return value by its arguments; tags may be a callable of the arguments"""
+        _declare_tags(tags)
+
+        def decorator(fn):
+            name = f"{fn.__module__}.{fn.__qualname__}"
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                cache_key = key(*args, **kwargs) if key else make_key(name, args, kwargs)
+                entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+                return self.get_or_set(cache_key, lambda: fn(*args, **kwargs), ttl, entry_tags)
+            return wrapper
+        return decorator
+
+    def cached_response(self, ttl=None, tags=()):
+        """Cache a Flask view's 200 responses by path and sorted query arguments
+
+        Place it below token_required so authentication still runs on every
+        request. Error responses and streamed bodies are not cached.
+        """
+        _declare_tags(tags)
+
+        def decorator(view):
+            name = f"{view.__module__}.{view.__qualname__}"
+
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                cache_key = make_key(name, request.path, sorted(request.args.items(multi=True)))
+
+                def render():
+                    response = current_app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.is_streamed:
+                        raise _Uncacheable(response)
+                    return response.get_data(), response.mimetype
+
+                try:
+                    body, mimetype = self.get_or_set(cache_key, render, ttl, tags)
+                except _Uncacheable as e:
+                    return e.response
+                return current_app.response_class(body, mimetype=mimetype)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        return dict(
+            self.stats_counters,
+            l1_entries=len(self.l1),
+            tags=len(self._versions),
+            l2='disabled' if self.client_factory is None else 'down' if time.monotonic() < self._down_until else 'up'
+        )
+
+
+class _Uncacheable(Exception):
+    """Carries a response that must be returned as-is instead of cached"""
+
+    def __init__(self, response):
+        super().__init__('uncacheable response')
+        self.response = response
+
+
+def cached_method(ttl=None, tags=()):
+    """cached() for methods of objects that own a TwoTierCache as self.cache"""
+    _declare_tags(tags)
+
+    def decorator(method):
+        name = f"{method.__module__}.{method.__qualname__}"
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+            return self.cache.get_or_set(make_key(name, args, kwargs),
+                                         lambda: method(self, *args, **kwargs), ttl, entry_tags)
+        return wrapper
+    return decorator
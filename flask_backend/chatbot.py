@@ -0,0 +1,281 @@
+"""
+DINE24 Restaurant Management System - Chatbot Helpers
+Local intent classification and menu retrieval for compact LLM prompts
+"""
+
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+
+import numpy as np
+
+# Words that carry no intent on their own and are ignored when scoring coverage
+STOPWORDS = {
+    'a', 'an', 'the', 'is', 'are', 'am', 'was', 'be', 'do', 'does', 'can', 'could', 'would',
+    'will', 'what', 'when', 'how', 'your', 'you', 'i', 'me', 'my', 'we', 'us', 'our', 'it',
+    'to', 'for', 'of', 'at', 'on', 'in', 'and', 'or', 'please', 'tell', 'about', 'there',
+    'any', 'want', 'like', 'know', 'its', 'today', 'dine24', 'restaurant', 'thanks'
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text):
+    """Lowercase content words of a message (stopwords and numbers removed)"""
+    return [token for token in _TOKEN_RE.findall(text.lower().replace("'", ''))
+            if token not in STOPWORDS and not token.isdigit()]
+
+
+class IntentMatch:
+    """Result of a confident local classification"""
+    __slots__ = ('intent', 'confidence', 'response')
+
+    def __init__(self, intent, confidence, response):
+        self.intent = intent
+        self.confidence = confidence
+        self.response = response
+
+
+class IntentClassifier:
+    """Aho-Corasick keyword matcher over CHATBOT_INTENTS patterns
+
+    Patterns and messages are reduced to content words (stopwords dropped) and
+    matched token by token in a single pass. An intent's confidence is the
+    share of the message's content words covered by its patterns, scaled down
+    when other intents also match. Only intents listed in fast_path_intents are answered locally.
+    """
+
+    def __init__(self, intents, threshold=0.6, fast_path_intents=None):
+        self.intents = intents
+        self.threshold = threshold
+        self.fast_path_intents = set(fast_path_intents or intents)
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+        for name, intent in intents.items():
+            for pattern in intent['patterns']:
+                self._add_pattern(tokenize(pattern), name)
+        self._build_failure_links()
+        self._lock = threading.Lock()
+        self.total = 0
+        self.fast_path_hits = 0
+        self.hits_by_intent = {name: 0 for name in intents}
+
+    # Automaton over tokens (each edge consumes one word)
+    def _add_pattern(self, tokens, intent):
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+                self._goto[state][token] = next_state
+            state = next_state
+        self._outputs[state].append((intent, len(tokens)))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(token, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def _match(self, tokens):
+        """Return {intent: set of covered token positions}"""
+        covered = {}
+        state = 0
+        for position, token in enumerate(tokens):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for intent, length in self._outputs[state]:
+                covered.setdefault(intent, set()).update(range(position - length + 1, position + 1))
+        return covered
+
+    # Classification
+    def score(self, message):
+        """Return (intent, confidence) for the best-matching intent, or (None, 0.0)"""
+        tokens = tokenize(message)
+        if not tokens:
+            return None, 0.0
+        coverage = {intent: len(positions) / len(tokens)
+                    for intent, positions in self._match(tokens).items()}
+        if not coverage:
+            return None, 0.0
+        best = max(coverage, key=coverage.get)
+        return best, coverage[best] * coverage[best] / sum(coverage.values())
+
+    def classify(self, message):
+        """Return an IntentMatch when the message can be answered locally"""
+        intent, confidence = self.score(message)
+        matched = intent in self.fast_path_intents and confidence >= self.threshold
+        with self._lock:
+            self.total += 1
+            if matched:
+                self.fast_path_hits += 1
+                self.hits_by_intent[intent] += 1
+        if not matched:
+            return None
+        return IntentMatch(intent, confidence, random.choice(self.intents[intent]['responses']))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'messages': self.total,
+                'fast_path_hits': self.fast_path_hits,
+                'hit_rate': self.fast_path_hits / self.total if self.total else 0.0,
+                'hits_by_intent': dict(self.hits_by_intent)
+            }
+
+
+# Query words mapped onto the tokens used to describe menu items
+_MENU_SYNONYMS = {
+    'vegetarian': 'veg', 'veggie': 'veg', 'vegan': 'veg',
+    'meat': 'nonveg', 'cheap': 'budget', 'affordable': 'budget', 'inexpensive': 'budget',
+    'expensive': 'premium', 'fancy': 'premium'
+}
+
+
+def menu_tokens(text):
+    """Content words for menu retrieval, with synonyms and plurals folded"""
+    text = re.sub(r'non[\s-]?veg(etarian)?', 'nonveg', text.lower())
+    tokens = []
+    for token in tokenize(text):
+        token = _MENU_SYNONYMS.get(token, token)
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def price_band(price):
+    """Coarse price token so queries like 'cheap dessert' can match on price"""
+    if price is None:
+        return None
+    if price < 250:
+        return 'budget'
+    if price < 500:
+        return 'midrange'
+    return 'premium'
+
+
+class MenuRetriever:
+    """TF-IDF index over menu items for selecting prompt context
+
+    Terms from each item's name, category, veg flag and price band are kept
+    as COO arrays (doc, term, tf). Adding an item appends to those arrays and
+    marks the IDF weights and document norms dirty; they are recomputed in one
+    vectorized pass on the next query. Scoring a message is a single bincount
+    over the non-zeros, i.e. cosine similarity against every item at once.
+    """
+
+    def __init__(self, loader, refresh_interval=300):
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.items = []
+        self._item_ids = set()
+        self._vocab = {}
+        self._doc_idx = []
+        self._term_idx = []
+        self._tf = []
+        self._dirty = True
+        self._loaded_at = None
+
+    # Index Maintenance
+    def _document_tokens(self, item):
+        tokens = menu_tokens(f"{item.get('name', '')} {item.get('category', '')}")
+        tokens.append('veg' if item.get('is_veg', True) else 'nonveg')
+        band = price_band(item.get('offer_price') or item.get('price'))
+        if band:
+            tokens.append(band)
+        return tokens
+
+    def _add(self, item):
+        item_id = str(item.get('_id'))
+        if item_id in self._item_ids:
+            return
+        self._item_ids.add(item_id)
+        doc = len(self.items)
+        self.items.append({
+            'name': item.get('name'),
+            'category': item.get('category'),
+            'price': item.get('offer_price') or item.get('price'),
+            'is_veg': item.get('is_veg', True),
+            'orders_placed': item.get('orders_placed', 0)
+        })
+        for term, tf in Counter(self._document_tokens(item)).items():
+            self._doc_idx.append(doc)
+            self._term_idx.append(self._vocab.setdefault(term, len(self._vocab)))
+            self._tf.append(1 + math.log(tf))
+        self._dirty = True
+
+    def add(self, item):
+        """Index a newly created menu item"""
+        with self._lock:
+            if self._loaded_at is not None:
+                self._add(item)
+
+    def _ensure_loaded(self):
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at > self.refresh_interval:
+            self._reset()
+            for item in self.loader():
+                self._add(item)
+            self._loaded_at = now
+        if self._dirty:
+            docs = np.array(self._doc_idx, dtype=np.int32)
+            terms = np.array(self._term_idx, dtype=np.int32)
+            df = np.bincount(terms, minlength=len(self._vocab))
+            self._idf = np.log((1 + len(self.items)) / (1 + df)) + 1
+            self._weights = np.array(self._tf) * self._idf[terms]
+            norms = np.sqrt(np.bincount(docs, weights=self._weights ** 2, minlength=len(self.items)))
+            self._norms = np.where(norms > 0, norms, 1.0)
+            self._docs, self._terms = docs, terms
+            self._dirty = False
+
+    # Retrieval
+    def search(self, message, k=8):
+        """Return up to k menu items most relevant to message (popular items if none match)"""
+        with self._lock:
+            self._ensure_loaded()
+            if not self.items:
+                return []
+            query = np.zeros(len(self._vocab))
+            for term in menu_tokens(message):
+                term_id = self._vocab.get(term)
+                if term_id is not None:
+                    query[term_id] = self._idf[term_id]
+            scores = np.bincount(self._docs, weights=self._weights * query[self._terms],
+                                 minlength=len(self.items)) / self._norms
+            matched = np.flatnonzero(scores > 0)
+            if len(matched):
+                if len(matched) > k:
+                    matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+                ranked = matched[np.argsort(-scores[matched], kind='stable')]
+                return [self.items[i] for i in ranked]
+            return sorted(self.items, key=lambda item: -(item['orders_placed'] or 0))[:k]
+
+
+def format_menu_context(items):
+    """One-line prompt description of the selected menu items"""
+    return ", ".join(
+        f"{item['name']} ({item['category']}, {'veg' if item['is_veg'] else 'non-veg'}, Rs.{item['price']:g})"
+        if item.get('price') is not None else item['name']
+        for item in items
+    )
@@ -0,0 +1,75 @@
+"""
+DINE24 Restaurant Management System - Request Coalescing
+Identical concurrent GET requests share one in-flight view execution
+"""
+
+import functools
+
+from flask import current_app, request
+
+from cache import SingleFlight
+from metrics import metrics
+
+
+class SharedResponse:
+    """Serialized response handed to every request that waited on the same execution"""
+    __slots__ = ('status', 'headers', 'body')
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class RequestCoalescer:
+    """Per-route opt-in single-flight for read endpoints
+
+    Requests are keyed by path, sorted query arguments and any request
+    headers listed in vary. While one request runs the view, identical ones
+    wait and are answered with a copy of its status, headers and body, so
+    the database work and serialization happen once. Only use it on routes
+    whose response does not depend on who is asking. Streamed responses are
+    not shared: waiters run the view themselves.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.flight = SingleFlight()
+
+    def _key(self, vary):
+        return (
+            request.method,
+            request.path,
+            tuple(sorted(request.args.items(multi=True))),
+            tuple(request.headers.get(header, '') for header in vary)
+        )
+
+    def coalesce(self, vary=()):
+        """Decorator; place it below token_required so authentication runs for every request"""
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or request.method not in ('GET', 'HEAD'):
+                    return view(*args, **kwargs)
+
+                def render():
+                    response = current_app.make_response(view(*args, **kwargs))
+                    if response.is_streamed:
+                        return response
+                    return SharedResponse(response.status_code, response.headers.to_wsgi_list(), response.get_data())
+
+                result, shared = self.flight.do(self._key(vary), render)
+                if not isinstance(result, SharedResponse):
+                    return view(*args, **kwargs) if shared else result
+                if shared:
+                    metrics.inc('http_requests_coalesced_total', route=request.url_rule.rule)
+                return current_app.response_class(result.body, status=result.status, headers=result.headers)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'collapsed': self.flight.collapsed,
+            'in_flight': self.flight.in_flight()
+        }
@@ -0,0 +1,90 @@
+"""
+DINE24 Restaurant Management System - Response Compression
+Negotiated gzip/brotli encoding for large API responses
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/csv', 'text/html', 'text/plain'}
+
+
+class ResponseCompressor:
+    """after_request hook compressing buffered responses the client accepts encoded
+
+    Brotli is preferred when installed and accepted, then gzip. Streamed
+    responses (Server-Sent Events, NDJSON exports) are left alone so their
+    chunks reach the client immediately. Bodies carrying an ETag are compressed
+    once and kept in a small LRU keyed by (etag, encoding), so cached snapshots
+    such as the menu are not recompressed on every request.
+    """
+
+    def __init__(self, app=None, min_size=1024, gzip_level=6, brotli_quality=5, cache_size=64):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.after_request(self.after_request)
+
+    def _encoding(self, accept_encodings):
+        if brotli is not None and accept_encodings['br']:
+            return 'br'
+        if accept_encodings['gzip']:
+            return 'gzip'
+        return None
+
+    def _compress(self, body, encoding):
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def _cached_compress(self, etag, body, encoding):
+        key = (etag, encoding)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        compressed = self._compress(body, encoding)
+        with self._lock:
+            self._cache[key] = compressed
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compressed
+
+    def after_request(self, response):
+        if (response.direct_passthrough or response.is_streamed or response.status_code < 200
+                or response.status_code in (204, 304) or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self._encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+
+        etag, weak = response.get_etag()
+        compressed = self._cached_compress(etag, body, encoding) if etag else self._compress(body, encoding)
+        if len(compressed) >= len(body):
+            return response
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        if etag and not weak:
+            # A different byte representation of the same content
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,183 @@
+"""
+DINE24 Restaurant Management System - MongoDB Connection Layer
+One lazily created, pooled MongoClient per worker process
+"""
+
+import os
+import threading
+import time
+
+from pymongo import MongoClient, monitoring
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool listener that counts checkouts and checkout wait time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.checkins = 0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.pools_cleared = 0
+            self.checkout_wait_total = 0.0
+            self.checkout_wait_max = 0.0
+
+    def snapshot(self):
+        """Return the current counters as a plain dictionary"""
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'checkout_failures': self.checkout_failures,
+                'checkins': self.checkins,
+                'in_use': self.checkouts - self.checkins,
+                'connections_created': self.connections_created,
+                'connections_closed': self.connections_closed,
+                'open_connections': self.connections_created - self.connections_closed,
+                'pools_cleared': self.pools_cleared,
+                'checkout_wait_avg_ms': (self.checkout_wait_total / self.checkouts * 1000) if self.checkouts else 0.0,
+                'checkout_wait_max_ms': self.checkout_wait_max * 1000
+            }
+
+    # Checkout events fire on the requesting thread, so wait time is tracked per thread
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        waited = time.perf_counter() - getattr(self._local, 'started', time.perf_counter())
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait_total += waited
+            self.checkout_wait_max = max(self.checkout_wait_max, waited)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checkins += 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pools_cleared += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+
+class ConnectionManager:
+    """Owns the MongoClient for the current process and recreates it after fork
+
+    A MongoClient must never be shared across fork(): its sockets and monitor
+    threads belong to the parent. The client is therefore created on first use,
+    tagged with the creating pid, and dropped in forked children so every
+    gunicorn worker builds its own pool.
+    """
+
+    def __init__(self, uri, max_pool_size=50, min_pool_size=0, wait_queue_timeout_ms=2000,
+                 server_selection_timeout_ms=5000, client_factory=None):
+        self.uri = uri
+        self.max_pool_size = max_pool_size
+        self.min_pool_size = min_pool_size
+        self.wait_queue_timeout_ms = wait_queue_timeout_ms
+        self.server_selection_timeout_ms = server_selection_timeout_ms
+        self.client_factory = client_factory or MongoClient
+        self.metrics = PoolMetrics()
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    @classmethod
+    def from_config(cls, config, client_factory=None):
+        return cls(
+            config.MONGODB_URI,
+            max_pool_size=config.MONGODB_MAX_POOL_SIZE,
+            min_pool_size=config.MONGODB_MIN_POOL_SIZE,
+            wait_queue_timeout_ms=config.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+            server_selection_timeout_ms=config.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            client_factory=client_factory
+        )
+
+    def _after_fork(self):
+        # The lock may have been held by another thread at fork time
+        self._lock = threading.Lock()
+        self._client = None
+        self._pid = None
+        self.metrics = PoolMetrics()
+
+    @property
+    def client(self):
+        """Return this process's client, creating it on first use"""
+        client = self._client
+        if client is not None and self._pid == os.getpid():
+            return client
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                self._client = self.client_factory(
+                    self.uri,
+                    maxPoolSize=self.max_pool_size,
+                    minPoolSize=self.min_pool_size,
+                    waitQueueTimeoutMS=self.wait_queue_timeout_ms,
+                    serverSelectionTimeoutMS=self.server_selection_timeout_ms,
+                    event_listeners=[self.metrics],
+                    connect=False
+                )
+                self._pid = os.getpid()
+            return self._client
+
+    @property
+    def connected(self):
+        return self._client is not None and self._pid == os.getpid()
+
+    def get_database(self, name):
+        return self.client[name]
+
+    def ping(self):
+        self.client.admin.command('ping')
+        return True
+
+    def pool_stats(self):
+        stats = self.metrics.snapshot()
+        stats.update({
+            'pid': os.getpid(),
+            'connected': self.connected,
+            'max_pool_size': self.max_pool_size,
+            'wait_queue_timeout_ms': self.wait_queue_timeout_ms,
+            'server_selection_timeout_ms': self.server_selection_timeout_ms
+        })
+        return stats
+
+    def close(self):
+        """Close the client owned by this process, draining its pool"""
+        with self._lock:
+            client, self._client = self._client, None
+            owned = self._pid == os.getpid()
+            self._pid = None
+        if client is not None and owned:
+            client.close()
@@ -4,20 +4,36 @@ DINE24 Restaurant Management System - MongoDB Database Configuration
 Mock implementation for resume showcase
 """
 
-from pymongo import MongoClient
 from datetime import datetime, timedelta
+import logging
 import os
 from bson.objectid import ObjectId
+from config import Config, RESTAURANT_TABLES
+from analytics import AnalyticsRollups, AnalyticsStore
+from availability import AvailabilityCalendar, TableAvailability
+from cache import TwoTierCache, cached_method
+from connection import ConnectionManager
+from metrics import metrics
+from storage import MemoryDatabase
+from write_buffer import WriteBuffer
+
+logger = logging.getLogger(__name__)
 
 class DatabaseManager:
-    def __init__(self):
-        # MongoDB connection (mock for resume showcase)
-        self.connection_string = os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/')
-        self.database_name = 'dine24_restaurant'
+    def __init__(self, config=Config, backend=None, client_factory=None):
+        self.connection_string = config.MONGODB_URI
+        self.database_name = config.MONGODB_DB_NAME
+        self.backend = backend or config.DATABASE_BACKEND
         
-        # Mock connection (in production would be actual MongoDB)
-        self.client = None  # MongoClient(self.connection_string)
-        self.db = None      # self.client[self.database_name]
+        # 'memory' uses the in-process indexed engine; 'mongodb' a pooled client
+        # created lazily in each worker process (never at import time)
+        self.connection = None
+        self._memory_db = None
+        self._indexes_created = False
+        if self.backend == 'memory':
+            self._memory_db = MemoryDatabase(self.database_name)
+        else:
+            self.connection = ConnectionManager.from_config(config, client_factory=client_factory)
         
         # Initialize collections
         self.collections = {
@@ -33,16 +49,66 @@ class DatabaseManager:
             'specials': 'todays_specials'
         }
         
-        print("📊 MongoDB Database Manager initialized for DINE24")
+        # Read-through cache; every write below invalidates its collection's tag
+        self.cache = TwoTierCache.from_config(config)
+        
+        # Append-only collections are written in bulk off the request path
+        self.write_buffer = WriteBuffer(
+            self,
+            max_batch=config.WRITE_BUFFER_MAX_BATCH,
+            flush_interval=config.WRITE_BUFFER_FLUSH_INTERVAL,
+            max_pending=config.WRITE_BUFFER_MAX_PENDING,
+            block_timeout=config.WRITE_BUFFER_BLOCK_TIMEOUT
+        )
+        
+        # Table occupancy grid (claims live in the table_slots collection)
+        self.availability = TableAvailability(
+            self, RESTAURANT_TABLES, config.RESERVATION_TIME_SLOTS, config.RESERVATION_SLOT_SPAN,
+            grid_ttl=config.AVAILABILITY_GRID_TTL
+        )
+        self.calendar = AvailabilityCalendar(
+            self.availability, config.MAX_RESERVATION_DAYS_ADVANCE, config.AVAILABILITY_CACHE_TTL
+        )
+        
+        # Dashboard aggregates maintained on every write
+        self.analytics = AnalyticsStore(
+            lambda: self.find('reservations', {}),
+            lambda: self.find('menu_items', {}),
+            table_count=len(RESTAURANT_TABLES),
+            slot_count=len(config.RESERVATION_TIME_SLOTS),
+            top_k=config.ANALYTICS_TOP_K,
+            recent_k=config.ANALYTICS_TOP_K,
+            resync_interval=config.ANALYTICS_RESYNC_INTERVAL
+        )
+        self.rollups = AnalyticsRollups(
+            self, RESTAURANT_TABLES, config.RESERVATION_TIME_SLOTS,
+            slot_span=config.RESERVATION_SLOT_SPAN,
+            retention_days=config.ANALYTICS_RETENTION_DAYS,
+            days_ahead=config.MAX_RESERVATION_DAYS_ADVANCE
+        )
+        
+        logger.debug("Database manager initialized (%s backend)", self.backend)
+    
+    @property
+    def client(self):
+        """MongoClient owned by the current process (None for the memory backend)"""
+        return self.connection.client if self.connection else None
+    
+    @property
+    def db(self):
+        if self._memory_db is not None:
+            return self._memory_db
+        return self.connection.get_database(self.database_name)
     
     def connect(self):
         """Establish database connection"""
         try:
-            # Mock connection (in production would connect to actual MongoDB)
-            print("🔗 Connected to MongoDB successfully")
+            if self.connection:
+                self.connection.ping()
+            logger.info("Connected to MongoDB")
             return True
         except Exception as e:
-            print(f"❌ Database connection failed: {str(e)}")
+            logger.error("Database connection failed: %s", e)
             return False
     
     def create_indexes(self):
@@ -52,7 +118,10 @@ class DatabaseManager:
                 {'email': 1},
                 {'arrival_date': 1},
                 {'status': 1},
-                {'created_at': -1}
+                {'created_at': -1},
+                {'created_at': -1, '_id': -1},
+                {'status': 1, 'created_at': -1, '_id': -1},
+                {'status': 1, 'arrival_date': 1}
             ],
             'menu_items': [
                 {'category': 1},
@@ -67,12 +136,124 @@ class DatabaseManager:
             'orders': [
                 {'reservation_id': 1},
                 {'created_at': -1}
+            ],
+            'users': [
+                {'username': 1}
+            ],
+            'table_slots': [
+                {'date': 1}
+            ],
+            'analytics_rollups': [
+                {'granularity': 1, 'bucket': 1}
+            ],
+            'revoked_tokens': [
+                {'revoked_at': 1},
+                {'expires_at': 1}
             ]
         }
         
-        print("📋 Database indexes created successfully")
+        self._indexes_created = True
+        for collection, specs in indexes.items():
+            for spec in specs:
+                self.get_collection(collection).create_index(list(spec.items()))
+        
+        logger.debug("Database indexes created")
         return indexes
     
+    # Generic Collection Operations
+    def get_collection(self, name):
+        """Resolve a logical collection name to its storage collection"""
+        if not self._indexes_created:
+            self.create_indexes()
+        return self.db[self.collections.get(name, name)]
+    
+    def find(self, collection, query=None, sort=None, limit=0, skip=0):
+        """Find documents matching query, optionally sorted and limited"""
+        # Times the query; a MongoDB cursor fetches later batches while it is iterated
+        with metrics.timer('db_operation_duration_seconds', collection=collection, operation='find'):
+            return self.get_collection(collection).find(query or {}, sort=sort, limit=limit, skip=skip)
+    
+    def find_one(self, collection, query=None):
+        """Find the first document matching query"""
+        with metrics.timer('db_operation_duration_seconds', collection=collection, operation='find_one'):
+            return self.get_collection(collection).find_one(query or {})
+    
+    def insert_one(self, collection, document):
+        """Insert a single document, assigning an _id when missing"""
+        with metrics.timer('db_operation_duration_seconds', collection=collection, operation='insert_one'):
+            result = self.get_collection(collection).insert_one(document)
+        self.cache.invalidate(collection)
+        self._record_inserts(collection, [document])
+        return result
+    
+    def insert_many(self, collection, documents):
+        """Insert several documents in one call"""
+        with metrics.timer('db_operation_duration_seconds', collection=collection, operation='insert_many'):
+            result = self.get_collection(collection).insert_many(documents)
+        self.cache.invalidate(collection)
+        self._record_inserts(collection, documents)
+        return result
+    
+    def _record_inserts(self, collection, documents):
+        """Feed new reservations and menu items into the analytics materializations"""
+        if collection == 'reservations':
+            for document in documents:
+                self.analytics.record_reservation(document)
+            for date in {document.get('arrival_date') for document in documents}:
+                self.rollups.mark_dirty(date)
+        elif collection == 'menu_items':
+            for document in documents:
+                self.analytics.record_menu_item(document)
+    
+    def buffered_insert(self, collection, document):
+        """Queue an append-only document (logs, events) for a later bulk insert"""
+        return self.write_buffer.append(collection, document)
+    
+    def update_one(self, collection, query, update):
+        """Apply an update ($set/$inc/$unset) to the first matching document"""
+        with metrics.timer('db_operation_duration_seconds', collection=collection, operation='update_one'):
+            result = self.get_collection(collection).update_one(query, update)
+        self.cache.invalidate(collection)
+        return result
+    
+    def replace_one(self, collection, query, replacement, upsert=False):
+        """Replace the first matching document, optionally inserting it when none matches"""
+        with metrics.timer('db_operation_duration_seconds', collection=collection, operation='replace_one'):
+            result = self.get_collection(collection).replace_one(query, replacement, upsert=upsert)
+        self.cache.invalidate(collection)
+        return result
+    
+    def delete_one(self, collection, query):
+        """Delete the first document matching query"""
+        with metrics.timer('db_operation_duration_seconds', collection=collection, operation='delete_one'):
+            result = self.get_collection(collection).delete_one(query)
+        self.cache.invalidate(collection)
+        return result
+    
+    def delete_many(self, collection, query):
+        """Delete every document matching query"""
+        with metrics.timer('db_operation_duration_seconds', collection=collection, operation='delete_many'):
+            result = self.get_collection(collection).delete_many(query)
+        self.cache.invalidate(collection)
+        return result
+    
+    def count(self, collection, query=None):
+        """Count documents matching query"""
+        with metrics.timer('db_operation_duration_seconds', collection=collection, operation='count'):
+            return self.get_collection(collection).count_documents(query or {})
+    
+    def explain(self, collection, query=None, sort=None, limit=0, skip=0):
+        """Report the query plan, keys examined and documents returned for a find"""
+        if self.backend == 'memory':
+            return self.get_collection(collection).explain(query or {}, sort=sort, limit=limit, skip=skip)
+        return self.find(collection, query, sort=sort, limit=limit, skip=skip).explain()
+    
+    def get_pool_metrics(self):
+        """Connection pool checkout metrics for the current worker process"""
+        if self.connection is None:
+            return {'backend': self.backend}
+        return dict(self.connection.pool_stats(), backend=self.backend)
+    
     # Reservation Management
     def create_reservation(self, reservation_data):
         """Insert new reservation into database"""
@@ -86,8 +267,8 @@ class DatabaseManager:
                 'arrival_date': reservation_data['arrival_date'],
                 'arrival_time': reservation_data['arrival_time'],
                 'purpose': reservation_data.get('purpose', 'dining'),
-                'table_number': reservation_data.get('table_number'),
-                'table_capacity': reservation_data.get('table_capacity'),
+                'table_number': None,
+                'table_capacity': None,
                 'status': 'confirmed',
                 'total_amount': reservation_data.get('total_amount', 0),
                 'order_type': reservation_data.get('order_type', 'dine-in'),
@@ -95,43 +276,92 @@ class DatabaseManager:
                 'updated_at': datetime.utcnow()
             }
             
-            # Mock insert (in production: self.db.reservations.insert_one(reservation))
-            print(f"✅ Reservation created for {reservation['full_name']}")
+            # Claim a table atomically before the reservation becomes visible
+            table = self.availability.book(
+                reservation['arrival_date'], reservation['arrival_time'], reservation['num_people'],
+                reservation['_id'], table_number=reservation_data.get('table_number'),
+                section=reservation_data.get('section')
+            )
+            reservation['table_number'] = table['table_number']
+            reservation['table_capacity'] = table['seating_capacity']
+            try:
+                self.insert_one('reservations', reservation)
+            except Exception:
+                self.availability.release(reservation['arrival_date'], reservation['arrival_time'], table['table_number'])
+                raise
+            logger.debug("Reservation created for %s", reservation['full_name'])
             return str(reservation['_id'])
             
         except Exception as e:
-            print(f"❌ Error creating reservation: {str(e)}")
+            logger.error("Error creating reservation: %s", e)
             return None
     
+    @cached_method(tags=('reservations',))
     def get_reservations(self, filters=None, limit=None):
         """Retrieve reservations with optional filters"""
         try:
             query = filters or {}
             
-            # Mock query (in production: self.db.reservations.find(query))
-            mock_reservations = [
-                {
-                    '_id': ObjectId(),
-                    'full_name': 'John Doe',
-                    'email': 'john@example.com',
-                    'phone': '+91 9876543210',
-                    'num_people': 4,
-                    'arrival_date': '2024-07-20',
-                    'arrival_time': '19:30',
-                    'table_number': 'A3',
-                    'status': 'confirmed',
-                    'total_amount': 1200,
-                    'created_at': datetime.utcnow()
-                }
-            ]
+            reservations = list(self.find('reservations', query, sort=[('created_at', -1)], limit=limit or 0))
             
-            print(f"📋 Retrieved {len(mock_reservations)} reservations")
-            return mock_reservations
+            logger.debug("Retrieved %d reservations", len(reservations))
+            return reservations
             
         except Exception as e:
-            print(f"❌ Error retrieving reservations: {str(e)}")
+            logger.error("Error retrieving reservations: %s", e)
             return []
     
+    def page_reservations(self, filters=None, limit=50, cursor=None):
+        """One keyset page of reservations, newest first; returns (documents, next_cursor)
+        
+        The cursor is the (created_at, _id) of the last document already seen, so
+        each page is an index range scan that starts where the previous one ended.
+        """
+        query = dict(filters or {})
+        if cursor:
+            created_at, last_id = cursor
+            query['created_at'] = {'$lte': created_at}
+            query['$or'] = [
+                {'created_at': {'$lt': created_at}},
+                {'created_at': created_at, '_id': {'$lt': last_id}}
+            ]
+        
+        reservations = list(self.find('reservations', query, sort=[('created_at', -1), ('_id', -1)], limit=limit + 1))
+        if len(reservations) <= limit:
+            return reservations, None
+        reservations = reservations[:limit]
+        return reservations, (reservations[-1]['created_at'], reservations[-1]['_id'])
+    
+    def iter_reservations(self, filters=None, cursor=None, batch_size=500):
+        """Yield every matching reservation, holding only one keyset page in memory"""
+        while True:
+            reservations, cursor = self.page_reservations(filters, batch_size, cursor)
+            yield from reservations
+            if cursor is None:
+                return
+    
+    def cancel_reservation(self, reservation_id):
+        """Mark a reservation cancelled and free its table slot"""
+        try:
+            reservation = self.find_one('reservations', {'_id': ObjectId(reservation_id)})
+            if not reservation or reservation['status'] == 'cancelled':
+                return None
+            
+            self.update_one('reservations', {'_id': reservation['_id']},
+                            {'$set': {'status': 'cancelled', 'updated_at': datetime.utcnow()}})
+            self.analytics.record_cancellation(reservation)
+            self.rollups.mark_dirty(reservation.get('arrival_date'))
+            if reservation.get('table_number'):
+                self.availability.release(reservation['arrival_date'], reservation['arrival_time'],
+                                          reservation['table_number'])
+            reservation['status'] = 'cancelled'
+            logger.debug("Reservation %s cancelled", reservation_id)
+            return reservation
+            
+        except Exception as e:
+            logger.error("Error cancelling reservation: %s", e)
+            return None
+    
     # Menu Management
     def add_menu_item(self, item_data):
         """Add new menu item to database"""
@@ -150,79 +380,47 @@ class DatabaseManager:
                 'updated_at': datetime.utcnow()
             }
             
-            # Mock insert (in production: self.db.menu_items.insert_one(menu_item))
-            print(f"🍽️ Menu item '{menu_item['name']}' added successfully")
+            self.insert_one('menu_items', menu_item)
+            logger.debug("Menu item %r added", menu_item['name'])
             return str(menu_item['_id'])
             
         except Exception as e:
-            print(f"❌ Error adding menu item: {str(e)}")
+            logger.error("Error adding menu item: %s", e)
             return None
     
+    @cached_method(tags=('menu_items',))
     def get_menu_items(self, category=None):
         """Retrieve menu items by category"""
         try:
             query = {'category': category} if category else {}
             
-            # Mock query (in production: self.db.menu_items.find(query))
-            mock_menu = [
-                {
-                    '_id': ObjectId(),
-                    'name': 'Butter Chicken',
-                    'category': 'Main Course',
-                    'price': 450,
-                    'quantity': '1 plate',
-                    'rating': 4.5,
-                    'is_veg': False,
-                    'orders_placed': 45
-                },
-                {
-                    '_id': ObjectId(),
-                    'name': 'Paneer Tikka',
-                    'category': 'Appetizers',
-                    'price': 320,
-                    'quantity': '6 pieces',
-                    'rating': 4.3,
-                    'is_veg': True,
-                    'orders_placed': 32
-                }
-            ]
+            menu_items = list(self.find('menu_items', query))
             
-            print(f"🍽️ Retrieved {len(mock_menu)} menu items")
-            return mock_menu
+            logger.debug("Retrieved %d menu items", len(menu_items))
+            return menu_items
             
         except Exception as e:
-            print(f"❌ Error retrieving menu items: {str(e)}")
+            logger.error("Error retrieving menu items: %s", e)
             return []
     
     # Analytics and Reporting
+    @cached_method(tags=('reservations', 'menu_items'))
     def get_analytics_data(self, date_range=None):
         """Generate analytics data for admin dashboard"""
         try:
-            # Mock analytics data
-            analytics = {
-                'total_reservations': 150,
-                'total_revenue': 75000,
-                'average_order_value': 500,
-                'popular_dishes': [
-                    {'name': 'Butter Chicken', 'orders': 45},
-                    {'name': 'Biryani', 'orders': 38},
-                    {'name': 'Paneer Tikka', 'orders': 32}
-                ],
-                'peak_hours': {
-                    '19:00-20:00': 25,
-                    '20:00-21:00': 30,
-                    '21:00-22:00': 22
-                },
-                'customer_satisfaction': 4.5,
-                'table_utilization': 78.5,
-                'generated_at': datetime.utcnow()
-            }
+            analytics = self.analytics.snapshot()
+            analytics['popular_dishes'] = [
+                {'name': item['name'], 'orders': item.get('orders_placed', 0)}
+                for item in analytics['popular_items']
+            ]
+            if date_range:
+                analytics['timeseries'] = self.rollups.query(*date_range)
+            analytics['generated_at'] = datetime.utcnow()
             
-            print("📊 Analytics data generated successfully")
             return analytics
             
         except Exception as e:
-            print(f"❌ Error generating analytics: {str(e)}")
+            logger.error("Error generating analytics: %s", e)
             return {}
     
     # Chat and AI Logs
@@ -238,77 +436,58 @@ class DatabaseManager:
                 'session_id': metadata.get('session_id') if metadata else None
             }
             
-            # Mock insert (in production: self.db.chat_logs.insert_one(chat_log))
-            print("💬 Chat interaction logged successfully")
+            self.buffered_insert('chat_logs', chat_log)
             return str(chat_log['_id'])
             
         except Exception as e:
-            print(f"❌ Error logging chat interaction: {str(e)}")
+            logger.error("Error logging chat interaction: %s", e)
             return None
     
     # Table Management
+    @cached_method(ttl=Config.AVAILABILITY_CACHE_TTL, tags=('table_slots',))
     def get_available_tables(self, date, time, party_size):
         """Find available tables for given date, time, and party size"""
         try:
-            # Mock table availability check
-            available_tables = [
-                {
-                    '_id': ObjectId(),
-                    'table_number': 'A3',
-                    'seating_capacity': 4,
-                    'section': 'Main Dining',
-                    'is_available': True
-                },
-                {
-                    '_id': ObjectId(),
-                    'table_number': 'B2',
-                    'seating_capacity': 6,
-                    'section': 'Window Side',
-                    'is_available': True
-                }
-            ]
-            
-            # Filter by party size
-            suitable_tables = [
-                table for table in available_tables 
-                if table['seating_capacity'] >= party_size
-            ]
+            suitable_tables = self.availability.available_tables(date, time, int(party_size))
             
-            print(f"🪑 Found {len(suitable_tables)} available tables")
+            logger.debug("Found %d available tables", len(suitable_tables))
             return suitable_tables
             
         except Exception as e:
-            print(f"❌ Error checking table availability: {str(e)}")
+            logger.error("Error checking table availability: %s", e)
             return []
     
     def close_connection(self):
         """Close database connection"""
         try:
-            # Mock close (in production: self.client.close())
-            print("🔐 Database connection closed successfully")
+            self.write_buffer.close()
+            if self.connection:
+                self.connection.close()
+            logger.debug("Database connection closed")
             return True
         except Exception as e:
-            print(f"❌ Error closing database connection: {str(e)}")
+            logger.error("Error closing database connection: %s", e)
             return False
 
-# Database instance
+# Database instance shared by the app (connects lazily, once per worker process)
 database = DatabaseManager()
 
 # Database initialization function
 def init_database():
     """Initialize database with sample data"""
-    print("🚀 Initializing DINE24 Database...")
+    logger.info("Initializing DINE24 database")
     
     if database.connect():
         database.create_indexes()
-        print("✅ Database initialization completed successfully")
+        logger.info("Database initialization completed")
         return True
     else:
-        print("❌ Database initialization failed")
+        logger.error("Database initialization failed")
         return False
 
 if __name__ == '__main__':
     # Initialize database when run directly
+    logging.basicConfig(level=logging.DEBUG)
     init_database()
     
     # Sample usage
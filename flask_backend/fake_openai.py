@@ -0,0 +1,95 @@
+"""
+DINE24 Restaurant Management System - Fake OpenAI Server
+Local stand-in for the chat completions API, used for streaming tests and benchmarks
+
+Usage: python fake_openai.py --port 8089 --chunks 20 --delay 0.05 --first-token-delay 0.3
+Then: OPENAI_API_BASE=http://127.0.0.1:8089/v1 OPENAI_API_KEY=test python app.py
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeCompletionHandler(BaseHTTPRequestHandler):
+    """Answers POST /v1/chat/completions with a canned reply, optionally streamed"""
+    protocol_version = 'HTTP/1.1'
+    chunks = 20
+    delay = 0.05
+    first_token_delay = 0.3
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_error(404)
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+        words = [f"word{i} " for i in range(self.chunks)]
+        time.sleep(self.first_token_delay)
+
+        if not body.get('stream'):
+            time.sleep(self.delay * self.chunks)
+            payload = json.dumps({
+                'id': 'chatcmpl-fake',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': body.get('model', 'gpt-3.5-turbo'),
+                'choices': [{'index': 0, 'finish_reason': 'stop',
+                             'message': {'role': 'assistant', 'content': ''.join(words)}}],
+                'usage': {'prompt_tokens': 0, 'completion_tokens': self.chunks, 'total_tokens': self.chunks}
+            }).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(self.delay)
+            self._write_event({'choices': [{'index': 0, 'delta': {'content': word}, 'finish_reason': None}]})
+        self._write_event({'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})
+        self._write_chunk(b'data: [DONE]\n\n')
+        self._write_chunk(b'')
+
+    def _write_event(self, data):
+        data = dict(data, id='chatcmpl-fake', object='chat.completion.chunk', created=int(time.time()))
+        self._write_chunk(f"data: {json.dumps(data)}\n\n".encode('utf-8'))
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+
+def serve(port=8089, chunks=20, delay=0.05, first_token_delay=0.3, background=False):
+    """Start the fake server; with background=True return it running on a daemon thread"""
+    handler = type('Handler', (FakeCompletionHandler,), {
+        'chunks': chunks, 'delay': delay, 'first_token_delay': first_token_delay
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    print(f"Fake OpenAI listening on http://127.0.0.1:{server.server_address[1]}/v1")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local fake OpenAI chat completions server')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--chunks', type=int, default=20)
+    parser.add_argument('--delay', type=float, default=0.05, help='seconds between streamed chunks')
+    parser.add_argument('--first-token-delay', type=float, default=0.3)
+    args = parser.parse_args()
+    serve(args.port, args.chunks, args.delay, args.first_token_delay)
@@ -0,0 +1,67 @@
+"""
+DINE24 Restaurant Management System - Fake SMTP Server
+Local mail sink that accepts and discards messages, used for benchmarks and offline runs
+
+Usage: python fake_smtp.py --port 8025
+Then: MAIL_SERVER=127.0.0.1 MAIL_PORT=8025 MAIL_USE_TLS=false python app.py
+"""
+
+import argparse
+import socketserver
+import threading
+
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP (no TLS, no AUTH) for smtplib to deliver a message"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+        self.wfile.flush()
+
+    def handle(self):
+        self.reply('220 dine24 fake smtp ready')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+            if verb == 'EHLO':
+                self.wfile.write(b'250-dine24\r\n')
+                self.reply('250 8BITMIME')
+            elif verb in ('HELO', 'MAIL', 'RCPT', 'RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                while self.rfile.readline() not in (b'.\r\n', b'.\n', b''):
+                    pass
+                self.server.delivered += 1
+                self.reply('250 OK queued')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    delivered = 0
+
+
+def serve(port=8025, background=False):
+    """Start the fake server; with background=True return it running on a daemon thread"""
+    server = FakeSMTPServer(('127.0.0.1', port), FakeSMTPHandler)
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    print(f"Fake SMTP listening on 127.0.0.1:{server.server_address[1]}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local fake SMTP server')
+    parser.add_argument('--port', type=int, default=8025)
+    args = parser.parse_args()
+    serve(args.port)
@@ -0,0 +1,50 @@
+"""
+DINE24 Restaurant Management System - Gunicorn Configuration
+Usage: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import os
+
+# The in-memory backend lives inside one worker, so it runs a single worker
+# (scale with threads); set DATABASE_BACKEND=mongodb for more
+database_backend = os.environ.get('DATABASE_BACKEND') or 'memory'
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 1 if database_backend == 'memory' else 4))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = 30
+graceful_timeout = 30
+
+# The app is imported once in the master; each worker then opens its own
+# MongoDB pool on first use (see connection.ConnectionManager) and shares the
+# master's memory-mapped menu snapshot (see menu_cache.MenuCache)
+preload_app = True
+
+
+def on_starting(server):
+    """Refuse to fork several workers over the in-memory backend
+
+    Each worker would hold a private copy of every collection, including the
+    table_slots claims, so the same table could be booked once per worker.
+    """
+    from config import Config
+    if Config.DATABASE_BACKEND == 'memory' and server.cfg.workers > 1:
+        raise RuntimeError(
+            f"DATABASE_BACKEND=memory cannot be shared by {server.cfg.workers} workers; "
+            "set GUNICORN_WORKERS=1 or DATABASE_BACKEND=mongodb"
+        )
+
+
+def when_ready(server):
+    """Publish the menu snapshot in the master so every forked worker starts with it mapped"""
+    from app import menu_cache
+    menu_cache.bump()
+
+
+def worker_exit(server, worker):
+    """Stop the email outbox and hashing pool and drain this worker's connection pool before it exits"""
+    from app import email_outbox, password_hasher
+    from database import database
+    email_outbox.stop()
+    password_hasher.shutdown()
+    database.close_connection()
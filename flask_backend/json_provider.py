@@ -0,0 +1,78 @@
+"""
+DINE24 Restaurant Management System - JSON Serialization
+Flask JSON provider that encodes BSON types in one pass (orjson when installed)
+"""
+
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+def encode_value(value):
+    """Fallback encoder for values JSON has no type for"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return DefaultJSONProvider.default(value)
+
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """JSON provider for documents straight from the database
+
+    ObjectId, datetime/date (ISO 8601) and Decimal are encoded while the
+    document is serialized, so routes can return raw documents without
+    copying or mutating them first. orjson is used when installed; payloads it
+    cannot encode (e.g. integers beyond 64 bits) fall back to the json module.
+    """
+
+    default = staticmethod(encode_value)
+    sort_keys = False
+
+    def _orjson_options(self, indent=False):
+        options = orjson.OPT_NON_STR_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj, indent=False):
+        """Encode obj to UTF-8 JSON bytes"""
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=encode_value, option=self._orjson_options(indent))
+            except (orjson.JSONEncodeError, TypeError):
+                pass
+        return json.dumps(obj, default=encode_value, ensure_ascii=False,
+                          indent=2 if indent else None,
+                          separators=None if indent else (',', ':')).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return self.dumps_bytes(obj).decode('utf-8')
+        kwargs.setdefault('default', encode_value)
+        kwargs.setdefault('ensure_ascii', False)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
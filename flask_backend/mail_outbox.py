@@ -0,0 +1,300 @@
+"""
+DINE24 Restaurant Management System - Email Outbox
+Bounded background queue that sends mail over persistent SMTP connections
+"""
+
+import heapq
+import json
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # single-process development servers only
+    fcntl = None
+
+from flask_mail import Message
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutbox:
+    """Queue of outgoing emails drained by worker threads
+
+    Each message is spooled to disk as <owner>-<id>.json before it is queued
+    and removed once delivered, so pending mail survives a restart. The owner
+    is a random id drawn on every start, and the process holds an flock on
+    <owner>.lock while it runs: a restarted container often gets the same pid
+    back, but never the same owner id, and the lock dies with the process.
+    Workers keep one Flask-Mail connection open while there is work and send
+    up to batch_size messages per wake-up. A failed send is retried with
+    exponential backoff up to max_retries times.
+    """
+
+    def __init__(self, app, mail, spool_dir, maxsize=1000, workers=1, batch_size=20,
+                 max_retries=5, retry_delay=2.0, idle_timeout=30.0):
+        self.app = app
+        self.mail = mail
+        self.spool_dir = spool_dir
+        self.maxsize = maxsize
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.idle_timeout = idle_timeout
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self._queue = queue.Queue(maxsize)
+        self._retries = []
+        self._retry_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._pid = None
+        self._owner = None
+        self._owner_lock = None
+        self._start_lock = threading.Lock()
+
+    # Spool
+    def _spool_path(self, message_id, owner=None):
+        return os.path.join(self.spool_dir, f"{owner or self._owner}-{message_id}.json")
+
+    def _lock_path(self, owner):
+        return os.path.join(self.spool_dir, f"{owner}.lock")
+
+    def _claim_owner(self):
+        """Draw a fresh owner id and hold its lock for the life of the process"""
+        if self._owner_lock is not None:
+            # Inherited across fork; the parent still holds its own copy of the lock
+            self._owner_lock.close()
+        self._owner = uuid.uuid4().hex
+        self._owner_lock = open(self._lock_path(self._owner), 'a')
+        if fcntl is not None:
+            fcntl.flock(self._owner_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _release_owner(self):
+        if self._owner_lock is None:
+            return
+        # With nothing left in the spool the lock file has no one to tell
+        if not any(name.startswith(f"{self._owner}-") for name in os.listdir(self.spool_dir)):
+            try:
+                os.remove(self._lock_path(self._owner))
+            except OSError:
+                pass
+        self._owner_lock.close()
+        self._owner_lock = None
+
+    def _write_spool(self, message):
+        path = self._spool_path(message['id'])
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(message, f)
+        os.replace(temp_path, path)
+
+    def _remove_spool(self, message):
+        try:
+            os.remove(self._spool_path(message['id']))
+        except FileNotFoundError:
+            pass
+
+    def _recover_spool(self):
+        """Claim spooled messages whose owner no longer holds its lock"""
+        owners = {}
+        for name in sorted(os.listdir(self.spool_dir)):
+            if name.endswith('.json') and '-' in name:
+                owner, message_id = name[:-5].split('-', 1)
+                if owner != self._owner:
+                    owners.setdefault(owner, []).append(message_id)
+        recovered = 0
+        for owner, message_ids in owners.items():
+            with open(self._lock_path(owner), 'a') as handle:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue
+                for message_id in message_ids:
+                    try:
+                        os.rename(self._spool_path(message_id, owner), self._spool_path(message_id))
+                        with open(self._spool_path(message_id)) as f:
+                            message = json.load(f)
+                    except (OSError, ValueError):
+                        continue
+                    self._schedule(message, message.get('not_before', 0))
+                    recovered += 1
+                try:
+                    os.remove(self._lock_path(owner))
+                except OSError:
+                    pass
+        if recovered:
+            logger.info(f"Recovered {recovered} spooled emails")
+
+    # Lifecycle
+    def start(self):
+        """Start worker threads for this process (safe to call after fork)"""
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stopping.clear()
+            os.makedirs(self.spool_dir, exist_ok=True)
+            self._claim_owner()
+            self._recover_spool()
+            self._threads = [
+                threading.Thread(target=self._run, name=f"email-outbox-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout=10.0):
+        """Stop the workers; undelivered mail stays in the spool for the next start"""
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._pid = None
+        self._release_owner()
+
+    def pending(self):
+        with self._retry_lock:
+            return self._queue.qsize() + len(self._retries)
+
+    def stats(self):
+        return {
+            'pending': self.pending(),
+            'sent': self.sent,
+            'failed': self.failed,
+            'retried': self.retried
+        }
+
+    # Producer API
+    def enqueue(self, subject, recipients, html=None, body=None, sender=None):
+        """Spool and queue a message; returns False when the outbox is full"""
+        if self._pid != os.getpid():
+            self.start()
+        message = {
+            'id': uuid.uuid4().hex,
+            'subject': subject,
+            'recipients': list(recipients),
+            'sender': sender,
+            'html': html,
+            'body': body,
+            'attempts': 0,
+            'not_before': 0
+        }
+        if self._queue.full():
+            return False
+        self._write_spool(message)
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self._remove_spool(message)
+            return False
+        return True
+
+    def _schedule(self, message, not_before):
+        with self._retry_lock:
+            heapq.heappush(self._retries, (not_before, message['id'], message))
+
+    # Worker
+    def _next_batch(self, wait):
+        """Collect due retries and queued messages, blocking up to wait seconds"""
+        batch = []
+        now = time.time()
+        with self._retry_lock:
+            while self._retries and self._retries[0][0] <= now and len(batch) < self.batch_size:
+                batch.append(heapq.heappop(self._retries)[2])
+        if not batch:
+            try:
+                batch.append(self._queue.get(timeout=wait))
+            except queue.Empty:
+                return batch
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        with self.app.app_context():
+            while not self._stopping.is_set():
+                batch = self._next_batch(wait=0.5)
+                if batch:
+                    self._drain(batch)
+
+    def _drain(self, batch):
+        """Send batches over one SMTP connection, keeping it open while work keeps arriving"""
+        try:
+            with metrics.timer('upstream_request_duration_seconds', service='smtp', operation='connect'):
+                connection = self.mail.connect()
+                connection.__enter__()
+        except (smtplib.SMTPException, OSError) as e:
+            metrics.inc('upstream_errors_total', service='smtp', operation='connect')
+            logger.warning(f"SMTP connection failed: {str(e)}")
+            for message in batch:
+                self._retry(message, e)
+            return
+
+        pending = list(batch)
+        try:
+            idle_since = time.monotonic()
+            while True:
+                while pending:
+                    message = pending[0]
+                    try:
+                        with metrics.timer('upstream_request_duration_seconds', service='smtp', operation='send'):
+                            connection.send(self._build(message))
+                    except smtplib.SMTPServerDisconnected:
+                        metrics.inc('upstream_errors_total', service='smtp', operation='send')
+                        raise
+                    except (smtplib.SMTPException, ValueError) as e:
+                        metrics.inc('upstream_errors_total', service='smtp', operation='send')
+                        pending.pop(0)
+                        self._retry(message, e)
+                    else:
+                        pending.pop(0)
+                        self.sent += 1
+                        self._remove_spool(message)
+                    idle_since = time.monotonic()
+                if self._stopping.is_set() or time.monotonic() - idle_since >= self.idle_timeout:
+                    break
+                pending = self._next_batch(wait=0.5)
+        except (smtplib.SMTPException, OSError) as e:
+            logger.warning(f"SMTP connection lost: {str(e)}")
+            for message in pending:
+                self._retry(message, e)
+        finally:
+            try:
+                connection.__exit__(None, None, None)
+            except (smtplib.SMTPException, OSError):
+                pass
+
+    def _build(self, message):
+        return Message(
+            subject=message['subject'],
+            sender=message['sender'] or self.app.config['MAIL_USERNAME'],
+            recipients=message['recipients'],
+            html=message['html'],
+            body=message['body']
+        )
+
+    def _retry(self, message, error):
+        message['attempts'] += 1
+        if message['attempts'] > self.max_retries:
+            self.failed += 1
+            logger.error(f"Email to {message['recipients']} dropped after {self.max_retries} retries: {error}")
+            self._remove_spool(message)
+            return
+        self.retried += 1
+        message['not_before'] = time.time() + self.retry_delay * 2 ** (message['attempts'] - 1)
+        self._write_spool(message)
+        self._schedule(message, message['not_before'])
+
@@ -0,0 +1,253 @@
+"""
+DINE24 Restaurant Management System - Menu Snapshot Cache
+Versioned binary snapshots of the menu and table layout, shared by all workers through mmap
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # single-process development servers only
+    fcntl = None
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# File layout (little-endian):
+#   header                       magic, format, version, published_at, table count, body count
+#   table records                number (offset, length), seating capacity, section (offset, length)
+#   body records                 category (offset, length), body (offset, length), 16-byte ETag digest
+#   data                         UTF-8 strings and pre-serialized JSON bodies
+# Body 0 is the whole menu (empty category); offsets are from the start of the file.
+MAGIC = b'D24M'
+FORMAT = 1
+HEADER = struct.Struct('<4sHxxQdII')
+TABLE = struct.Struct('<IIIII')
+BODY = struct.Struct('<IIII16s')
+
+_SNAPSHOT_RE = re.compile(r'^menu-(\d+)\.snap$')
+
+
+def encode_snapshot(version, published_at, tables, bodies):
+    """Serialize tables and [(category, body bytes)] into the snapshot format"""
+    data = bytearray()
+    data_start = HEADER.size + TABLE.size * len(tables) + BODY.size * len(bodies)
+
+    def put(raw):
+        offset = data_start + len(data)
+        data.extend(raw)
+        return offset, len(raw)
+
+    records = bytearray(HEADER.pack(MAGIC, FORMAT, version, published_at, len(tables), len(bodies)))
+    for table in tables:
+        number = put(str(table['table_number']).encode('utf-8'))
+        section = put(str(table.get('section') or '').encode('utf-8'))
+        records += TABLE.pack(*number, int(table['seating_capacity']), *section)
+    for category, body in bodies:
+        name = put(category.encode('utf-8'))
+        records += BODY.pack(*name, *put(body), hashlib.blake2b(body, digest_size=16).digest())
+    return bytes(records + data)
+
+
+class MenuResponse:
+    """Serialized menu response for one category"""
+    __slots__ = ('body', 'etag')
+
+    def __init__(self, body, etag):
+        self.body = body
+        self.etag = etag
+
+
+class MenuSnapshot:
+    """Read-only memory map of one snapshot file
+
+    Bodies and table records stay in the shared page cache; only the small
+    category -> offset map lives in each worker. The mapping outlives the
+    file, so a worker can keep serving a version another process has pruned.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, file_format, self.version, self.published_at, self._table_count, body_count = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or file_format != FORMAT:
+            raise ValueError(f"{path} is not a format {FORMAT} menu snapshot")
+        self._bodies = {}
+        position = HEADER.size + TABLE.size * self._table_count
+        for _ in range(body_count):
+            name_offset, name_length, offset, length, digest = BODY.unpack_from(self._map, position)
+            category = self._map[name_offset:name_offset + name_length].decode('utf-8')
+            self._bodies[category] = (offset, length, digest.hex())
+            position += BODY.size
+
+    def _string(self, offset, length):
+        return self._map[offset:offset + length].decode('utf-8')
+
+    def response(self, category=None):
+        """MenuResponse for category (whole menu when empty), or None for an unknown category"""
+        entry = self._bodies.get(category or '')
+        if entry is None:
+            return None
+        offset, length, etag = entry
+        return MenuResponse(self._map[offset:offset + length], etag)
+
+    def tables(self):
+        tables = []
+        for i in range(self._table_count):
+            number_offset, number_length, capacity, section_offset, section_length = \
+                TABLE.unpack_from(self._map, HEADER.size + TABLE.size * i)
+            tables.append({
+                'table_number': self._string(number_offset, number_length),
+                'seating_capacity': capacity,
+                'section': self._string(section_offset, section_length)
+            })
+        return tables
+
+    @property
+    def size(self):
+        return len(self._map)
+
+
+class MenuCache:
+    """Menu responses and table layout published as versioned snapshot files
+
+    bump() (called after every menu write, and on first use by the process
+    that created the cache - the gunicorn master with preload_app) loads the
+    menu, pre-serializes the whole menu and each category with dumps, and
+    writes the next version to directory under an exclusive file lock.
+    Every get() in any worker checks the CURRENT pointer at most every
+    check_interval seconds and swaps to a newer version by mapping its
+    file. Old versions beyond keep are deleted. dumps must return bytes.
+    """
+
+    def __init__(self, dumps, loader, tables, directory, check_interval=0.5, keep=3):
+        self.dumps = dumps
+        self.loader = loader
+        self.table_layout = [dict(table) for table in tables]
+        self.directory = directory
+        self.check_interval = check_interval
+        self.keep = keep
+        self.hits = 0
+        self.misses = 0
+        self._snapshot = None
+        self._empty = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    # Files
+    def _path(self, version):
+        return os.path.join(self.directory, f"menu-{version:010d}.snap")
+
+    def _current_path(self):
+        return os.path.join(self.directory, 'CURRENT')
+
+    def _read_current(self):
+        try:
+            with open(self._current_path()) as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _write(self, path, data):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def _prune(self, version):
+        for name in os.listdir(self.directory):
+            match = _SNAPSHOT_RE.match(name)
+            if match and int(match.group(1)) <= version - self.keep:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def _publish_lock(self):
+        handle = open(os.path.join(self.directory, '.lock'), 'a')
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        return handle
+
+    # Versions
+    def _swap(self, version):
+        try:
+            snapshot = MenuSnapshot(self._path(version))
+        except FileNotFoundError:
+            # Pruned by a faster publisher; the pointer already names a newer version
+            snapshot = MenuSnapshot(self._path(self._read_current()))
+        self._snapshot = snapshot
+        self.misses += 1
+        return snapshot
+
+    def bump(self):
+        """Publish a new snapshot version from loader() and switch to it"""
+        started = time.perf_counter()
+        items = list(self.loader())
+        by_category = {}
+        for item in items:
+            if item.get('category'):
+                by_category.setdefault(item['category'], []).append(item)
+        bodies = [('', self.dumps({'success': True, 'menu_items': items}))]
+        bodies.extend((category, self.dumps({'success': True, 'menu_items': group}))
+                      for category, group in by_category.items())
+
+        with self._lock, self._publish_lock():
+            version = self._read_current() + 1
+            self._write(self._path(version), encode_snapshot(version, time.time(), self.table_layout, bodies))
+            self._write(self._current_path(), str(version).encode())
+            self._prune(version)
+            self._swap(version)
+            self._checked_at = time.monotonic()
+        metrics.observe('menu_snapshot_publish_seconds', time.perf_counter() - started)
+        logger.info(f"Published menu snapshot v{version} ({len(items)} items)")
+        return version
+
+    def current(self):
+        """The newest snapshot, publishing the first one if this process has none"""
+        if self._snapshot is None:
+            self.bump()
+        elif time.monotonic() - self._checked_at >= self.check_interval:
+            with self._lock:
+                if time.monotonic() - self._checked_at >= self.check_interval:
+                    self._checked_at = time.monotonic()
+                    version = self._read_current()
+                    if version > self._snapshot.version:
+                        snapshot = self._swap(version)
+                        metrics.observe('menu_snapshot_refresh_seconds', max(0.0, time.time() - snapshot.published_at))
+        return self._snapshot
+
+    # Reads
+    def get(self, category=None):
+        """MenuResponse for category from the current snapshot"""
+        response = self.current().response(category)
+        if response is None:
+            # No item in this category; every unknown category shares one empty body
+            if self._empty is None:
+                body = self.dumps({'success': True, 'menu_items': []})
+                self._empty = MenuResponse(body, hashlib.blake2b(body, digest_size=16).hexdigest())
+            return self._empty
+        self.hits += 1
+        return response
+
+    def tables(self):
+        return self.current().tables()
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            'version': snapshot.version if snapshot else 0,
+            'bytes': snapshot.size if snapshot else 0,
+            'hits': self.hits,
+            'misses': self.misses
+        }
@@ -0,0 +1,219 @@
+"""
+DINE24 Restaurant Management System - Menu Search
+Inverted and trigram indexes over menu item names and categories for ranked, typo-tolerant search
+"""
+
+import heapq
+import math
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+# Field weights: a hit in the dish name counts more than one in its category
+NAME_WEIGHT = 2.0
+CATEGORY_WEIGHT = 1.0
+
+# Match quality relative to an exact term hit
+PREFIX_FACTOR = 0.8
+FUZZY_FACTOR = 0.6
+
+
+def search_tokens(text):
+    """Lowercase alphanumeric words with simple plurals folded ('dosas' -> 'dosa')"""
+    tokens = []
+    for token in _WORD_RE.findall(text.lower()):
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def trigrams(term):
+    padded = f'  {term} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, or limit + 1 as soon as it must exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def max_typos(term):
+    if len(term) < 4:
+        return 0
+    return 1 if len(term) < 8 else 2
+
+
+class MenuSearchIndex:
+    """In-memory search over menu items
+
+    The inverted index maps each term to {doc: field weight}. The vocabulary
+    is also kept sorted for prefix lookups and split into trigrams, so a
+    misspelled query word only has to be compared against terms that share
+    trigrams with it. Every query word must match (exactly, as a prefix or
+    within max_typos edits); matches are scored by quality, field weight and
+    IDF, plus a small popularity boost. add() indexes a new item in place;
+    the whole index is rebuilt from loader() every refresh_interval seconds
+    to pick up writes made by other workers.
+    """
+
+    def __init__(self, loader, refresh_interval=300):
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.items = []
+        self._item_ids = set()
+        self._postings = {}
+        self._terms = []
+        self._trigrams = {}
+        self._loaded_at = None
+
+    # Index maintenance
+    def _add_term(self, term, doc, weight):
+        postings = self._postings.get(term)
+        if postings is None:
+            postings = self._postings[term] = {}
+            insort(self._terms, term)
+            for gram in trigrams(term):
+                self._trigrams.setdefault(gram, set()).add(term)
+        postings[doc] = max(postings.get(doc, 0.0), weight)
+
+    def _add(self, item):
+        item_id = str(item.get('_id'))
+        if item_id in self._item_ids:
+            return
+        self._item_ids.add(item_id)
+        doc = len(self.items)
+        self.items.append(dict(item))
+        for term in search_tokens(item.get('category') or ''):
+            self._add_term(term, doc, CATEGORY_WEIGHT)
+        for term in search_tokens(item.get('name') or ''):
+            self._add_term(term, doc, NAME_WEIGHT)
+
+    def add(self, item):
+        """Index a newly created menu item"""
+        with self._lock:
+            if self._loaded_at is not None:
+                self._add(item)
+
+    def _ensure_loaded(self):
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at > self.refresh_interval:
+            self._reset()
+            for item in self.loader():
+                self._add(item)
+            self._loaded_at = now
+
+    # Term expansion
+    def _prefixed(self, token):
+        terms = self._terms
+        position = bisect_left(terms, token)
+        while position < len(terms) and terms[position].startswith(token):
+            yield terms[position]
+            position += 1
+
+    def _similar(self, token):
+        limit = max_typos(token)
+        if not limit:
+            return
+        grams = trigrams(token)
+        shared = {}
+        for gram in grams:
+            for term in self._trigrams.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+        # Each edit destroys at most 3 of the token's trigrams
+        needed = max(1, len(grams) - 3 * limit)
+        for term, count in shared.items():
+            if count >= needed:
+                distance = edit_distance(token, term, limit)
+                if distance <= limit:
+                    yield term, distance
+
+    def _token_scores(self, token):
+        """{doc: best score} over every term the query token matches"""
+        candidates = {}
+        if token in self._postings:
+            candidates[token] = 1.0
+        for term in self._prefixed(token):
+            candidates.setdefault(term, PREFIX_FACTOR * len(token) / len(term))
+        if token not in self._postings:
+            for term, distance in self._similar(token):
+                candidates.setdefault(term, FUZZY_FACTOR * (1 - distance / len(token)))
+
+        scores = {}
+        total = len(self.items)
+        for term, quality in candidates.items():
+            postings = self._postings[term]
+            idf = math.log(1 + total / len(postings))
+            for doc, weight in postings.items():
+                score = quality * weight * idf
+                if score > scores.get(doc, 0.0):
+                    scores[doc] = score
+        return scores
+
+    # Search
+    def search(self, query='', is_veg=None, min_price=None, max_price=None, min_rating=None, category=None,
+               limit=20, offset=0):
+        """Ranked matches for query after filters; returns (results, total)
+
+        With an empty query every item passing the filters matches, most
+        ordered first. Each result is the menu item plus its score.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            tokens = search_tokens(query or '')
+            if tokens:
+                scores = None
+                for token in dict.fromkeys(tokens):
+                    token_scores = self._token_scores(token)
+                    if scores is None:
+                        scores = token_scores
+                    else:
+                        scores = {doc: score + token_scores[doc] for doc, score in scores.items() if doc in token_scores}
+                    if not scores:
+                        break
+            else:
+                scores = dict.fromkeys(range(len(self.items)), 0.0)
+
+            matches = []
+            for doc, score in scores.items():
+                item = self.items[doc]
+                price = item.get('offer_price') or item.get('price') or 0
+                if is_veg is not None and bool(item.get('is_veg', True)) != is_veg:
+                    continue
+                if min_price is not None and price < min_price:
+                    continue
+                if max_price is not None and price > max_price:
+                    continue
+                if min_rating is not None and (item.get('rating') or 0) < min_rating:
+                    continue
+                if category and item.get('category') != category:
+                    continue
+                orders = item.get('orders_placed') or 0
+                matches.append((-(score + 0.05 * math.log1p(orders)), -orders, doc, score))
+
+            page = heapq.nsmallest(offset + limit, matches)[offset:]
+            return [dict(self.items[doc], score=round(score, 4)) for _, _, doc, score in page], len(matches)
+
+    def stats(self):
+        return {
+            'items': len(self.items),
+            'terms': len(self._terms),
+            'trigrams': len(self._trigrams)
+        }
@@ -0,0 +1,192 @@
+"""
+DINE24 Restaurant Management System - Metrics
+In-process latency histograms, counters and gauges rendered in Prometheus text format
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; spans sub-millisecond cache hits up to slow upstream calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with quantile estimates"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimate the q-quantile by interpolating inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
+def process_memory(pid='self'):
+    """Resident, proportional (shared pages split among their users) and shared bytes of a process
+
+    Read from /proc/<pid>/smaps_rollup, so Linux only; returns {} elsewhere.
+    """
+    fields = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if value.strip().endswith('kB'):
+                    fields[name] = int(value.split()[0]) * 1024
+    except OSError:
+        return {}
+    return {
+        'resident': fields.get('Rss', 0),
+        'proportional': fields.get('Pss', 0),
+        'shared': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)
+    }
+
+
+def _labels(labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}' if labels else ''
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry:
+    """Per-process metrics store
+
+    Histograms and counters are keyed by metric name and a sorted label tuple.
+    Gauges are callables evaluated at scrape time, so components such as the
+    caches only keep their own counters. Each gunicorn worker has its own
+    registry; a scrape reports the worker that served it.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the duration of the with-block (also when it raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def register_gauge(self, name, help_text, collect):
+        """collect() returns a number or a {label tuple: number} mapping"""
+        self._help[name] = help_text
+        self._gauges[name] = collect
+
+    def _gauge_values(self, collect):
+        values = collect()
+        if isinstance(values, dict):
+            return list(values.items())
+        return [((), values)]
+
+    # Exposition
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            histograms = {key: (list(h.counts), h.count, h.sum) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+
+        def header(name, kind):
+            if name in self._help:
+                lines.append(f'# HELP {name} {self._help[name]}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        for name in sorted({name for name, _ in histograms}):
+            header(name, 'histogram')
+            for (metric, labels), (counts, count, total) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{_labels(labels + (("le", bound),))} {cumulative}')
+                lines.append(f'{name}_sum{_labels(labels)} {total}')
+                lines.append(f'{name}_count{_labels(labels)} {count}')
+        for name in sorted({name for name, _ in counters}):
+            header(name, 'counter')
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{_labels(labels)} {value}')
+        for name, collect in sorted(self._gauges.items()):
+            header(name, 'gauge')
+            for labels, value in self._gauge_values(collect):
+                lines.append(f'{name}{_labels(tuple(labels))} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        """Quantile summary of every histogram plus counters and gauges, for JSON"""
+        with self._lock:
+            histograms = [(name, dict(labels), h.count, h.quantile(0.5), h.quantile(0.95), h.quantile(0.99))
+                          for (name, labels), h in sorted(self._histograms.items())]
+            counters = [(name, dict(labels), value) for (name, labels), value in sorted(self._counters.items())]
+        return {
+            'histograms': [
+                {'name': name, 'labels': labels, 'count': count,
+                 'p50_ms': p50 * 1000, 'p95_ms': p95 * 1000, 'p99_ms': p99 * 1000}
+                for name, labels, count, p50, p95, p99 in histograms
+            ],
+            'counters': [{'name': name, 'labels': labels, 'value': value} for name, labels, value in counters],
+            'gauges': {name: [{'labels': dict(labels), 'value': value} for labels, value in self._gauge_values(collect)]
+                       for name, collect in self._gauges.items()}
+        }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+# Shared by the app, the database layer and the background workers
+metrics = MetricsRegistry()
+metrics.describe('http_request_duration_seconds', 'Flask request latency by route')
+metrics.describe('http_requests_total', 'Requests by route and status code')
+metrics.describe('http_requests_coalesced_total', 'Requests answered with the response of an identical in-flight request')
+metrics.describe('db_operation_duration_seconds', 'DatabaseManager operation latency by collection')
+metrics.describe('upstream_request_duration_seconds', 'Latency of calls to OpenAI and SMTP')
+metrics.describe('upstream_errors_total', 'Failed calls to OpenAI and SMTP')
+metrics.describe('menu_snapshot_publish_seconds', 'Time to build and write a menu snapshot after a menu write')
+metrics.describe('menu_snapshot_refresh_seconds', 'Delay between a menu snapshot being published and this worker mapping it')
@@ -0,0 +1,104 @@
+"""
+DINE24 Restaurant Management System - Password Hashing Pool
+CPU-heavy password hashing and verification moved off the request threads
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Verified against when the user does not exist, so unknown usernames cost the same
+_DUMMY_PASSWORD = 'dine24-no-such-user'
+
+# Pool processes are never forked from a multithreaded worker, where another
+# thread may hold a lock the child inherits locked
+_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class HasherBusy(Exception):
+    """Raised when no hashing slot frees up within the queue timeout"""
+
+
+def _verify(password_hash, password):
+    return check_password_hash(password_hash, password)
+
+
+def _hash(password, method):
+    return generate_password_hash(password, method=method)
+
+
+class PasswordHasher:
+    """Bounded process pool for password hashing
+
+    At most max_pending hash operations may be in flight per worker process.
+    A caller waits up to queue_timeout for a slot and then gets HasherBusy,
+    so a login burst is shed quickly instead of piling up behind the pool.
+    The pool is created lazily in each process (it is not inherited across
+    fork) and starts its processes through a forkserver. With workers=0
+    hashing runs on the calling thread, still capped.
+    """
+
+    def __init__(self, method, workers=2, max_pending=8, queue_timeout=0.5):
+        self.method = method
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._dummy_hash = None
+
+    def _executor(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(_START_METHOD))
+                    self._pid = os.getpid()
+        return self._pool
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self.rejected += 1
+            raise HasherBusy('Too many concurrent password operations')
+        try:
+            if not self.workers:
+                return fn(*args)
+            return self._executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        """Hash password with the configured method"""
+        return self._run(_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        """Check password against password_hash (None when the user does not exist)"""
+        if password_hash is None:
+            if self._dummy_hash is None:
+                # Made in the pool like any other hash, so it counts against max_pending
+                self._dummy_hash = self._run(_hash, _DUMMY_PASSWORD, self.method)
+            self._run(_verify, self._dummy_hash, password)
+            return False
+        return self._run(_verify, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when password_hash was made with a different method or cost"""
+        return password_hash.split('$', 1)[0] != self.method
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._pid = None
+
+    def stats(self):
+        return {
+            'method': self.method,
+            'workers': self.workers,
+            'rejected': self.rejected
+        }
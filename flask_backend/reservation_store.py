@@ -0,0 +1,269 @@
+"""
+DINE24 Restaurant Management System - Columnar Reservation Store
+Array-backed reservation columns for analytics scans
+"""
+
+from array import array
+from datetime import date, datetime, timedelta
+from itertools import islice
+
+import numpy as np
+from bson import ObjectId
+
+_MISSING = object()  # field absent from the document
+_EPOCH = datetime(1970, 1, 1)
+_NO_TIME = -2 ** 63  # numpy reads it as NaT
+_MICROSECOND = timedelta(microseconds=1)
+
+# Field -> storage kind, in the key order of DatabaseManager.create_reservation
+FIELDS = {
+    '_id': 'id',
+    'full_name': 'text',
+    'email': 'text',
+    'phone': 'text',
+    'num_people': 'int',
+    'arrival_date': 'date',
+    'arrival_time': 'code',
+    'purpose': 'code',
+    'table_number': 'code',
+    'table_capacity': 'code',
+    'section': 'code',
+    'status': 'code',
+    'total_amount': 'float',
+    'order_type': 'code',
+    'created_at': 'datetime',
+    'updated_at': 'datetime'
+}
+_TYPECODES = {'int': 'q', 'float': 'd', 'date': 'i', 'datetime': 'q', 'code': 'i'}
+_DTYPES = {'q': np.int64, 'd': np.float64, 'i': np.int32}
+
+
+class Dictionary:
+    """Dictionary encoding: every distinct value gets a small integer code"""
+    __slots__ = ('values', 'codes')
+
+    def __init__(self, values=()):
+        self.values = []
+        self.codes = {}
+        for value in values:
+            self.encode(value)
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self):
+        return len(self.values)
+
+
+class ReservationColumns:
+    """Reservations extracted column by column for one analytics scan
+
+    Filled in batches from an iterable of documents and dropped once
+    aggregated. It is a compact copy of the scanned fields, not a store: the
+    source still materializes its documents (MemoryCollection.find returns
+    a list of copies), so peak memory is that list plus these arrays.
+    Dates are day ordinals and timestamps microseconds since the epoch (int
+    arrays). Times, tables, statuses and other low-cardinality fields are
+    dictionary-encoded, with arrival times pre-seeded from time_slots so a
+    code is the slot index. Counts and amounts are int/float arrays. Names,
+    emails and phones stay as one list each. A value that does not fit its
+    column (a non-ISO date, an unhashable value, a missing number) is kept
+    verbatim in a sparse per-row extras dict, which mask() and counts()
+    consult. Scans see numbers coerced as AnalyticsStore does (int()/float(),
+    0 when not numeric).
+
+    numpy() returns zero-copy views of the arrays; append() fails with
+    BufferError while any of them is alive, so build first and scan after.
+    """
+
+    def __init__(self, fields=None, time_slots=()):
+        self.fields = tuple(fields or FIELDS)
+        self.kinds = {field: FIELDS.get(field, 'code') for field in self.fields}
+        self.columns = {}
+        self.dictionaries = {}
+        for field, kind in self.kinds.items():
+            if kind == 'id':
+                self.columns[field] = bytearray()
+            elif kind == 'text':
+                self.columns[field] = []
+            else:
+                self.columns[field] = array(_TYPECODES[kind])
+            if kind == 'code':
+                self.dictionaries[field] = Dictionary(time_slots if field == 'arrival_time' else ())
+        self.extras = {}
+        self._dates = {}
+        self._length = 0
+
+    @classmethod
+    def from_documents(cls, documents, fields=None, time_slots=(), batch_size=4096):
+        columns = cls(fields, time_slots)
+        columns.extend(documents, batch_size)
+        return columns
+
+    def __len__(self):
+        return self._length
+
+    # Encoding
+    def _ordinal(self, value):
+        if not isinstance(value, str):
+            return None
+        ordinal = self._dates.get(value)
+        if ordinal is None:
+            try:
+                parsed = date.fromisoformat(value)
+            except ValueError:
+                return None
+            if parsed.isoformat() != value:
+                return None
+            ordinal = self._dates[value] = parsed.toordinal()
+        return ordinal
+
+    def _extra(self, index, field, value):
+        self.extras.setdefault(index, {})[field] = value
+
+    def _encode(self, field, kind, values):
+        """Column entries for a batch of values in one pass; raises when any value needs extras"""
+        if kind == 'id':
+            return b''.join([value.binary for value in values])
+        if kind == 'code':
+            codes, encode = self.dictionaries[field].codes, self.dictionaries[field].encode
+            return [codes[value] if value in codes else encode(value) for value in values]
+        if kind == 'date':
+            dates, ordinal = self._dates, self._ordinal
+            encoded = [dates[value] if value in dates else ordinal(value) for value in values]
+            if None in encoded:
+                raise ValueError('unparseable date')
+            return encoded
+        if kind == 'datetime':
+            return [(value - _EPOCH) // _MICROSECOND for value in values]
+        if kind == 'int' and not all(type(value) is int for value in values):
+            raise TypeError('non-integer count')
+        return array(_TYPECODES[kind], values)
+
+    def _encode_one(self, field, kind, value, index):
+        """Column entry for one value, keeping it in extras when the column cannot represent it"""
+        if kind == 'id' and isinstance(value, ObjectId):
+            return value.binary
+        if kind == 'code':
+            try:
+                return self.dictionaries[field].encode(value)
+            except TypeError:
+                self._extra(index, field, value)
+                return self.dictionaries[field].encode(_MISSING)
+        if kind == 'date' and self._ordinal(value) is not None:
+            return self._ordinal(value)
+        if kind == 'datetime' and isinstance(value, datetime) and value.tzinfo is None:
+            return (value - _EPOCH) // _MICROSECOND
+        if kind == 'int' and type(value) is int or kind == 'float' and type(value) in (int, float):
+            return value
+        self._extra(index, field, value)
+        if kind in ('int', 'float'):
+            try:
+                return (int if kind == 'int' else float)(value or 0)
+            except (TypeError, ValueError):
+                return 0
+        return {'id': bytes(12), 'date': 0, 'datetime': _NO_TIME}[kind]
+
+    def append(self, document):
+        self.extend((document,))
+
+    def extend(self, documents, batch_size=4096):
+        """Append documents, encoding a batch at a time column by column"""
+        documents = iter(documents)
+        while True:
+            batch = list(islice(documents, batch_size))
+            if not batch:
+                return
+            self._append_batch(batch)
+
+    def _append_batch(self, documents):
+        start = self._length
+        for field, kind in self.kinds.items():
+            values = [document.get(field, _MISSING) for document in documents]
+            column = self.columns[field]
+            if kind == 'text':
+                column.extend(values)
+                continue
+            try:
+                encoded = self._encode(field, kind, values)
+            except (AttributeError, TypeError, ValueError, OverflowError):
+                encoded = [self._encode_one(field, kind, value, start + i) for i, value in enumerate(values)]
+                if kind == 'id':
+                    encoded = b''.join(encoded)
+            column.extend(encoded)
+        self._length += len(documents)
+
+    # Vectorized access
+    def numpy(self, field):
+        """Zero-copy view of a number, code, date (ordinal) or datetime (microseconds) column"""
+        column = self.columns[field]
+        return np.frombuffer(column, dtype=_DTYPES[column.typecode])
+
+    def decoded(self, field, transform=None):
+        """Values of field for every row, as numbers for int/float columns and objects otherwise
+
+        Absent and unrepresentable values decode to None (0 for numbers).
+        transform, if given, maps each distinct value of a code field once.
+        """
+        kind = self.kinds[field]
+        if kind in ('int', 'float'):
+            return self.numpy(field)
+        if kind == 'code':
+            labels = [None if value is _MISSING else value for value in self.dictionaries[field].values]
+            if transform is not None:
+                labels = [transform(label) for label in labels]
+            decoded = np.array(labels + [None], dtype=object)[:-1][self.numpy(field)]
+        elif kind == 'date':
+            ordinals, inverse = np.unique(self.numpy(field), return_inverse=True)
+            labels = [date.fromordinal(int(ordinal)).isoformat() if ordinal > 0 else None for ordinal in ordinals]
+            decoded = np.array(labels + [None], dtype=object)[:-1][inverse]
+        elif kind == 'datetime':
+            return self.numpy(field).view('datetime64[us]')
+        else:
+            decoded = np.array(list(self.columns[field]) + [None], dtype=object)[:-1]
+        for index, extra in self.extras.items():
+            if field in extra:
+                decoded[index] = None
+        return decoded
+
+    def mask(self, field, predicate):
+        """Boolean array: predicate(value) for each row of a dictionary-encoded field"""
+        values = [None if value is _MISSING else value for value in self.dictionaries[field].values]
+        matches = np.fromiter((bool(predicate(value)) for value in values), dtype=bool, count=len(values))
+        selected = matches[self.numpy(field)]
+        for index, extra in self.extras.items():
+            if field in extra:
+                selected[index] = bool(predicate(extra[field]))
+        return selected
+
+    def counts(self, field, where=None):
+        """{value: rows} of a dictionary-encoded or date field over the rows selected by where"""
+        codes = self.numpy(field)
+        selected = codes if where is None else codes[where]
+        result = {}
+        if self.kinds[field] == 'code':
+            values = self.dictionaries[field].values
+            for code, count in enumerate(np.bincount(selected, minlength=len(values)).tolist()):
+                if count:
+                    value = None if values[code] is _MISSING else values[code]
+                    result[value] = result.get(value, 0) + count
+        else:
+            ordinals, tallies = np.unique(selected, return_counts=True)
+            for ordinal, count in zip(ordinals.tolist(), tallies.tolist()):
+                result[date.fromordinal(ordinal).isoformat() if ordinal > 0 else None] = count
+        # Rows whose value lives in extras were counted under the placeholder
+        for index, extra in self.extras.items():
+            if field in extra and (where is None or where[index]):
+                placeholder = None if self.kinds[field] == 'date' else \
+                    self.dictionaries[field].values[codes[index]]
+                placeholder = None if placeholder is _MISSING else placeholder
+                result[placeholder] -= 1
+                if not result[placeholder]:
+                    del result[placeholder]
+                value = None if extra[field] is _MISSING else extra[field]
+                result[value] = result.get(value, 0) + 1
+        return result
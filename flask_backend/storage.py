@@ -0,0 +1,610 @@
+"""
+DINE24 Restaurant Management System - In-Memory Storage Engine
+Indexed document collections behind DatabaseManager's find/insert API
+"""
+
+import heapq
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+from itertools import count as counter
+
+from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+# Type ordering used by every index and comparison (BSON sort order, except that
+# bools rank with numbers so index keys agree with matches(), where True == 1)
+_TYPE_RANKS = {
+    type(None): 0,
+    bool: 1,
+    int: 1,
+    float: 1,
+    str: 2,
+    dict: 3,
+    list: 4,
+    ObjectId: 5,
+    datetime: 7
+}
+_OTHER_RANK = 8
+_RANGE_OPERATORS = {'$gt', '$gte', '$lt', '$lte'}
+
+
+class _Bound:
+    """Sentinel that sorts before (or after) any index key"""
+    __slots__ = ('high',)
+
+    def __init__(self, high):
+        self.high = high
+
+    def __lt__(self, other):
+        return not self.high and other is not self
+
+    def __gt__(self, other):
+        return self.high and other is not self
+
+    def __eq__(self, other):
+        return other is self
+
+    __hash__ = object.__hash__
+
+
+MIN_KEY = _Bound(False)
+MAX_KEY = _Bound(True)
+
+
+class _Desc:
+    """Wraps a key component so it sorts in descending order"""
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        if isinstance(other, _Desc):
+            return other.key < self.key
+        return NotImplemented
+
+    def __gt__(self, other):
+        if isinstance(other, _Desc):
+            return self.key < other.key
+        return NotImplemented
+
+    def __eq__(self, other):
+        return isinstance(other, _Desc) and self.key == other.key
+
+    __hash__ = None
+
+
+def sort_key(value):
+    """Normalize a value into a key that is comparable across types"""
+    rank = _TYPE_RANKS.get(type(value), _OTHER_RANK)
+    if rank == 0:
+        return (0,)
+    if rank in (3, 4, _OTHER_RANK):
+        return (rank, repr(value))
+    return (rank, value)
+
+
+def get_field(doc, path):
+    """Resolve a (possibly dotted) field path in a document"""
+    if '.' not in path:
+        return doc.get(path)
+    value = doc
+    for part in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _compare(value, op, operand):
+    """Evaluate a single comparison operator against a field value"""
+    if op == '$eq':
+        return value == operand
+    if op == '$ne':
+        return value != operand
+    if op == '$in':
+        return value in operand
+    if op == '$nin':
+        return value not in operand
+    if op == '$exists':
+        return (value is not None) == bool(operand)
+    left, right = sort_key(value), sort_key(operand)
+    if left[0] != right[0]:
+        return False
+    if op == '$gt':
+        return left > right
+    if op == '$gte':
+        return left >= right
+    if op == '$lt':
+        return left < right
+    if op == '$lte':
+        return left <= right
+    raise ValueError(f"Unsupported query operator: {op}")
+
+
+def matches(doc, query):
+    """Check whether a document satisfies a query filter"""
+    for field, condition in query.items():
+        if field == '$or':
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+            continue
+        if field == '$and':
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+            continue
+        value = get_field(doc, field)
+        if isinstance(condition, dict) and condition and next(iter(condition)).startswith('$'):
+            for op, operand in condition.items():
+                if not _compare(value, op, operand):
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+class InsertOneResult:
+    """Result of a single-document insert"""
+    __slots__ = ('inserted_id',)
+
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class InsertManyResult:
+    """Result of a bulk insert"""
+    __slots__ = ('inserted_ids',)
+
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+
+
+class UpdateResult:
+    """Result of an update operation"""
+    __slots__ = ('matched_count', 'modified_count', 'upserted_id')
+
+    def __init__(self, matched_count, modified_count, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+
+
+class DeleteResult:
+    """Result of a delete operation"""
+    __slots__ = ('deleted_count',)
+
+    def __init__(self, deleted_count):
+        self.deleted_count = deleted_count
+
+
+class SortedIndex:
+    """Secondary index kept as a sorted list of (key..., row_id) tuples"""
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.spec = list(spec)
+        self.fields = [field for field, _ in self.spec]
+        self.entries = []
+
+    def make_key(self, doc, row_id):
+        key = []
+        for field, direction in self.spec:
+            value = sort_key(get_field(doc, field))
+            key.append(_Desc(value) if direction < 0 else value)
+        key.append(row_id)
+        return tuple(key)
+
+    def add(self, doc, row_id):
+        insort(self.entries, self.make_key(doc, row_id))
+
+    def remove(self, doc, row_id):
+        key = self.make_key(doc, row_id)
+        position = bisect_left(self.entries, key)
+        if position < len(self.entries) and self.entries[position] == key:
+            del self.entries[position]
+
+    def bounds(self, prefix, range_condition=None):
+        """Return [low, high) entry positions for an equality prefix and optional range"""
+        entries = self.entries
+        keys = []
+        for (field, direction), value in zip(self.spec, prefix):
+            value = sort_key(value)
+            keys.append(_Desc(value) if direction < 0 else value)
+        keys = tuple(keys)
+        if not range_condition:
+            return bisect_left(entries, keys), bisect_left(entries, keys + (MAX_KEY,))
+
+        lower = upper = None
+        ranks = set()
+        for op, operand in range_condition.items():
+            ranks.add(sort_key(operand)[0])
+            if op in ('$gt', '$gte'):
+                bound = (sort_key(operand), op == '$gte')
+                # Several operators per side keep the tightest (exclusive wins a tie)
+                if lower is None or (bound[0], not bound[1]) > (lower[0], not lower[1]):
+                    lower = bound
+            elif op in ('$lt', '$lte'):
+                bound = (sort_key(operand), op == '$lte')
+                if upper is None or bound < upper:
+                    upper = bound
+        # Bracket the scan to the operands' type, as comparisons never cross types
+        if len(ranks) > 1:
+            low = bisect_left(entries, keys + (MIN_KEY,))
+            return low, low
+        rank = ranks.pop()
+        if self.spec[len(prefix)][1] < 0:
+            low_key = keys + (_Desc((rank, MAX_KEY)),)
+            high_key = keys + (_Desc((rank,)), MAX_KEY)
+            if upper:
+                low_key = keys + ((_Desc(upper[0]),) if upper[1] else (_Desc(upper[0]), MAX_KEY))
+            if lower:
+                high_key = keys + ((_Desc(lower[0]), MAX_KEY) if lower[1] else (_Desc(lower[0]),))
+        else:
+            low_key = keys + ((rank,),)
+            high_key = keys + ((rank, MAX_KEY),)
+            if lower:
+                low_key = keys + ((lower[0],) if lower[1] else (lower[0], MAX_KEY))
+            if upper:
+                high_key = keys + ((upper[0], MAX_KEY) if upper[1] else (upper[0],))
+        low = bisect_left(entries, low_key)
+        return low, max(low, bisect_left(entries, high_key))
+
+    def row_ids(self, low=0, high=None, reverse=False):
+        if high is None:
+            high = len(self.entries)
+        positions = range(high - 1, low - 1, -1) if reverse else range(low, high)
+        entries = self.entries
+        for position in positions:
+            yield entries[position][-1]
+
+
+class QueryPlan:
+    """Access path chosen by the planner for a single query"""
+    __slots__ = ('stage', 'index', 'low', 'high', 'reverse', 'sort_covered',
+                 'eq_fields', 'range_field', 'residual', 'cost')
+
+    def __init__(self, stage, index=None, low=0, high=0, reverse=False, sort_covered=False,
+                 eq_fields=(), range_field=None, residual=True, cost=0):
+        self.stage = stage
+        self.index = index
+        self.low = low
+        self.high = high
+        self.reverse = reverse
+        self.sort_covered = sort_covered
+        self.eq_fields = list(eq_fields)
+        self.range_field = range_field
+        self.residual = residual
+        self.cost = cost
+
+    def describe(self):
+        plan = {'stage': self.stage, 'estimated_keys': self.cost}
+        if self.index is not None:
+            plan.update({
+                'index': self.index.name,
+                'key_pattern': dict(self.index.spec),
+                'direction': 'backward' if self.reverse else 'forward',
+                'equality_fields': self.eq_fields,
+                'range_field': self.range_field,
+                'sort_pushdown': self.sort_covered,
+                'filter': self.residual
+            })
+        return plan
+
+
+class MemoryCollection:
+    """Thread-safe in-memory document collection with secondary indexes"""
+
+    def __init__(self, name):
+        self.name = name
+        self._docs = {}
+        self._row_ids = {}
+        self._next_row = counter()
+        self._lock = threading.RLock()
+        self.indexes = {}
+
+    # Index Management
+    def create_index(self, keys, name=None):
+        """Create (or return the existing) index for the given key spec"""
+        if isinstance(keys, str):
+            keys = [(keys, 1)]
+        elif isinstance(keys, dict):
+            keys = list(keys.items())
+        name = name or '_'.join(f"{field}_{direction}" for field, direction in keys)
+        with self._lock:
+            if name not in self.indexes:
+                index = SortedIndex(name, keys)
+                index.entries = sorted(index.make_key(doc, row_id) for row_id, doc in self._docs.items())
+                self.indexes[name] = index
+        return name
+
+    def index_information(self):
+        return {name: {'key': index.spec} for name, index in self.indexes.items()}
+
+    # Writes
+    def insert_one(self, document):
+        with self._lock:
+            self._insert(document)
+        return InsertOneResult(document['_id'])
+
+    def insert_many(self, documents):
+        inserted_ids = []
+        with self._lock:
+            for document in documents:
+                self._insert(document)
+                inserted_ids.append(document['_id'])
+        return InsertManyResult(inserted_ids)
+
+    def _insert(self, document):
+        if '_id' not in document:
+            document['_id'] = ObjectId()
+        if document['_id'] in self._row_ids:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} _id: {document['_id']}", 11000)
+        stored = dict(document)
+        row_id = next(self._next_row)
+        self._docs[row_id] = stored
+        self._row_ids[stored['_id']] = row_id
+        for index in self.indexes.values():
+            index.add(stored, row_id)
+
+    def update_one(self, query, update):
+        """Apply $set/$inc/$unset to the first matching document"""
+        with self._lock:
+            for doc in self._execute(query, limit=1):
+                row_id = self._row_ids[doc['_id']]
+                updated = self._apply_update(doc, update)
+                modified = updated != doc
+                if modified:
+                    self._replace(row_id, doc, updated)
+                return UpdateResult(1, int(modified))
+        return UpdateResult(0, 0)
+
+    def replace_one(self, query, replacement, upsert=False):
+        """Replace the first matching document, inserting replacement when upsert is set"""
+        with self._lock:
+            for doc in self._execute(query, limit=1):
+                row_id = self._row_ids[doc['_id']]
+                updated = dict(replacement, _id=doc['_id'])
+                modified = updated != doc
+                if modified:
+                    self._replace(row_id, doc, updated)
+                return UpdateResult(1, int(modified))
+            if not upsert:
+                return UpdateResult(0, 0)
+            document = dict(replacement)
+            if '_id' not in document and isinstance(query.get('_id'), (str, int, ObjectId)):
+                document['_id'] = query['_id']
+            self._insert(document)
+            return UpdateResult(0, 0, document['_id'])
+
+    def delete_one(self, query):
+        with self._lock:
+            for doc in self._execute(query, limit=1):
+                row_id = self._row_ids.pop(doc['_id'])
+                for index in self.indexes.values():
+                    index.remove(doc, row_id)
+                del self._docs[row_id]
+                return DeleteResult(1)
+        return DeleteResult(0)
+
+    def delete_many(self, query):
+        with self._lock:
+            docs = self._execute(query)
+            for doc in docs:
+                row_id = self._row_ids.pop(doc['_id'])
+                for index in self.indexes.values():
+                    index.remove(doc, row_id)
+                del self._docs[row_id]
+        return DeleteResult(len(docs))
+
+    @staticmethod
+    def _apply_update(doc, update):
+        updated = dict(doc)
+        for op, fields in update.items():
+            if op == '$set':
+                updated.update(fields)
+            elif op == '$inc':
+                for field, amount in fields.items():
+                    updated[field] = (updated.get(field) or 0) + amount
+            elif op == '$unset':
+                for field in fields:
+                    updated.pop(field, None)
+            else:
+                raise ValueError(f"Unsupported update operator: {op}")
+        updated['_id'] = doc['_id']
+        return updated
+
+    def _replace(self, row_id, old, new):
+        for index in self.indexes.values():
+            index.remove(old, row_id)
+            index.add(new, row_id)
+        self._docs[row_id] = new
+
+    # Query Planning
+    def _plan(self, query, sort=None, limit=0, skip=0, candidates=None):
+        """Choose the cheapest access path for a query
+
+        Every index whose leading fields are constrained by the query (or whose
+        order satisfies the requested sort) is costed by the exact number of keys
+        inside its bounds, found by bisection. An in-memory sort doubles the cost,
+        while an ordered walk with a limit and no residual filter stops early.
+        """
+        total = len(self._docs)
+        if '_id' in query and not isinstance(query['_id'], dict):
+            row_id = self._row_ids.get(query['_id'])
+            return QueryPlan('IDHACK', low=row_id, residual=len(query) > 1, sort_covered=True, cost=1)
+
+        equalities = {}
+        ranges = {}
+        for field, condition in query.items():
+            if field.startswith('$'):
+                continue
+            if isinstance(condition, dict) and set(condition) != {'$eq'}:
+                if set(condition) & _RANGE_OPERATORS:
+                    ranges[field] = {op: operand for op, operand in condition.items() if op in _RANGE_OPERATORS}
+                continue
+            value = condition['$eq'] if isinstance(condition, dict) else condition
+            # Documents and arrays are keyed by repr, which equality does not respect
+            if sort_key(value)[0] not in (3, 4, _OTHER_RANK):
+                equalities[field] = value
+
+        wanted = skip + limit if limit else 0
+        best = QueryPlan('COLLSCAN', high=total, cost=total * 2 if sort else total)
+        if wanted and not sort and not query:
+            best.cost = min(total, wanted)
+        for index in self.indexes.values():
+            prefix = []
+            for field in index.fields:
+                if field not in equalities:
+                    break
+                prefix.append(equalities[field])
+            depth = len(prefix)
+            range_field = None
+            if depth < len(index.fields) and index.fields[depth] in ranges:
+                range_field = index.fields[depth]
+            sort_covered, reverse = self._sort_order(index, depth, sort, equalities)
+            if not depth and not range_field and not (sort and sort_covered):
+                continue
+
+            low, high = index.bounds(prefix, ranges.get(range_field))
+            consumed = set(index.fields[:depth])
+            # The bounds are exact only for a pure range on comparable operands (NaN is not)
+            condition = query[range_field] if range_field else {}
+            if range_field and set(condition) <= _RANGE_OPERATORS and all(value == value for value in condition.values()):
+                consumed.add(range_field)
+            residual = bool(set(query) - consumed)
+            examined = high - low
+            if sort and not sort_covered:
+                cost = examined * 2
+            elif wanted and not residual:
+                cost = min(examined, wanted)
+            else:
+                cost = examined
+            plan = QueryPlan('IXSCAN', index, low, high, reverse, sort_covered,
+                             index.fields[:depth], range_field, residual, cost)
+            if candidates is not None:
+                candidates.append(plan)
+            if (cost, -depth, len(index.fields)) < (best.cost, -len(best.eq_fields), len(best.index.fields) if best.index else 0):
+                best = plan
+        return best
+
+    @staticmethod
+    def _sort_order(index, depth, sort, equalities):
+        """Return (covered, reverse) for walking an index in the requested sort order"""
+        if not sort:
+            return True, False
+        remaining = [(field, direction) for field, direction in sort if field not in equalities]
+        if not remaining:
+            return True, False
+        spec = index.spec[depth:depth + len(remaining)]
+        if [field for field, _ in spec] != [field for field, _ in remaining]:
+            return False, False
+        same = [direction == index_direction for (_, direction), (_, index_direction) in zip(remaining, spec)]
+        if all(same):
+            return True, False
+        if not any(same):
+            return True, True
+        return False, False
+
+    def _plan_rows(self, plan):
+        if plan.stage == 'IDHACK':
+            return [] if plan.low is None else [plan.low]
+        if plan.stage == 'COLLSCAN':
+            return self._docs
+        return plan.index.row_ids(plan.low, plan.high, plan.reverse)
+
+    def _execute(self, query, sort=None, limit=0, skip=0, stats=None, candidates=None):
+        """Run a query through the chosen plan, returning the stored documents"""
+        plan = self._plan(query, sort, limit, skip, candidates)
+        docs = self._docs
+        wanted = skip + limit if limit else 0
+        stop_early = wanted and (plan.sort_covered or not sort)
+        results = []
+        examined = 0
+        for row_id in self._plan_rows(plan):
+            examined += 1
+            doc = docs[row_id]
+            if not plan.residual or matches(doc, query):
+                results.append(doc)
+                if stop_early and len(results) >= wanted:
+                    break
+        if sort and not plan.sort_covered:
+            order = lambda doc: tuple(_Desc(sort_key(get_field(doc, field))) if direction < 0
+                                      else sort_key(get_field(doc, field)) for field, direction in sort)
+            results = heapq.nsmallest(wanted, results, key=order) if wanted else sorted(results, key=order)
+        if skip:
+            results = results[skip:]
+        if limit:
+            results = results[:limit]
+        if stats is not None:
+            stats['plan'] = plan
+            stats['keys_examined'] = examined if plan.stage != 'COLLSCAN' else 0
+            stats['docs_examined'] = examined
+            stats['n_returned'] = len(results)
+        return results
+
+    # Reads
+    def find(self, query=None, sort=None, limit=0, skip=0):
+        """Return an iterator of matching document copies"""
+        with self._lock:
+            results = [dict(doc) for doc in self._execute(query or {}, sort, limit, skip)]
+        return iter(results)
+
+    def find_one(self, query=None):
+        for doc in self.find(query, limit=1):
+            return doc
+        return None
+
+    def count_documents(self, query=None):
+        query = query or {}
+        with self._lock:
+            if not query:
+                return len(self._docs)
+            plan = self._plan(query)
+            if plan.stage == 'IXSCAN' and not plan.residual:
+                return plan.high - plan.low
+            return len(self._execute(query))
+
+    def explain(self, query=None, sort=None, limit=0, skip=0):
+        """Report the winning plan, rejected candidates and execution counters"""
+        query = query or {}
+        stats = {}
+        candidates = []
+        with self._lock:
+            self._execute(query, sort, limit, skip, stats, candidates)
+        plan = stats.pop('plan')
+        return {
+            'collection': self.name,
+            'query': query,
+            'sort': sort,
+            'limit': limit,
+            'winning_plan': plan.describe(),
+            'rejected_plans': [candidate.describe() for candidate in candidates if candidate is not plan],
+            'execution_stats': stats
+        }
+
+    def drop(self):
+        with self._lock:
+            self._docs.clear()
+            self._row_ids.clear()
+            for index in self.indexes.values():
+                index.entries = []
+
+
+class MemoryDatabase:
+    """Dictionary of named in-memory collections, created on first access"""
+
+    def __init__(self, name):
+        self.name = name
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        collection = self._collections.get(name)
+        if collection is None:
+            with self._lock:
+                collection = self._collections.setdefault(name, MemoryCollection(name))
+        return collection
+
+    def list_collection_names(self):
+        return list(self._collections)
@@ -0,0 +1,17 @@
+"""
+DINE24 Restaurant Management System - Test Configuration
+Puts the backend modules on the import path and keeps test runs off shared state
+"""
+
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Read by config at import time, so set before any test imports the app
+os.environ.setdefault('DATABASE_BACKEND', 'memory')
+os.environ.setdefault('CACHE_TYPE', 'simple')
+os.environ.setdefault('MAIL_OUTBOX_DIR', tempfile.mkdtemp(prefix='dine24-test-mail-'))
+os.environ.setdefault('MENU_SNAPSHOT_DIR', tempfile.mkdtemp(prefix='dine24-test-menu-'))
@@ -0,0 +1,118 @@
+"""
+DINE24 Restaurant Management System - Analytics Tests
+AnalyticsStore rebuilt from a scan must agree with its per-write updates
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from analytics import AnalyticsStore
+
+
+def reservations():
+    start = datetime(2026, 10, 1, 12)
+    documents = []
+    for i in range(40):
+        documents.append({
+            '_id': f'r{i}',
+            'num_people': i % 6 + 1,
+            'arrival_date': f'2026-10-{i % 5 + 20}',
+            'arrival_time': ['18:00', '19:00', '20:30'][i % 3],
+            'table_number': f'A{i % 4 + 1}' if i % 7 else None,
+            'status': 'cancelled' if i % 4 == 0 else 'confirmed',
+            'total_amount': float(i * 10) if i % 3 else None,
+            # Two reservations share each created_at, so ties are exercised
+            'created_at': start + timedelta(minutes=i // 2)
+        })
+    # Values that do not fit a column are carried verbatim
+    documents.append({'_id': 'odd', 'num_people': '3', 'arrival_date': 'next friday', 'arrival_time': '19:00',
+                      'table_number': 'B1', 'status': 'confirmed', 'total_amount': '12.5', 'created_at': None})
+    return documents
+
+
+MENU = [
+    {'_id': f'm{i}', 'name': f'Dish {i}', 'rating': 4 + i % 2 * 0.5, 'orders_placed': i * 3 % 11}
+    for i in range(8)
+]
+
+
+def make_store(documents, menu=MENU):
+    return AnalyticsStore(lambda: iter(documents), lambda: iter(menu), table_count=4, slot_count=3,
+                          recent_k=5, resync_interval=0)
+
+
+def replayed(documents):
+    """The same store built by the write paths, one document at a time"""
+    store = make_store([], [])
+    store.rebuild()
+    for document in sorted(documents, key=lambda doc: doc.get('created_at') or datetime.min):
+        store.record_reservation(document)
+    for item in MENU:
+        store.record_menu_item(item)
+    return store
+
+
+def test_rebuild_aggregates_the_scan():
+    documents = reservations()
+    store = make_store(documents)
+    store.rebuild()
+    snapshot = store.snapshot()
+
+    active = [doc for doc in documents if doc['status'] != 'cancelled']
+    amounts = [float(doc['total_amount'] or 0) for doc in active]
+    assert snapshot['total_reservations'] == 41
+    assert snapshot['status_counts'] == {'cancelled': 10, 'confirmed': 31}
+    assert snapshot['total_covers'] == sum(int(doc['num_people']) for doc in active)
+    assert snapshot['total_revenue'] == round(sum(amounts), 2)
+    assert snapshot['average_order_value'] == round(sum(amounts) / sum(1 for amount in amounts if amount), 2)
+    assert sum(snapshot['peak_hours'].values()) == len(active)
+    assert snapshot['total_menu_items'] == 8
+    assert snapshot['customer_satisfaction'] == 4.25
+    assert [item['orders_placed'] for item in snapshot['popular_items']] == [10, 9, 7, 6, 4]
+
+
+def test_recent_keeps_the_newest_and_later_ties_first():
+    store = make_store(reservations())
+    store.rebuild()
+    assert [doc['_id'] for doc in store.snapshot()['recent_reservations']] == ['r39', 'r38', 'r37', 'r36', 'r35']
+
+
+def test_rebuild_matches_the_write_paths():
+    documents = reservations()
+    rebuilt = make_store(documents)
+    rebuilt.rebuild()
+    live = replayed(documents)
+    expected = rebuilt.snapshot()
+    actual = live.snapshot()
+    for key in expected:
+        if key == 'recent_reservations':
+            assert [doc['_id'] for doc in actual[key]] == [doc['_id'] for doc in expected[key]]
+        elif key == 'popular_items':
+            assert [item['orders_placed'] for item in actual[key]] == [item['orders_placed'] for item in expected[key]]
+        else:
+            assert actual[key] == pytest.approx(expected[key]), key
+
+
+def test_cancellation_is_moved_between_statuses():
+    documents = reservations()
+    store = make_store(documents)
+    store.rebuild()
+    before = store.snapshot()
+
+    confirmed = next(doc for doc in documents if doc['status'] == 'confirmed' and doc['total_amount'])
+    store.record_cancellation(dict(confirmed))
+    confirmed['status'] = 'cancelled'
+    after = store.snapshot()
+    assert after['status_counts']['cancelled'] == before['status_counts']['cancelled'] + 1
+    assert after['total_covers'] == before['total_covers'] - confirmed['num_people']
+    assert after['total_revenue'] == round(before['total_revenue'] - confirmed['total_amount'], 2)
+    assert store.verify() == {}
+
+
+def test_verify_reports_drift():
+    documents = reservations()
+    store = make_store(documents)
+    store.rebuild()
+    documents.append(dict(documents[1], _id='late', created_at=datetime(2026, 10, 2)))
+    assert set(store.verify()) >= {'total_reservations', 'recent_reservations'}
@@ -0,0 +1,133 @@
+"""
+DINE24 Restaurant Management System - Table Availability Tests
+Booking, release and the calendar over the in-memory backend
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from availability import AvailabilityCalendar, SlotUnavailable, TableAvailability
+from database import DatabaseManager
+
+TABLES = [
+    {'table_number': 'T6', 'seating_capacity': 6, 'section': 'Main Dining'},
+    {'table_number': 'T2', 'seating_capacity': 2, 'section': 'Main Dining'},
+    {'table_number': 'T4', 'seating_capacity': 4, 'section': 'Main Dining'},
+    {'table_number': 'P4', 'seating_capacity': 4, 'section': 'Patio'}
+]
+SLOTS = ['18:00', '18:30', '19:00', '19:30']
+
+
+@pytest.fixture
+def db_manager():
+    return DatabaseManager(backend='memory')
+
+
+@pytest.fixture
+def engine(db_manager):
+    return TableAvailability(db_manager, TABLES, SLOTS, slot_span=2, grid_ttl=60)
+
+
+@pytest.fixture
+def day():
+    return (datetime.utcnow().date() + timedelta(days=1)).isoformat()
+
+
+def free_tables(engine, day, time, party_size=1):
+    return [table['table_number'] for table in engine.available_tables(day, time, party_size)]
+
+
+def test_smallest_fitting_table_is_booked(engine, day):
+    assert engine.book(day, '18:00', 2, 'r1')['table_number'] == 'T2'
+    assert engine.book(day, '18:00', 3, 'r2')['table_number'] == 'T4'
+    assert engine.book(day, '18:00', 3, 'r3', section='Patio')['table_number'] == 'P4'
+    assert engine.book(day, '18:00', 2, 'r4')['table_number'] == 'T6'
+    with pytest.raises(SlotUnavailable):
+        engine.book(day, '18:00', 1, 'r5')
+
+
+def test_requested_table_must_be_free_and_large_enough(engine, day):
+    with pytest.raises(SlotUnavailable):
+        engine.book(day, '18:00', 5, 'r1', table_number='T4')
+    assert engine.book(day, '18:00', 4, 'r1', table_number='T4')['table_number'] == 'T4'
+    with pytest.raises(SlotUnavailable):
+        engine.book(day, '18:00', 2, 'r2', table_number='T4')
+
+
+def test_booking_holds_its_span_until_released(engine, db_manager, day):
+    engine.book(day, '18:00', 2, 'r1', table_number='T2')
+    assert 'T2' not in free_tables(engine, day, '18:00')
+    assert 'T2' not in free_tables(engine, day, '18:30')
+    assert 'T2' in free_tables(engine, day, '19:00')
+    # An 18:30 booking would overlap the slot 18:00 still holds
+    with pytest.raises(SlotUnavailable):
+        engine.book(day, '18:30', 2, 'r2', table_number='T2')
+    assert db_manager.count('table_slots', {'reservation_id': 'r1'}) == 2
+
+    engine.release(day, '18:00', 'T2')
+    assert 'T2' in free_tables(engine, day, '18:00')
+    assert 'T2' in free_tables(engine, day, '18:30')
+    assert db_manager.count('table_slots') == 0
+
+
+def test_stale_grid_falls_through_to_the_next_table(db_manager, day):
+    first = TableAvailability(db_manager, TABLES, SLOTS, grid_ttl=60)
+    second = TableAvailability(db_manager, TABLES, SLOTS, grid_ttl=60)
+    assert 'T2' in free_tables(second, day, '19:00')
+    assert first.book(day, '19:00', 2, 'r1')['table_number'] == 'T2'
+
+    # second still trusts its grid; the claim's duplicate key sends it on
+    assert second.book(day, '19:00', 2, 'r2')['table_number'] == 'T4'
+    with pytest.raises(SlotUnavailable):
+        second.book(day, '19:00', 2, 'r3', table_number='T2')
+
+
+def test_calendar_tracks_bookings_and_releases(engine, day):
+    calendar = AvailabilityCalendar(engine, max_days_ahead=3)
+    today = datetime.utcnow().date()
+    assert calendar.buckets == [2, 4, 6]
+    assert calendar.get(today, 3)[day][0] == [4, 3, 1]
+
+    engine.book(day, '18:00', 5, 'r1')
+    counts = calendar.get(today, 3)[day]
+    assert counts[0] == [3, 2, 0]
+    assert counts[1] == [3, 2, 0]
+    assert counts[2] == [4, 3, 1]
+
+    engine.release(day, '18:00', 'T6')
+    assert calendar.get(today, 3)[day][0] == [4, 3, 1]
+
+
+def test_calendar_window_stops_at_the_horizon(engine):
+    calendar = AvailabilityCalendar(engine, max_days_ahead=3)
+    today = datetime.utcnow().date()
+    assert len(calendar.get()) == 4
+    assert list(calendar.get(today + timedelta(days=2), 10)) == [
+        (today + timedelta(days=offset)).isoformat() for offset in (2, 3)
+    ]
+
+
+def test_calendar_evicts_expired_days(engine):
+    calendar = AvailabilityCalendar(engine, max_days_ahead=3, ttl=0)
+    today = datetime.utcnow().date()
+    calendar.get(today, 4)
+    assert len(calendar._days) == 4
+    calendar.get(today, 1)
+    assert list(calendar._days) == [today.isoformat()]
+
+
+def test_calendar_route_rejects_starts_outside_the_window():
+    from app import app
+    from config import Config
+
+    client = app.test_client()
+    today = datetime.utcnow().date()
+    for start in (today - timedelta(days=1), today + timedelta(days=Config.MAX_RESERVATION_DAYS_ADVANCE + 1)):
+        response = client.get(f'/api/availability/calendar?start={start.isoformat()}')
+        assert response.status_code == 400
+    response = client.get('/api/availability/calendar?start=9999-12-31')
+    assert response.status_code == 400
+    response = client.get(f'/api/availability/calendar?start={today.isoformat()}&days=2')
+    assert response.status_code == 200
+    assert len(response.get_json()['availability']) == 2
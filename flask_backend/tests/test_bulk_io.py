@@ -0,0 +1,119 @@
+"""
+DINE24 Restaurant Management System - Bulk Import/Export Tests
+ReservationImporter against the in-memory backend and its availability grid
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from bulk_io import ReservationImporter, export_records, read_records
+from database import DatabaseManager
+
+
+class FailingInserts(DatabaseManager):
+    """DatabaseManager whose bulk reservation insert always fails"""
+
+    def insert_many(self, collection, documents):
+        if collection == 'reservations':
+            raise RuntimeError('write concern timeout')
+        return super().insert_many(collection, documents)
+
+
+@pytest.fixture
+def db_manager():
+    return DatabaseManager(backend='memory')
+
+
+@pytest.fixture
+def day():
+    return (datetime.utcnow().date() + timedelta(days=1)).isoformat()
+
+
+def record(day, name='Guest', **fields):
+    record = {'full_name': name, 'email': 'guest@example.com', 'phone': '+15550100',
+              'num_people': 2, 'arrival_date': day, 'arrival_time': '19:00'}
+    record.update(fields)
+    return record
+
+
+def ndjson(*lines):
+    return [line if isinstance(line, str) else json.dumps(line) for line in lines]
+
+
+def claims(db_manager):
+    return sorted(claim['table_number'] for claim in db_manager.find('table_slots'))
+
+
+def run(db_manager, lines, fmt='ndjson', **options):
+    return ReservationImporter(db_manager, **options).run(read_records(lines, fmt))
+
+
+def test_bad_lines_are_reported_and_the_rest_imported(db_manager, day):
+    created = []
+    report = run(db_manager, ndjson(
+        record(day, 'Ada', table_number='A1'),
+        '{not json',
+        record(day, 'Bo', total_amount='lots'),
+        record(day, 'Cy', num_people=0),
+        record(day, 'Di', status='pending'),
+        record(day, 'Ed', created_at='yesterday'),
+        record(day, 'Flo', table_number='A1'),
+        record(day, 'Gus', table_number='B1', total_amount='42.5')
+    ), on_created=created.append)
+
+    assert report['imported'] == 2
+    assert [error['line'] for error in report['errors']] == [2, 3, 4, 5, 6, 7]
+    assert report['errors'][1]['error'] == 'Invalid total amount'
+    assert 'A1' in report['errors'][5]['error']
+    assert claims(db_manager) == ['A1', 'B1']
+    assert sorted(document['full_name'] for document in created) == ['Ada', 'Gus']
+    assert db_manager.find_one('reservations', {'full_name': 'Gus'})['total_amount'] == 42.5
+
+
+def test_cancelled_records_keep_their_table_without_claiming_it(db_manager, day):
+    report = run(db_manager, ndjson(
+        record(day, 'Ada', table_number='A1', status='cancelled', created_at='2026-01-02T03:04:05'),
+        record(day, 'Bo', table_number='A1')
+    ))
+    assert report['imported'] == 2
+    cancelled = db_manager.find_one('reservations', {'full_name': 'Ada'})
+    assert cancelled['status'] == 'cancelled'
+    assert cancelled['table_number'] == 'A1'
+    assert cancelled['created_at'] == datetime(2026, 1, 2, 3, 4, 5)
+    assert claims(db_manager) == ['A1']
+
+
+def test_conflicts_are_caught_across_batches(db_manager, day):
+    report = run(db_manager, ndjson(*[record(day, f'Guest {i}', num_people=8) for i in range(6)]), batch_size=2)
+    # Three tables seat eight: A5, C1 and C2
+    assert report['imported'] == report['failed'] == 3
+    assert db_manager.count('reservations') == 3
+    assert claims(db_manager) == ['A5', 'C1', 'C2']
+    assert not db_manager.availability.available_tables(day, '19:00', 8)
+
+
+def test_failed_insert_releases_the_claims(day):
+    db_manager = FailingInserts(backend='memory')
+    report = run(db_manager, ndjson(record(day, 'Ada'), record(day, 'Bo', status='cancelled', table_number='A2')))
+    assert report['imported'] == 0
+    assert [error['error'] for error in report['errors']] == ['Insert failed: write concern timeout'] * 2
+    assert claims(db_manager) == []
+
+
+def test_export_round_trips_through_csv(db_manager, day):
+    run(db_manager, ndjson(record(day, 'Ada', table_number='A1', purpose='Birthday'),
+                           record(day, 'Bo', status='cancelled', table_number='B1')))
+    exported = ''.join(export_records(db_manager.find('reservations', sort=[('full_name', 1)]), 'csv'))
+
+    restored = DatabaseManager(backend='memory')
+    report = run(restored, exported.splitlines(keepends=True), 'csv')
+    assert report == {'imported': 2, 'failed': 0, 'errors': [], 'errors_truncated': False}
+    fields = ('full_name', 'table_number', 'purpose', 'status', 'created_at')
+    original = [tuple(document[field] for field in fields)
+                for document in db_manager.find('reservations', sort=[('full_name', 1)])]
+    copied = [tuple(document[field] for field in fields)
+              for document in restored.find('reservations', sort=[('full_name', 1)])]
+    assert copied == original
+    assert claims(restored) == ['A1']
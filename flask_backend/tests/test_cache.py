@@ -0,0 +1,82 @@
+"""
+DINE24 Restaurant Management System - Two-Tier Cache Tests
+Two cache instances sharing one fakeredis server stand in for two gunicorn workers
+"""
+
+import fakeredis
+import pytest
+
+from cache import TwoTierCache
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def make_cache(server, **options):
+    options.setdefault('tag_sync_interval', 0)
+    return TwoTierCache(lambda: fakeredis.FakeRedis(server=server), prefix='test:', **options)
+
+
+class Counter:
+    def __init__(self, value='v1'):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def test_l2_hit_from_another_instance(server):
+    first, second = make_cache(server), make_cache(server)
+    compute = Counter()
+
+    assert first.get_or_set('menu', compute, tags=('menu_items',)) == 'v1'
+    assert second.get_or_set('menu', compute, tags=('menu_items',)) == 'v1'
+    assert compute.calls == 1
+    assert second.stats()['l2_hits'] == 1
+
+
+def test_invalidation_reaches_other_instance(server):
+    first, second = make_cache(server), make_cache(server)
+    compute = Counter()
+    first.get_or_set('menu', compute, tags=('menu_items',))
+    assert second.get_or_set('menu', compute, tags=('menu_items',)) == 'v1'
+    assert second.get_or_set('menu', compute, tags=('menu_items',)) == 'v1'
+    assert second.stats()['l1_hits'] == 1
+
+    compute.value = 'v2'
+    first.invalidate('menu_items')
+
+    # second still holds v1 in its L1, but at the old tag version
+    assert second.get_or_set('menu', compute, tags=('menu_items',)) == 'v2'
+    assert first.get_or_set('menu', compute, tags=('menu_items',)) == 'v2'
+    assert compute.calls == 2
+
+
+def test_invalidation_waits_for_tag_sync(server):
+    first, second = make_cache(server), make_cache(server, tag_sync_interval=3600)
+    compute = Counter()
+    first.get_or_set('menu', compute, tags=('menu_items',))
+    second.get_or_set('menu', compute, tags=('menu_items',))
+    second.get_or_set('menu', compute, tags=('menu_items',))
+
+    compute.value = 'v2'
+    first.invalidate('menu_items')
+    assert second.get_or_set('menu', compute, tags=('menu_items',)) == 'v1'
+
+    second.tag_sync_interval = 0
+    assert second.get_or_set('menu', compute, tags=('menu_items',)) == 'v2'
+
+
+def test_unreachable_l2_falls_back_to_l1(server):
+    server.connected = False
+    cache = make_cache(server, retry_interval=60)
+    compute = Counter()
+
+    assert cache.get_or_set('menu', compute, tags=('menu_items',)) == 'v1'
+    assert cache.get_or_set('menu', compute, tags=('menu_items',)) == 'v1'
+    assert compute.calls == 1
+    assert cache.stats()['l2'] == 'down'
@@ -0,0 +1,98 @@
+"""
+DINE24 Restaurant Management System - Streaming Chat Tests
+/api/ai-chat relaying tokens from the local fake completion server over SSE
+"""
+
+import json
+import time
+
+import openai
+import pytest
+
+import fake_openai
+from app import app, db_manager
+
+CHUNKS = 10
+DELAY = 0.1
+
+QUESTION = 'Which saffron dessert pairs well with masala chai?'
+
+
+@pytest.fixture(scope='module')
+def completion_server():
+    server = fake_openai.serve(0, chunks=CHUNKS, delay=DELAY, first_token_delay=0.05, background=True)
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def openai_at(monkeypatch):
+    def point(api_base):
+        monkeypatch.setattr(openai, 'api_base', api_base)
+        monkeypatch.setattr(openai, 'api_key', 'test')
+    return point
+
+
+def read_events(response):
+    """Yield (seconds since the request, event name, data) for each SSE event as it arrives"""
+    started = time.perf_counter()
+    buffer = ''
+    for chunk in response.response:
+        buffer += chunk.decode('utf-8') if isinstance(chunk, bytes) else chunk
+        while '\n\n' in buffer:
+            raw, buffer = buffer.split('\n\n', 1)
+            fields = dict(line.split(': ', 1) for line in raw.splitlines())
+            yield time.perf_counter() - started, fields.get('event', 'message'), json.loads(fields['data'])
+
+
+def chat_logs(message):
+    db_manager.write_buffer.flush()
+    return list(db_manager.find('chat_logs', {'user_message': message}))
+
+
+def test_tokens_are_relayed_as_they_arrive(completion_server, openai_at):
+    openai_at(completion_server)
+    response = app.test_client().post('/api/ai-chat', json={'message': QUESTION, 'stream': True}, buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+
+    events = list(read_events(response))
+    tokens = [data['token'] for _, name, data in events if name == 'message']
+    first_token_at = events[0][0]
+    done_at, name, done = events[-1]
+
+    assert len(tokens) == CHUNKS
+    assert name == 'done'
+    assert done == {'response': ''.join(tokens), 'source': 'llm'}
+    # The first token is not held back until the completion finishes
+    assert first_token_at < DELAY * CHUNKS / 2 < done_at
+
+
+def test_chat_is_logged_once_the_stream_finishes(completion_server, openai_at):
+    openai_at(completion_server)
+    message = QUESTION + ' (logged)'
+    response = app.test_client().post('/api/ai-chat', json={'message': message, 'stream': True}, buffered=False)
+    *_, (_, _, done) = read_events(response)
+
+    logs = chat_logs(message)
+    assert len(logs) == 1
+    assert logs[0]['ai_response'] == done['response']
+    assert logs[0]['streamed'] is True
+
+
+def test_upstream_failure_ends_the_stream_with_an_error(openai_at):
+    openai_at('http://127.0.0.1:1/v1')
+    message = QUESTION + ' (unreachable)'
+    response = app.test_client().post('/api/ai-chat', json={'message': message, 'stream': True}, buffered=False)
+    events = list(read_events(response))
+
+    assert [name for _, name, _ in events] == ['error']
+    assert chat_logs(message) == []
+
+
+def test_non_streaming_reply_is_unchanged(completion_server, openai_at):
+    openai_at(completion_server)
+    response = app.test_client().post('/api/ai-chat', json={'message': QUESTION})
+    assert response.status_code == 200
+    assert response.get_json()['response'] == ''.join(f"word{i} " for i in range(CHUNKS))
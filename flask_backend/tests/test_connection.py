@@ -0,0 +1,118 @@
+"""
+DINE24 Restaurant Management System - Connection Layer Tests
+ConnectionManager and DatabaseManager over an in-process MongoClient stand-in
+"""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from config import Config
+from connection import ConnectionManager, PoolMetrics
+from database import DatabaseManager
+from storage import MemoryDatabase
+
+
+class StandInClient:
+    """Just enough of MongoClient: databases from the in-memory engine, ping and close"""
+
+    def __init__(self, uri, **options):
+        self.uri = uri
+        self.options = options
+        self.closed = False
+        self.databases = {}
+        self.admin = SimpleNamespace(command=lambda name: {'ok': 1.0})
+
+    def __getitem__(self, name):
+        return self.databases.setdefault(name, MemoryDatabase(name))
+
+    def close(self):
+        self.closed = True
+
+
+def test_client_is_created_lazily_with_pool_options():
+    manager = ConnectionManager('mongodb://stand-in/db', max_pool_size=7, wait_queue_timeout_ms=250,
+                                server_selection_timeout_ms=500, client_factory=StandInClient)
+    assert not manager.connected
+
+    client = manager.client
+    assert manager.connected
+    assert manager.client is client
+    assert client.options['maxPoolSize'] == 7
+    assert client.options['waitQueueTimeoutMS'] == 250
+    assert client.options['serverSelectionTimeoutMS'] == 500
+    assert client.options['connect'] is False
+    assert client.options['event_listeners'] == [manager.metrics]
+
+
+def test_pymongo_accepts_the_pool_options():
+    # connect=False: no server is contacted
+    manager = ConnectionManager('mongodb://127.0.0.1:1/db', max_pool_size=7, min_pool_size=1)
+    try:
+        assert manager.client.options.pool_options.max_pool_size == 7
+        assert manager.client.options.pool_options.min_pool_size == 1
+    finally:
+        manager.close()
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork()')
+def test_forked_child_builds_its_own_client():
+    manager = ConnectionManager('mongodb://stand-in/db', client_factory=StandInClient)
+    parent_client = manager.client
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            fresh = not manager.connected and manager.client is not parent_client
+            manager.close()
+            os.write(write_end, b'1' if fresh and not parent_client.closed else b'0')
+        finally:
+            os._exit(0)
+    os.close(write_end)
+    os.waitpid(pid, 0)
+    assert os.read(read_end, 1) == b'1'
+    os.close(read_end)
+    assert manager.client is parent_client
+    assert not parent_client.closed
+
+
+def test_close_drains_the_client():
+    manager = ConnectionManager('mongodb://stand-in/db', client_factory=StandInClient)
+    client = manager.client
+    manager.close()
+    assert client.closed
+    assert not manager.connected
+    assert manager.client is not client
+
+
+def test_pool_metrics_track_checkouts():
+    pool = PoolMetrics()
+    pool.connection_created(None)
+    for _ in range(3):
+        pool.connection_check_out_started(None)
+        pool.connection_checked_out(None)
+    pool.connection_checked_in(None)
+    pool.connection_check_out_failed(None)
+
+    stats = pool.snapshot()
+    assert stats['checkouts'] == 3
+    assert stats['in_use'] == 2
+    assert stats['checkout_failures'] == 1
+    assert stats['open_connections'] == 1
+    assert stats['checkout_wait_max_ms'] >= stats['checkout_wait_avg_ms'] >= 0
+
+
+def test_database_manager_over_stand_in():
+    db_manager = DatabaseManager(Config, backend='mongodb', client_factory=StandInClient)
+    assert not db_manager.connection.connected  # nothing is opened at construction
+    assert db_manager.connect()
+
+    item_id = db_manager.insert_one('menu_items', {'name': 'Paneer Tikka', 'category': 'Starters'}).inserted_id
+    assert db_manager.find_one('menu_items', {'_id': item_id})['name'] == 'Paneer Tikka'
+    assert 'category_1' in db_manager.db['menu_items'].index_information()
+
+    client = db_manager.client
+    assert db_manager.get_pool_metrics()['connected']
+    assert db_manager.close_connection()
+    assert client.closed
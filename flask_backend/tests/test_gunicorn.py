@@ -0,0 +1,48 @@
+"""
+DINE24 Restaurant Management System - Gunicorn Configuration Tests
+The server hooks, called with a stand-in arbiter
+"""
+
+import os
+import runpy
+from types import SimpleNamespace
+
+import pytest
+
+from config import Config
+
+CONF_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+
+
+def arbiter(workers):
+    return SimpleNamespace(cfg=SimpleNamespace(workers=workers))
+
+
+def load(monkeypatch, backend, workers=None):
+    monkeypatch.setenv('DATABASE_BACKEND', backend)
+    if workers is None:
+        monkeypatch.delenv('GUNICORN_WORKERS', raising=False)
+    else:
+        monkeypatch.setenv('GUNICORN_WORKERS', str(workers))
+    monkeypatch.setattr(Config, 'DATABASE_BACKEND', backend)
+    return runpy.run_path(CONF_PATH)
+
+
+def test_worker_count_defaults_by_backend(monkeypatch):
+    assert load(monkeypatch, 'memory')['workers'] == 1
+    assert load(monkeypatch, 'mongodb')['workers'] == 4
+    assert load(monkeypatch, 'mongodb', workers=6)['workers'] == 6
+
+
+def test_memory_backend_refuses_several_workers(monkeypatch):
+    hooks = load(monkeypatch, 'memory', workers=1)
+    assert hooks['workers'] == 1
+    hooks['on_starting'](arbiter(1))
+    with pytest.raises(RuntimeError):
+        hooks['on_starting'](arbiter(4))
+
+
+def test_mongodb_backend_allows_several_workers(monkeypatch):
+    hooks = load(monkeypatch, 'mongodb', workers=4)
+    assert hooks['workers'] == 4
+    hooks['on_starting'](arbiter(4))
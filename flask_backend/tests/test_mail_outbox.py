@@ -0,0 +1,146 @@
+"""
+DINE24 Restaurant Management System - Email Outbox Tests
+EmailOutbox delivering to the local fake SMTP server
+"""
+
+import os
+import socket
+import threading
+import time
+
+import pytest
+from flask import Flask
+from flask_mail import Mail
+
+import fake_smtp
+from mail_outbox import EmailOutbox
+
+
+class CountingHandler(fake_smtp.FakeSMTPHandler):
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+
+class CountingServer(fake_smtp.FakeSMTPServer):
+    connections = 0
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port=0):
+    server = CountingServer(('127.0.0.1', port), CountingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_outbox(port, spool_dir, **options):
+    app = Flask(__name__)
+    app.config.update(MAIL_SERVER='127.0.0.1', MAIL_PORT=port, MAIL_USE_TLS=False,
+                      MAIL_USERNAME=None, MAIL_PASSWORD=None, MAIL_DEFAULT_SENDER='noreply@dine24.com')
+    options.setdefault('retry_delay', 0.05)
+    options.setdefault('idle_timeout', 0.5)
+    return EmailOutbox(app, Mail(app), str(spool_dir), **options)
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def spooled(spool_dir):
+    return [name for name in os.listdir(spool_dir) if name.endswith('.json')]
+
+
+@pytest.fixture
+def server():
+    server = start_server()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_batch_is_sent_over_one_connection(server, tmp_path):
+    outbox = make_outbox(server.server_address[1], tmp_path, batch_size=20)
+    try:
+        for i in range(5):
+            assert outbox.enqueue(f'Booking {i}', ['guest@example.com'], body='See you soon')
+        assert wait_for(lambda: outbox.sent == 5)
+    finally:
+        outbox.stop()
+    assert server.delivered == 5
+    assert server.connections == 1
+    assert spooled(tmp_path) == []
+
+
+def test_failed_sends_are_retried_with_backoff(tmp_path):
+    port = free_port()
+    outbox = make_outbox(port, tmp_path)
+    server = None
+    try:
+        assert outbox.enqueue('Booking', ['guest@example.com'], body='See you soon')
+        assert wait_for(lambda: outbox.retried >= 2)
+        assert len(spooled(tmp_path)) == 1
+
+        server = start_server(port)
+        assert wait_for(lambda: outbox.sent == 1)
+    finally:
+        outbox.stop()
+        if server:
+            server.shutdown()
+            server.server_close()
+    assert server.delivered == 1
+    assert outbox.failed == 0
+    assert spooled(tmp_path) == []
+
+
+def test_message_is_dropped_after_max_retries(tmp_path):
+    outbox = make_outbox(free_port(), tmp_path, max_retries=2, retry_delay=0.01)
+    try:
+        outbox.enqueue('Booking', ['guest@example.com'], body='See you soon')
+        assert wait_for(lambda: outbox.failed == 1)
+    finally:
+        outbox.stop()
+    assert outbox.retried == 2
+    assert spooled(tmp_path) == []
+
+
+def test_spooled_mail_survives_a_restart(server, tmp_path):
+    offline = make_outbox(free_port(), tmp_path, retry_delay=0.5)
+    offline.enqueue('Booking', ['guest@example.com'], body='See you soon')
+    assert wait_for(lambda: offline.retried == 1)
+    offline.stop()
+
+    # Same pid as the stopped owner, as after a container restart; only the lock tells them apart
+    restarted = make_outbox(server.server_address[1], tmp_path)
+    try:
+        restarted.start()
+        assert wait_for(lambda: restarted.sent == 1)
+    finally:
+        restarted.stop()
+    assert server.delivered == 1
+    assert spooled(tmp_path) == []
+
+
+def test_running_owner_keeps_its_spool(server, tmp_path):
+    offline = make_outbox(free_port(), tmp_path, retry_delay=60)
+    other = make_outbox(server.server_address[1], tmp_path)
+    try:
+        offline.enqueue('Booking', ['guest@example.com'], body='See you soon')
+        assert wait_for(lambda: offline.retried == 1)
+        other.start()
+        assert other.pending() == 0
+        name, = spooled(tmp_path)
+        assert name.startswith(f"{offline._owner}-")
+    finally:
+        other.stop()
+        offline.stop()
+    assert server.delivered == 0
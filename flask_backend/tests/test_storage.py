@@ -0,0 +1,100 @@
+"""
+DINE24 Restaurant Management System - Storage Engine Tests
+Index plans must return exactly what a full collection scan returns
+"""
+
+import random
+
+import pytest
+
+from storage import MemoryCollection, matches, sort_key
+
+VALUES = [None, True, False, 0, 1, 2, 1.0, 2.5, 'a', 'm', 'z', {'x': 1}, [1]]
+
+
+@pytest.fixture
+def collection():
+    rng = random.Random(7)
+    collection = MemoryCollection('test')
+    collection.create_index([('a', 1), ('b', 1)])
+    collection.create_index([('b', -1)])
+    for _ in range(300):
+        doc = {}
+        if rng.random() < 0.9:
+            doc['a'] = rng.choice(VALUES)
+        if rng.random() < 0.9:
+            doc['b'] = rng.choice(VALUES)
+        collection.insert_one(doc)
+    return collection
+
+
+def scanned(collection, query):
+    return sorted(str(doc['_id']) for doc in collection.find() if matches(doc, query))
+
+
+def found(collection, query):
+    return sorted(str(doc['_id']) for doc in collection.find(query))
+
+
+@pytest.mark.parametrize('query', [
+    {'a': {'$gt': 'z', '$gte': 'a'}},
+    {'a': {'$gte': 'a', '$gt': 'z'}},
+    {'a': {'$lt': 2, '$lte': 1}},
+    {'a': 1, 'b': {'$gte': 0, '$lt': 2.5}},
+    {'b': {'$gt': 1, '$lt': 'z'}},
+    {'b': {'$gte': 0, '$gt': 'a'}},
+    {'a': True},
+    {'a': 1},
+    {'a': {'$eq': 0}, 'b': False},
+    {'a': {'x': 1}},
+    {'b': [1]},
+    {'a': None},
+    {'a': 'm', 'b': {'$gt': float('nan')}}
+])
+def test_index_plans_match_a_full_scan(collection, query):
+    assert found(collection, query) == scanned(collection, query)
+    assert collection.count_documents(query) == len(scanned(collection, query))
+
+
+def test_random_queries_match_a_full_scan(collection):
+    rng = random.Random(11)
+    operators = ['$gt', '$gte', '$lt', '$lte']
+    for _ in range(500):
+        query = {}
+        for field in rng.sample(['a', 'b'], rng.randint(1, 2)):
+            if rng.random() < 0.4:
+                query[field] = rng.choice(VALUES)
+            else:
+                query[field] = {rng.choice(operators): rng.choice(VALUES) for _ in range(rng.randint(1, 3))}
+        assert found(collection, query) == scanned(collection, query), query
+
+
+def test_tightest_bound_wins_without_a_filter(collection):
+    plan = collection.explain({'a': {'$gt': 'z', '$gte': 'a'}})['winning_plan']
+    assert plan['filter'] is False
+    assert plan['estimated_keys'] == len(scanned(collection, {'a': {'$gt': 'z'}}))
+
+
+def test_operands_of_different_types_scan_nothing(collection):
+    plan = collection.explain({'b': {'$gt': 1, '$lt': 'z'}})['winning_plan']
+    assert plan['estimated_keys'] == 0
+
+
+def test_bool_equality_uses_the_index_like_matches(collection):
+    plan = collection.explain({'a': True})['winning_plan']
+    assert plan['stage'] == 'IXSCAN'
+    assert {type(doc['a']) for doc in collection.find({'a': True})} == {bool, int, float}
+
+
+def test_document_equality_is_left_to_the_filter(collection):
+    assert collection.explain({'a': {'x': 1}})['winning_plan']['stage'] == 'COLLSCAN'
+    plan = collection.explain({'a': 'm', 'b': [1]})['winning_plan']
+    assert plan['equality_fields'] == ['a'] and plan['filter'] is True
+
+
+def test_sort_is_pushed_down_to_the_index(collection):
+    explained = collection.explain({'a': 'm'}, sort=[('b', -1)])
+    assert explained['winning_plan']['sort_pushdown'] is True
+    ordered = list(collection.find({'a': 'm'}, sort=[('b', -1)]))
+    resorted = sorted(ordered, key=lambda doc: sort_key(doc.get('b')), reverse=True)
+    assert [doc['_id'] for doc in ordered] == [doc['_id'] for doc in resorted]
@@ -0,0 +1,133 @@
+"""
+DINE24 Restaurant Management System - Buffered Bulk Writer
+Append-only documents (chat logs, analytics events) written in batches off the request path
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBuffer:
+    """Bounded in-memory buffer flushed to the database with bulk inserts
+
+    append() only enqueues. A background thread flushes when max_batch
+    documents are waiting or flush_interval seconds have passed, grouping
+    documents by collection into one insert_many each. When max_pending
+    documents are already queued, append() waits up to block_timeout for
+    room and then drops the document, so memory stays bounded under load.
+    """
+
+    def __init__(self, db_manager, max_batch=500, flush_interval=1.0, max_pending=10000, block_timeout=0.05):
+        self.db_manager = db_manager
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self.appended = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self._queue = queue.Queue(max_pending)
+        self._write_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name='write-buffer', daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    # Producer API
+    def append(self, collection, document):
+        """Queue a document for a later bulk insert; returns False if it was dropped"""
+        self._ensure_started()
+        try:
+            self._queue.put((collection, document), timeout=self.block_timeout)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.appended += 1
+        return True
+
+    # Flushing
+    def _drain(self, first=None, deadline=None):
+        batch = [first] if first else []
+        while len(batch) < self.max_batch:
+            try:
+                if deadline is None:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        if not batch:
+            return
+        grouped = {}
+        for collection, document in batch:
+            grouped.setdefault(collection, []).append(document)
+        try:
+            with self._write_lock:
+                for collection, documents in grouped.items():
+                    try:
+                        self.db_manager.insert_many(collection, documents)
+                        self.written += len(documents)
+                    except Exception as e:
+                        self.dropped += len(documents)
+                        logger.error(f"Bulk insert into {collection} failed, {len(documents)} documents dropped: {str(e)}")
+                self.flushes += 1
+        finally:
+            # Lets flush() see when batches taken by other threads have landed
+            for _ in batch:
+                self._queue.task_done()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            self._write(self._drain(first, deadline=time.monotonic() + self.flush_interval))
+
+    def flush(self):
+        """Write everything queued so far and wait until it is stored
+
+        Batches the flusher thread has already taken are waited for, not
+        skipped, so a read after flush() sees every document appended before it.
+        """
+        while not self._queue.empty():
+            self._write(self._drain())
+        self._queue.join()
+
+    def close(self):
+        """Stop the flusher thread and write any remaining documents"""
+        self._stopping.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(self.flush_interval + 1)
+        self._thread = None
+        self._pid = None
+        self.flush()
+
+    def stats(self):
+        return {
+            'pending': self._queue.qsize(),
+            'appended': self.appended,
+            'written': self.written,
+            'dropped': self.dropped,
+            'flushes': self.flushes
+        }